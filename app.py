@@ -1,376 +1,304 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import yfinance as yf
-import matplotlib.pyplot as plt
-import seaborn as sns
-import requests
-from datetime import datetime
-import pytz
 import warnings
+import os
+import sys
 
-# --- CONFIGURAÇÃO DA PÁGINA ---
-st.set_page_config(
-    page_title="Monitor BDRs - Swing Trade",
-    page_icon="📉",
-    layout="wide"
-)
+from nucleo.armazenamento import ArmazemOHLCV
+from nucleo.correlacao import CacheCorrelacao, deduplicar
+from nucleo.download import BaixadorEmLotes
+from nucleo.graficos import CacheGraficos
+from nucleo.instrumentacao import Instrumentos, perfil_inicializacao
+from nucleo.liquidez import FiltroLiquidez
+from nucleo.multiperiodo import CacheMultiperiodo
+from nucleo.paridade import Paridades
+from nucleo.tabela import COLUNAS_ESTILIZADAS, TabelaResultados
+from nucleo.triagem import ORDEM_POTENCIAL
+from nucleo.universo import Universo, carregar_universo, classe_sufixo
+from nucleo.varredura import PERIODO, Retratos, ler_retrato_publicado, serie_ticker, varrer
 
+# --- CONFIGURAÇÃO ---
 warnings.filterwarnings('ignore')
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
 
-PERIODO = "6mo"
-TERMINACOES_BDR = ('31', '32', '33', '34', '35', '39')
+DIRETORIO_DADOS = os.environ.get("BDR_DADOS", "dados")
+DIRETORIO_RETRATOS = os.path.join(DIRETORIO_DADOS, "retratos")  # varreduras gravadas pelo bot (ou por este app)
+RETRATO_TTL = int(os.environ.get("BDR_RETRATO_TTL", 1800))  # retrato mais novo que isso é aberto sem nova varredura
+RETRATO_URL = os.environ.get("BDR_RETRATO_URL")  # retrato que o workflow do bot publica (branch `retratos`)
+MODO_COMPACTO = os.environ.get("BDR_COMPACTO") == "1"  # float32 em blocos, para máquinas com pouca memória
+PARIDADE = os.environ.get("BDR_PARIDADE", "1") == "1"  # prêmio/desconto sobre o ativo de origem (EUA + câmbio)
+LIQUIDEZ = os.environ.get("BDR_LIQUIDEZ", "1") == "1"  # pré-filtro: ilíquidos nem são baixados nas próximas varreduras
+GRAFICOS_PARALELOS = os.environ.get("BDR_GRAFICOS_PARALELOS") == "1"  # renderiza os Top 5 num pool de processos
+PERFIL = os.environ.get("BDR_PERFIL") or None  # "cprofile" ou "pyinstrument" para perfil completo
+PERFIL_INICIO = "--profile-startup" in sys.argv[1:]  # streamlit run app.py -- --profile-startup
 
 # --- FUNÇÕES ---
 
 @st.cache_data(ttl=3600)
 def obter_dados_brapi():
     try:
-        url = "https://brapi.dev/api/quote/list"
-        r = requests.get(url, timeout=30)
-        dados = r.json().get('stocks', [])
-        bdrs_raw = [d for d in dados if d['stock'].endswith(TERMINACOES_BDR)]
-        lista_tickers = [d['stock'] for d in bdrs_raw]
-        mapa_nomes = {d['stock']: d.get('name', d['stock']) for d in bdrs_raw}
-        return lista_tickers, mapa_nomes
+        # Lista em disco, revalidada na BRAPI só quando o TTL vence
+        return carregar_universo(DIRETORIO_DADOS, ttl=3600)
     except Exception as e:
         st.error(f"Erro ao buscar BRAPI: {e}")
-        return [], {}
+        return Universo([])
 
-@st.cache_data(ttl=1800)
-def buscar_dados(tickers):
-    if not tickers: return pd.DataFrame()
-    sa_tickers = [f"{t}.SA" for t in tickers]
+def varrer_mercado(universo, inst):
+    # Só os pregões novos vêm do Yahoo; o histórico fica no armazém local
+    armazem = ArmazemOHLCV(DIRETORIO_DADOS, baixador=BaixadorEmLotes())
     try:
-        df = yf.download(sa_tickers, period=PERIODO, auto_adjust=True, progress=False, timeout=60)
-        if df.empty: return pd.DataFrame()
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = pd.MultiIndex.from_tuples([(c[0], c[1].replace(".SA", "")) for c in df.columns])
-        return df.dropna(axis=1, how='all')
-    except Exception: return pd.DataFrame()
-
-def calcular_indicadores(df):
-    df_calc = df.copy()
-    tickers = df_calc.columns.get_level_values(1).unique()
-    
-    progresso = st.progress(0)
-    total = len(tickers)
-    
-    for i, ticker in enumerate(tickers):
-        progresso.progress((i + 1) / total)
-        try:
-            close = df_calc[('Close', ticker)]
-            high = df_calc[('High', ticker)]
-            low = df_calc[('Low', ticker)]
-            
-            # RSI 14
-            delta = close.diff()
-            ganho = delta.clip(lower=0).rolling(14).mean()
-            perda = -delta.clip(upper=0).rolling(14).mean()
-            rs = ganho / perda
-            df_calc[('RSI14', ticker)] = 100 - (100 / (1 + rs))
-
-            # ESTOCÁSTICO 14 (%K) - Novo!
-            # Fórmula: (Close - Lowest_Low) / (Highest_High - Lowest_Low) * 100
-            lowest_low = low.rolling(window=14).min()
-            highest_high = high.rolling(window=14).max()
-            stoch_k = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-            df_calc[('Stoch_K', ticker)] = stoch_k
-
-            # Médias e Bollinger
-            df_calc[('EMA20', ticker)] = close.ewm(span=20).mean()
-            sma = close.rolling(20).mean()
-            std = close.rolling(20).std()
-            df_calc[('BB_Lower', ticker)] = sma - (std * 2)
-            df_calc[('BB_Upper', ticker)] = sma + (std * 2)
-
-            # MACD
-            ema_12 = close.ewm(span=12).mean()
-            ema_26 = close.ewm(span=26).mean()
-            macd = ema_12 - ema_26
-            signal = macd.ewm(span=9).mean()
-            df_calc[('MACD_Hist', ticker)] = macd - signal
-        except: continue
-            
-    progresso.empty()
-    return df_calc
-
-def calcular_fibonacci(df_ticker):
-    try:
-        if len(df_ticker) < 50: return None
-        high = df_ticker['High'].max()
-        low = df_ticker['Low'].min()
-        diff = high - low
-        return {'61.8%': low + (diff * 0.618)} 
-    except: return None
-
-def gerar_sinal(row_ticker, df_ticker):
-    sinais = []
-    score = 0
-    
-    def classificar(s):
-        if s >= 4: return "Muito Alta"
-        if s >= 2: return "Alta"
-        if s >= 1: return "Média"
-        return "Baixa"
+        paridades = Paridades(DIRETORIO_DADOS) if PARIDADE else None
+        liquidez = FiltroLiquidez(DIRETORIO_DADOS) if LIQUIDEZ else None
+        return varrer(universo, armazem, inst, compacto=MODO_COMPACTO, cache_periodos=cache_periodos(),
+                      paridades=paridades, cache_correlacao=cache_correlacao(), liquidez=liquidez)
+    except Exception: return None
 
-    try:
-        close = row_ticker.get('Close')
-        rsi = row_ticker.get('RSI14')
-        stoch = row_ticker.get('Stoch_K') # Novo
-        macd_hist = row_ticker.get('MACD_Hist')
-        bb_lower = row_ticker.get('BB_Lower')
-        
-        # Sinais de Reversão
-        if pd.notna(rsi):
-            if rsi < 30:
-                sinais.append("RSI Oversold")
-                score += 3
-            elif rsi < 40:
-                score += 1
-        
-        if pd.notna(stoch):
-            if stoch < 20:
-                sinais.append("Stoch. Fundo")
-                score += 2
-            
-        if pd.notna(macd_hist) and macd_hist > 0:
-            sinais.append("MACD Virando")
-            score += 1
-            
-        if pd.notna(close) and pd.notna(bb_lower):
-            if close < bb_lower:
-                sinais.append("Abaixo BB")
-                score += 2
-            elif close < bb_lower * 1.02:
-                sinais.append("Suporte BB")
-                score += 1
-
-        fibo = calcular_fibonacci(df_ticker)
-        if fibo and (fibo['61.8%'] * 0.99 <= close <= fibo['61.8%'] * 1.01):
-            sinais.append("Fibo 61.8%")
-            score += 2
-
-        return sinais, score, classificar(score)
-    except:
-        return [], 0, "Indefinida"
-
-def analisar_oportunidades(df_calc, mapa_nomes):
-    resultados = []
-    tickers = df_calc.columns.get_level_values(1).unique()
+@st.cache_data
+def medir_inicializacao():
+    # Import a frio do app num interpretador novo; medido uma vez por processo
+    total, ranking = perfil_inicializacao("app")
+    return total, pd.DataFrame(ranking, columns=['modulo', 'acumulado_s', 'proprio_s'])
+
+@st.cache_resource
+def cache_graficos():
+    # Um cache por processo do Streamlit, compartilhado entre reruns e sessões
+    return CacheGraficos(capacidade=32)
+
+@st.cache_resource
+def cache_periodos():
+    # Semanal/mensal reamostrados do diário, reaproveitados enquanto a última barra não muda
+    return CacheMultiperiodo()
+
+@st.cache_resource
+def cache_correlacao():
+    # Matriz de correlação do universo, avançada barra a barra entre atualizações
+    return CacheCorrelacao()
 
+def series_grafico(varredura, tickers):
+    # Retrato não traz o OHLCV: só os tickers do gráfico saem do armazém (e do Yahoo, se o armazém não os tem)
+    dados = varredura.dados
+    if dados is None:
+        armazem = ArmazemOHLCV(DIRETORIO_DADOS, baixador=BaixadorEmLotes())
+        dados = armazem.carregar(tickers, PERIODO)
+        guardados = set(dados.columns.get_level_values(1)) if not dados.empty else set()
+        if set(tickers) - guardados: dados = armazem.atualizar(tickers, PERIODO)
+    series = {}
     for ticker in tickers:
-        try:
-            df_ticker = df_calc.xs(ticker, axis=1, level=1).dropna()
-            if len(df_ticker) < 50: continue
-
-            last = df_ticker.iloc[-1]
-            anterior = df_ticker.iloc[-2]
-            
-            preco = last.get('Close')
-            preco_ant = anterior.get('Close')
-            preco_open = last.get('Open')
-            volume = last.get('Volume')
-            
-            if pd.isna(preco) or pd.isna(preco_ant): continue
-
-            # Variações
-            queda_dia = ((preco - preco_ant) / preco_ant) * 100
-            gap = ((preco_open - preco_ant) / preco_ant) * 100
-            
-            var_7d = np.nan
-            if len(df_ticker) > 6:
-                preco_7d = df_ticker['Close'].iloc[-6]
-                var_7d = ((preco - preco_7d) / preco_7d) * 100
-
-            if queda_dia >= 0: continue 
-
-            sinais, score, classificacao = gerar_sinal(last, df_ticker)
-            
-            # --- CÁLCULO ÍNDICE DE SOBREVENDA (I.S.) ---
-            # Quanto maior, mais sobrevendido (melhor para reversão)
-            # Baseado em RSI invertido e Estocástico invertido
-            rsi = last.get('RSI14', 50)
-            stoch = last.get('Stoch_K', 50)
-            
-            # Normaliza para 0-100 onde 100 é o fundo do poço
-            # Se RSI = 30 -> (100-30) = 70 pontos
-            # Se Stoch = 10 -> (100-10) = 90 pontos
-            is_index = ((100 - rsi) + (100 - stoch)) / 2
-            
-            # Tratamento de Nome
-            nome_completo = mapa_nomes.get(ticker, ticker)
-            palavras = nome_completo.split()
-            ignore_list = ['INC', 'CORP', 'LTD', 'S.A.', 'GMBH', 'PLC', 'GROUP', 'HOLDINGS']
-            palavras_uteis = [p for p in palavras if p.upper().replace('.', '') not in ignore_list]
-            nome_curto = " ".join(palavras_uteis[:2]) if len(palavras_uteis) > 0 else ticker
-            nome_curto = nome_curto.replace(',', '').title()
-
-            resultados.append({
-                'Ticker': ticker,
-                'Empresa': nome_curto,
-                'Preco': preco,
-                'Volume': volume,
-                'Queda_Dia': queda_dia,
-                'Gap': gap,
-                'IS': is_index, # Novo Índice
-                'RSI14': rsi,
-                'Stoch': stoch,
-                'Potencial': classificacao,
-                'Score': score,
-                'Sinais': ", ".join(sinais) if sinais else "-"
-            })
-        except: continue
-    return resultados
-
-def plotar_grafico(df_ticker, ticker, empresa, rsi, is_val):
-    fig, axes = plt.subplots(3, 1, figsize=(10, 8), sharex=True, gridspec_kw={'height_ratios': [3, 1, 1]})
-    
-    close = df_ticker['Close']
-    
-    # Preço
-    ax1 = axes[0]
-    ax1.plot(close.index, close.values, label='Close', color='#333333')
-    ax1.plot(close.index, df_ticker['EMA20'], label='EMA20', alpha=0.7, color='blue', linewidth=1)
-    ax1.fill_between(close.index, df_ticker['BB_Lower'], df_ticker['BB_Upper'], alpha=0.15, color='gray')
-    ax1.set_title(f'{ticker} - {empresa} | I.S.: {is_val:.0f}', fontweight='bold')
-    ax1.legend(loc='upper left')
-    ax1.grid(True, alpha=0.3)
-
-    # RSI
-    ax2 = axes[1]
-    ax2.plot(close.index, df_ticker['RSI14'], color='orange', label='RSI')
-    ax2.axhline(30, color='red', linestyle='--', linewidth=1)
-    ax2.axhline(70, color='green', linestyle='--', linewidth=1)
-    ax2.fill_between(close.index, 0, 30, alpha=0.2, color='red')
-    ax2.set_ylabel('RSI')
-    ax2.set_ylim(0, 100)
-    ax2.grid(True, alpha=0.3)
-    
-    # Estocástico
-    ax3 = axes[2]
-    if 'Stoch_K' in df_ticker.columns:
-        ax3.plot(close.index, df_ticker['Stoch_K'], color='purple', label='Stoch %K')
-        ax3.axhline(20, color='red', linestyle='--', linewidth=1)
-        ax3.axhline(80, color='green', linestyle='--', linewidth=1)
-        ax3.fill_between(close.index, 0, 20, alpha=0.2, color='red')
-    ax3.set_ylabel('Stoch')
-    ax3.set_ylim(0, 100)
-    ax3.grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    return fig
-
-# Função para colorir o IS (Índice de Sobrevenda)
-def estilizar_is(val):
-    color = ''
-    if val >= 75: # Extrema sobrevenda
-        color = 'background-color: #d32f2f; color: white; font-weight: bold' # Vermelho (alerta oportunidade)
-    elif val >= 60:
-        color = 'background-color: #ffa726; color: black' # Laranja
-    else:
-        color = 'color: #888888' # Cinza apagado
-    return color
-
-def estilizar_potencial(val):
-    color = ''
-    if val == 'Muito Alta':
-        color = 'background-color: #2e7d32; color: white; font-weight: bold' 
-    elif val == 'Alta':
-        color = 'background-color: #66bb6a; color: black; font-weight: bold'
-    elif val == 'Média':
-        color = 'background-color: #ffa726; color: black'
-    elif val == 'Baixa':
-        color = 'background-color: #e0e0e0; color: black' 
-    return color
+        try: series[ticker] = serie_ticker(dados, ticker)
+        except Exception: continue
+    return series
+
+POR_PAGINA = 25
+FORMATOS = {
+    'Preco': 'R$ {:.2f}',
+    'Volume': '{:,.0f}',
+    'Queda_Dia': '{:.2f}%',
+    'Gap': '{:.2f}%',
+    'Premio': '{:+.1f}%',
+    'Queda_Residual': '{:+.2f}%',
+    'IS': '{:.0f}',
+    'RSI14': '{:.0f}',
+    'Stoch': '{:.0f}'
+}
+ORDENACOES = {
+    "Queda do dia": ('Queda_Dia', True),
+    "I.S. (maior)": ('IS', False),
+    "Score (maior)": ('Score', False),
+    "Potencial": ('Potencial', True),
+    "Volume (maior)": ('Volume', False),
+    "Desconto vs origem": ('Premio', True),
+    "Queda residual (vs grupo)": ('Queda_Residual', True),
+}
 
 # --- LAYOUT DO APP ---
 
-st.title("📉 Monitor BDR - Swing Trade")
-st.markdown("Rastreamento de BDRs em queda focado em **Reversão** (Sobrevenda).")
-
-if st.button("🔄 Atualizar Análise", type="primary"):
-    with st.spinner("Conectando à API e baixando dados..."):
-        lista_bdrs, mapa_nomes = obter_dados_brapi()
-        df = buscar_dados(lista_bdrs)
-        
-    if not df.empty:
-        df_calc = calcular_indicadores(df)
-        oportunidades = analisar_oportunidades(df_calc, mapa_nomes)
-        
-        if oportunidades:
-            df_res = pd.DataFrame(oportunidades)
-            
-            # ORDENAÇÃO: Queda do Dia
-            df_res = df_res.sort_values(by='Queda_Dia', ascending=True)
-            
-            st.success(f"{len(oportunidades)} oportunidades encontradas!")
-            
-            # --- TABELA INTERATIVA ---
-            st.dataframe(
-                df_res.style.map(estilizar_potencial, subset=['Potencial'])
-                            .map(estilizar_is, subset=['IS'])
-                .format({
-                    'Preco': 'R$ {:.2f}',
-                    'Volume': '{:,.0f}',
-                    'Queda_Dia': '{:.2f}%',
-                    'Gap': '{:.2f}%',
-                    'IS': '{:.0f}',
-                    'RSI14': '{:.0f}',
-                    'Stoch': '{:.0f}'
-                }),
-                column_order=("Ticker", "Empresa", "Preco", "Queda_Dia", "IS", "Volume", "Gap", "Potencial", "Score", "Sinais"),
-                column_config={
-                    "Empresa": st.column_config.TextColumn("Empresa", width="medium"),
-                    "IS": st.column_config.NumberColumn(
-                        "I.S.", 
-                        help="Índice de Sobrevenda (0-100). Quanto maior, mais 'esticado' para baixo (bom para reversão). Baseado em RSI + Estocástico."
-                    ),
-                    "Volume": st.column_config.NumberColumn("Vol.", help="Volume Financeiro"),
-                    "Score": st.column_config.ProgressColumn("Força", format="%d", min_value=0, max_value=10),
-                    "Potencial": st.column_config.Column("Sinal"),
-                    "Sinais": st.column_config.TextColumn("Sinais Técnicos", width="large")
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-            
-            # --- TOP 5 (MAIORES QUEDAS) ---
-            st.divider()
-            st.subheader("🔍 Análise Gráfica - Top 5 Quedas")
-            
-            top5 = df_res.head(5)
-            
-            for _, row in top5.iterrows():
-                ticker = row['Ticker']
-                try:
-                    df_ticker = df_calc.xs(ticker, axis=1, level=1).dropna()
-                    
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        fig = plotar_grafico(df_ticker, ticker, row['Empresa'], row['RSI14'], row['IS'])
-                        st.pyplot(fig)
-                        
-                    with col2:
-                        potencial = row['Potencial']
-                        cor_bola = "🟢" if "Alta" in potencial else "🟡" if "Média" in potencial else "⚪"
-                        
-                        st.markdown(f"### {cor_bola} {potencial}")
-                        st.metric("Queda Hoje", f"{row['Queda_Dia']:.2f}%", delta_color="inverse")
-                        
-                        # Destaque do Índice de Sobrevenda
-                        st.metric("I.S. (Sobrevenda)", f"{row['IS']:.0f}/100", 
-                                  delta="Esticado" if row['IS'] > 70 else None)
-                        
-                        st.write(f"**Score:** {row['Score']}/10")
-                        st.info(f"📋 **Sinais:** {row['Sinais']}")
-                        
-                    st.divider()
-                except Exception: continue
-        else:
-            st.warning("Nenhuma BDR em queda encontrada hoje.")
+def executar_analise(inst, retrato=None):
+    # Calcula tudo e devolve o que a página precisa; o resultado fica em
+    # st.session_state, então filtros e paginação não refazem a análise.
+    # Com um retrato recente (do bot ou de outra sessão), nada é baixado nem recalculado.
+    if retrato is not None:
+        with inst.etapa("retrato", linhas=len(retrato.resultados)):
+            varredura = retrato
     else:
+        with st.spinner("Conectando à API, baixando dados e calculando indicadores..."):
+            with inst.etapa("brapi") as etapa:
+                universo = obter_dados_brapi()
+                etapa['linhas'] = len(universo)
+            varredura = varrer_mercado(universo, inst) if len(universo) else None
+        if varredura is not None: Retratos(DIRETORIO_RETRATOS).salvar(varredura)
+
+    analise = {'falhas': {}, 'podados': {}, 'tabela': None, 'graficos': [], 'erro': varredura is None, 'retrato': retrato}
+    if varredura is None: return analise
+    analise['falhas'] = varredura.falhas
+    analise['podados'] = varredura.podados
+    if varredura.resultados.empty: return analise
+
+    # ORDENAÇÃO: Queda do Dia
+    df_res = varredura.resultados.sort_values(by='Queda_Dia', ascending=True)
+
+    # Estilos calculados uma vez, vetorizados, para todas as linhas
+    with inst.etapa("tabela", linhas=len(df_res)):
+        analise['tabela'] = TabelaResultados(df_res)
+
+    # --- TOP 5 (MAIORES QUEDAS) ---
+    # Um ativo por grupo de correlação: num dia de queda do setor, não são cinco gráficos do mesmo movimento
+    top = deduplicar(df_res, 5)
+    series = series_grafico(varredura, list(top['Ticker']))
+    graficos = [(row, series[row['Ticker']]) for _, row in top.iterrows() if row['Ticker'] in series]
+
+    # PNGs vêm do cache quando os dados (último pregão) não mudaram
+    with inst.etapa("graficos", linhas=len(graficos)):
+        pngs = cache_graficos().obter_varios(
+            [(df_ticker, row['Ticker'], row['Empresa'], row['RSI14'], row['IS']) for row, df_ticker in graficos],
+            paralelo=GRAFICOS_PARALELOS
+        )
+    analise['graficos'] = [(row, png) for (row, _), png in zip(graficos, pngs)]
+    return analise
+
+def retrato_recente():
+    retrato = Retratos(DIRETORIO_RETRATOS).ultimo()
+    if retrato is None or retrato.idade_segundos() > RETRATO_TTL: return None
+    return retrato
+
+@st.cache_data(ttl=300)
+def retrato_publicado():
+    # Último retrato do bot (workflow diário); lido no máximo a cada 5 minutos
+    return ler_retrato_publicado(RETRATO_URL) if RETRATO_URL else None
+
+def mostrar_tabela(tabela):
+    # Filtros e ordenação rodam no servidor, sobre os resultados em cache; só a página vai para o navegador
+    c1, c2, c3, c4, c5 = st.columns([2, 2, 3, 3, 2])
+    is_min = c1.slider("I.S. mínimo", 0, 100, 0, step=5)
+    score_min = c2.slider("Score mínimo", 0, 10, 0)
+    potenciais = c3.multiselect("Potencial", ORDEM_POTENCIAL, default=ORDEM_POTENCIAL)
+    sufixos = c4.multiselect("Sufixo", tabela.sufixos_disponiveis, default=tabela.sufixos_disponiveis,
+                             format_func=lambda s: f"{s} ({classe_sufixo(s)})")
+    ordem = c5.selectbox("Ordenar por", list(ORDENACOES))
+
+    posicoes = tabela.filtrar(is_min, score_min, potenciais, sufixos)
+    posicoes = tabela.ordenar(posicoes, *ORDENACOES[ordem])
+    total_paginas = max(1, -(-len(posicoes) // POR_PAGINA))
+    numero = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1) if total_paginas > 1 else 1
+    pagina, estilos, _ = tabela.pagina(posicoes, numero, POR_PAGINA)
+    st.caption(f"{len(posicoes)} de {len(tabela)} ativos após os filtros")
+
+    st.dataframe(
+        pagina.style.apply(lambda _: estilos, axis=None, subset=COLUNAS_ESTILIZADAS).format(FORMATOS, na_rep="-"),
+        column_order=("Ticker", "Empresa", "Preco", "Queda_Dia", "Queda_Residual", "IS", "Volume", "Gap", "Premio", "Potencial", "Score", "Sinais"),
+        column_config={
+            "Empresa": st.column_config.TextColumn("Empresa", width="medium"),
+            "IS": st.column_config.NumberColumn(
+                "I.S.", 
+                help="Índice de Sobrevenda (0-100). Quanto maior, mais 'esticado' para baixo (bom para reversão). Baseado em RSI + Estocástico."
+            ),
+            "Volume": st.column_config.NumberColumn("Vol.", help="Volume Financeiro"),
+            "Queda_Residual": st.column_config.NumberColumn(
+                "Residual",
+                help="Queda além da do grupo de ativos correlacionados. Perto de zero = movimento do setor, não do ativo."
+            ),
+            "Premio": st.column_config.NumberColumn(
+                "Prêmio",
+                help="Preço do BDR contra o ativo de origem convertido pelo USD/BRL. Negativo = BDR com desconto."
+            ),
+            "Score": st.column_config.ProgressColumn("Força", format="%d", min_value=0, max_value=10),
+            "Potencial": st.column_config.Column("Sinal"),
+            "Sinais": st.column_config.TextColumn("Sinais Técnicos", width="large")
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+
+def mostrar_analise(analise):
+    falhas = analise['falhas']
+    if falhas:
+        st.caption(f"⚠️ {len(falhas)} ativos sem dados do Yahoo: {', '.join(sorted(falhas)[:15])}")
+    podados = analise['podados']
+    if podados:
+        st.caption(f"🧹 {len(podados)} ativos ilíquidos fora da varredura: {', '.join(sorted(podados)[:15])}")
+    if analise['erro']:
         st.error("Erro ao carregar dados.")
+        return
+    tabela = analise['tabela']
+    if tabela is None:
+        st.warning("Nenhuma BDR em queda encontrada hoje.")
+        return
+
+    st.success(f"{len(tabela)} oportunidades encontradas!")
+    retrato = analise['retrato']
+    if retrato is not None:
+        st.caption(f"📸 Varredura de {retrato.gerado_em:%d/%m %H:%M} (pregão {retrato.pregao:%d/%m}), "
+                   "aberta sem nova varredura")
+
+    # --- TABELA INTERATIVA ---
+    mostrar_tabela(tabela)
+
+    # --- TOP 5 (MAIORES QUEDAS) ---
+    st.divider()
+    st.subheader("🔍 Análise Gráfica - Top 5 Quedas")
+
+    for row, png in analise['graficos']:
+        col1, col2 = st.columns([3, 1])
+
+        with col1:
+            st.image(png, use_container_width=True)
+
+        with col2:
+            potencial = row['Potencial']
+            cor_bola = "🟢" if "Alta" in potencial else "🟡" if "Média" in potencial else "⚪"
+
+            st.markdown(f"### {cor_bola} {potencial}")
+            st.metric("Queda Hoje", f"{row['Queda_Dia']:.2f}%", delta_color="inverse")
+
+            # Destaque do Índice de Sobrevenda
+            st.metric("I.S. (Sobrevenda)", f"{row['IS']:.0f}/100",
+                      delta="Esticado" if row['IS'] > 70 else None)
+
+            st.write(f"**Score:** {row['Score']}/10")
+            st.info(f"📋 **Sinais:** {row['Sinais']}")
+
+        st.divider()
+
+# --- PÁGINA ---
+# O corpo da página fica numa função: `import app` (perfil de import a frio) só carrega os módulos.
+
+def pagina():
+    st.set_page_config(
+        page_title="Monitor BDRs - Swing Trade",
+        page_icon="📉",
+        layout="wide"
+    )
+    st.title("📉 Monitor BDR - Swing Trade")
+    st.markdown("Rastreamento de BDRs em queda focado em **Reversão** (Sobrevenda).")
+
+    atualizar = st.button("🔄 Atualizar Análise", type="primary")
+    # Ao abrir a página, um retrato recente já aparece sem clique; o botão só varre de novo se ele venceu.
+    # Sem retrato local recente, a abertura mostra o último publicado pelo bot.
+    if atualizar or 'analise' not in st.session_state:
+        retrato = retrato_recente()
+        if retrato is None and not atualizar: retrato = retrato_publicado()
+        if atualizar or retrato is not None:
+            inst = Instrumentos(perfil=PERFIL)
+            with inst.perfilar():
+                st.session_state['analise'] = executar_analise(inst, retrato)
+            st.session_state['tempos'] = inst
+
+    if 'analise' in st.session_state:
+        mostrar_analise(st.session_state['analise'])
+
+    if 'tempos' in st.session_state:
+        inst = st.session_state['tempos']
+        with st.expander(f"⏱️ Tempos da atualização ({inst.total_segundos:.1f}s)"):
+            st.dataframe(
+                inst.tabela().style.format({'segundos': '{:.2f}s', 'memoria_delta_mb': '{:+.1f} MB', 'percentual': '{:.0f}%'}),
+                hide_index=True,
+                use_container_width=True
+            )
+            if inst.relatorio_perfil: st.code(inst.relatorio_perfil)
+
+    if PERFIL_INICIO:
+        total, tabela = medir_inicializacao()
+        with st.expander(f"🧊 Import a frio ({total:.2f}s)"):
+            st.dataframe(tabela.style.format({'acumulado_s': '{:.3f}s', 'proprio_s': '{:.3f}s'}),
+                         hide_index=True, use_container_width=True)
+
+if __name__ == "__main__":
+    pagina()
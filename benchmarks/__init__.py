@@ -0,0 +1 @@
+# Benchmarks offline do pipeline de varredura (dados sintéticos, sem Yahoo/BRAPI).
@@ -0,0 +1,106 @@
+import argparse
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar_mercado
+from nucleo.correlacao import CacheCorrelacao
+from nucleo.indicadores import calcular_indicadores
+from nucleo.liquidez import avaliar_liquidez
+from nucleo.triagem import analisar_oportunidades
+from nucleo.universo import encurtar_nome
+from nucleo.varredura import alinhar_mercado
+
+# Mede cada etapa da varredura (tempo e pico de memória) sobre mercados
+# sintéticos de tamanhos crescentes e grava os resultados em JSON.
+#
+#   python -m benchmarks.bench_pipeline
+#   python -m benchmarks.bench_pipeline --tickers 100 1000 --pregoes 126 252 --saida bench.json
+
+TICKERS_PADRAO = [100, 500, 1000, 5000]
+PREGOES_PADRAO = [126, 252, 1260, 2520]  # 6 meses, 1 ano, 5 anos, 10 anos
+
+def medir(funcao, *args, repeticoes=3):
+    # Tempo sem tracemalloc (ele deixa as alocações bem mais lentas); o pico de
+    # memória vem de uma execução extra, separada.
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao(*args)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, {'segundos': min(tempos), 'segundos_mediana': float(np.median(tempos)), 'pico_mb': pico / 2**20}
+
+def agrupar_universo(df):
+    return CacheCorrelacao().obter(df).grupos()
+
+def rodar(n_tickers, n_pregoes, repeticoes=3):
+    df = gerar_mercado(n_tickers, n_pregoes)
+    nomes = {t: encurtar_nome(f"{t} Holdings Inc", t) for t in df.columns.get_level_values(1).unique()}
+
+    # Mesmas etapas de nucleo.varredura.varrer, usado pelo app e pelo bot
+    notas, liquidez = medir(avaliar_liquidez, df, repeticoes=repeticoes)
+    df_alinhado, alinhamento = medir(alinhar_mercado, df, repeticoes=repeticoes)
+    df_calc, indicadores = medir(calcular_indicadores, df_alinhado, repeticoes=repeticoes)
+    resultados, triagem = medir(analisar_oportunidades, df_calc, nomes, repeticoes=repeticoes)
+    grupos, correlacao = medir(agrupar_universo, df, repeticoes=repeticoes)
+
+    etapas = {
+        'avaliar_liquidez': (liquidez, int((notas['Motivo'] != "").sum())),
+        'alinhar_mercado': (alinhamento, len(df_alinhado)),
+        'calcular_indicadores': (indicadores, len(df_calc)),
+        'analisar_oportunidades': (triagem, len(resultados)),
+        'correlacao': (correlacao, grupos['Grupo'].nunique()),
+    }
+    mb_entrada = df.memory_usage(deep=False).sum() / 2**20
+    return [{
+        'etapa': etapa,
+        'tickers': n_tickers,
+        'pregoes': n_pregoes,
+        'linhas_saida': linhas_saida,
+        'mb_entrada': mb_entrada,
+        **medidas,
+    } for etapa, (medidas, linhas_saida) in etapas.items()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de varredura com dados sintéticos")
+    parser.add_argument("--tickers", type=int, nargs="+", default=TICKERS_PADRAO)
+    parser.add_argument("--pregoes", type=int, nargs="+", default=PREGOES_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default="benchmarks/resultados.json")
+    args = parser.parse_args()
+
+    linhas = []
+    for n_tickers in args.tickers:
+        for n_pregoes in args.pregoes:
+            for linha in rodar(n_tickers, n_pregoes, args.repeticoes):
+                linhas.append(linha)
+                print(f"{linha['etapa']:<24} {n_tickers:>5} tickers x {n_pregoes:>4} pregões: "
+                      f"{linha['segundos']:8.3f}s | pico {linha['pico_mb']:8.1f} MB")
+
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'maquina': platform.machine(),
+        'resultados': linhas,
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+
+if __name__ == "__main__":
+    main()
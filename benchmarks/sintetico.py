@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# Gera um DataFrame no mesmo formato de buscar_dados: colunas (campo, ticker),
+# índice de pregões, com histórico curto e lacunas em parte dos tickers.
+
+def gerar_mercado(n_tickers=100, n_pregoes=126, fim="2025-06-30", semente=0, fracao_lacunas=0.2):
+    rng = np.random.default_rng(semente)
+    datas = pd.bdate_range(end=fim, periods=n_pregoes)
+    sufixos = np.array(['31', '32', '33', '34', '35', '39'])
+    tickers = [f"{_prefixo(i)}{sufixos[i % len(sufixos)]}" for i in range(n_tickers)]
+
+    vol_diaria = rng.uniform(0.01, 0.04, n_tickers)
+    retornos = rng.standard_normal((n_pregoes, n_tickers)) * vol_diaria
+    close = rng.uniform(5, 300, n_tickers) * np.exp(np.cumsum(retornos, axis=0))
+    amplitude = np.abs(rng.standard_normal((n_pregoes, n_tickers))) * vol_diaria
+    high = close * (1 + amplitude)
+    low = close * (1 - amplitude)
+    open_ = np.clip(close * (1 + rng.standard_normal((n_pregoes, n_tickers)) * vol_diaria / 2), low, high)
+    volume = rng.lognormal(8, 2, (n_pregoes, n_tickers)).round()
+
+    # Tickers listados depois do início e pregões isolados sem negócio
+    com_lacuna = rng.random(n_tickers) < fracao_lacunas
+    inicio = np.where(com_lacuna, rng.integers(0, max(n_pregoes // 2, 1), n_tickers), 0)
+    vazio = np.arange(n_pregoes)[:, None] < inicio[None, :]
+    vazio |= com_lacuna[None, :] & (rng.random((n_pregoes, n_tickers)) < 0.02)
+
+    campos = {'Close': close, 'High': high, 'Low': low, 'Open': open_, 'Volume': volume}
+    blocos = {}
+    for nome, valores in campos.items():
+        valores = valores.copy()
+        valores[vazio] = np.nan
+        blocos[nome] = pd.DataFrame(valores, index=datas, columns=tickers)
+    return pd.concat(blocos, axis=1)
+
+def _prefixo(i):
+    letras = ""
+    for _ in range(4):
+        i, resto = divmod(i, 26)
+        letras = chr(ord('A') + resto) + letras
+    return letras
+
+def gerar_exterior(mercado, semente=0, fracao_desconto=0.1, desconto=0.05):
+    """Ativos de origem e USD/BRL coerentes com um mercado de gerar_mercado.
+
+    Cada BDR (menos ETFs, sufixo 39) ganha um ativo de origem com o ticker sem
+    o sufixo, cotado em dólar com uma paridade fixa e um ruído pequeno. No
+    último pregão, uma fração dos BDRs fica `desconto` abaixo do valor de
+    origem. Retorna (DataFrame no formato (campo, ticker) com "BRL=X", tickers com desconto).
+    """
+    rng = np.random.default_rng(semente)
+    close_bdr = mercado['Close'].ffill().bfill()
+    tickers = [t for t in close_bdr.columns if not t.endswith('39')]
+    datas = close_bdr.index
+
+    cambio = 5.2 * np.exp(np.cumsum(rng.standard_normal(len(datas)) * 0.006))
+    paridade = rng.choice([0.05, 0.1, 0.25, 1.0], len(tickers))
+    ruido = 1 + rng.standard_normal((len(datas), len(tickers))) * 0.002
+    origem = close_bdr[tickers].to_numpy() / (cambio[:, None] * paridade) * ruido
+
+    com_desconto = rng.random(len(tickers)) < fracao_desconto
+    origem[-1, com_desconto] /= 1 - desconto
+
+    close = pd.DataFrame(origem, index=datas, columns=[t[:-2] for t in tickers])
+    close["BRL=X"] = cambio
+    campos = {'Close': close, 'High': close * 1.005, 'Low': close * 0.995, 'Open': close, 'Volume': close * 0 + 1e6}
+    return pd.concat(campos, axis=1), [t for t, d in zip(tickers, com_desconto) if d]
@@ -1,23 +1,54 @@
-import pandas as pd
-import yfinance as yf
-import requests
 import os
+import sys
+import argparse
 import time
-import urllib.parse
 from datetime import datetime
-import pytz
+from functools import partial
+
+from nucleo.notificacao import URL_CALLMEBOT, BackendCallMeBot, Despachante, destinatarios_do_ambiente
 
 # --- CONFIGURAÇÕES ---
+# Validadas antes dos imports pesados (pandas, numpy, yfinance): sem as chaves
+# o bot falha em milissegundos, e com código de saída de erro no Actions.
 try:
     WHATSAPP_PHONE = os.environ["WHATSAPP_PHONE"]
     WHATSAPP_APIKEY = os.environ["WHATSAPP_APIKEY"]
     BRAPI_API_TOKEN = os.environ["BRAPI_API_TOKEN"]
-except KeyError:
-    print("Erro: Chaves de API não encontradas nas variáveis de ambiente.")
-    exit()
+    DESTINATARIOS = destinatarios_do_ambiente(WHATSAPP_PHONE, WHATSAPP_APIKEY)
+except KeyError as e:
+    print(f"Erro: variável de ambiente {e.args[0]} não encontrada.")
+    sys.exit(1)
+except ValueError as e:
+    print(f"Erro: WHATSAPP_PHONE/WHATSAPP_APIKEY inconsistentes ({e}).")
+    sys.exit(1)
+
+DIRETORIO_DADOS = os.environ.get("BDR_DADOS", "dados")
+MODO_COMPACTO = os.environ.get("BDR_COMPACTO") == "1"  # float32 em blocos, para runners com pouca memória
+CAMINHO_ALERTAS = os.path.join(DIRETORIO_DADOS, "alertas.sqlite")  # o que já foi enviado, para mandar só mudanças
+DIRETORIO_RETRATOS = os.path.join(DIRETORIO_DADOS, "retratos")  # resultado do dia, lido pelo app
+PARIDADE = os.environ.get("BDR_PARIDADE", "1") == "1"  # prêmio/desconto sobre o ativo de origem (EUA + câmbio)
+LIQUIDEZ = os.environ.get("BDR_LIQUIDEZ", "1") == "1"  # pré-filtro: ilíquidos nem são baixados nas próximas varreduras
+URL_WHATSAPP = os.environ.get("BDR_CALLMEBOT_URL", URL_CALLMEBOT)  # aponte para um ServidorFalso nos testes
+
+# --- IMPORTS PESADOS (só depois da validação) ---
+# yfinance e matplotlib não entram aqui: o primeiro é importado dentro do
+# download e o segundo não é usado pelo bot.
+import pandas as pd
+import pytz
+
+from nucleo.alertas import HistoricoAlertas, comparar
+from nucleo.agenda import ABERTURA_B3, FECHAMENTO_B3, FUSO_B3, proxima_varredura
+from nucleo.armazenamento import ArmazemOHLCV
+from nucleo.correlacao import deduplicar
+from nucleo.download import BaixadorEmLotes, baixar_yahoo
+from nucleo.instrumentacao import Instrumentos, perfil_inicializacao, resumo_inicializacao
+from nucleo.liquidez import FiltroLiquidez
+from nucleo.multiperiodo import CacheMultiperiodo
+from nucleo.paridade import LIMITE_DESCONTO, Paridades
+from nucleo.universo import carregar_universo
+from nucleo.varredura import PERIODO, PreviaIntradiaria, Retratos, varrer
 
-PERIODO = "1y"
-TERMINACOES_BDR = ('31', '32', '33', '34', '35', '39')
+CACHE_PERIODOS = CacheMultiperiodo()  # confirmação semanal/mensal por (período, última barra)
 
 # --- FUNÇÕES ---
 
@@ -25,158 +56,269 @@ def obter_hora_brasil():
     fuso = pytz.timezone('America/Sao_Paulo')
     return datetime.now(fuso).strftime('%d/%m/%Y %H:%M:%S')
 
-def enviar_whatsapp(mensagem):
-    print(f"Tentando enviar mensagem via GET...")
+def enviar_whatsapp(mensagem, destinatarios=None):
+    # mensagem: texto ou lista de blocos (cabeçalho, um por ativo, rodapé), dividida em partes se for longa
+    # WHATSAPP_PHONE/WHATSAPP_APIKEY aceitam vários destinatários separados por vírgula
+    # Devolve os telefones que receberam todas as partes
+    destinatarios = DESTINATARIOS if destinatarios is None else destinatarios
+    print(f"Enviando alerta para {len(destinatarios)} destinatário(s)...")
+    backend = BackendCallMeBot(url=URL_WHATSAPP)
     try:
-        # Codifica o texto para URL (transforma espaços em %20, etc)
-        texto_codificado = urllib.parse.quote(mensagem)
-        
-        # Garante que o telefone não tenha o +
-        phone_clean = WHATSAPP_PHONE.replace("+", "").strip()
-        
-        # URL (Estilo Azure/Navegador)
-        url = f"https://api.callmebot.com/whatsapp.php?phone={phone_clean}&text={texto_codificado}&apikey={WHATSAPP_APIKEY}"
-        
-        r = requests.get(url, timeout=30)
-        
-        # 200 = Sucesso | 201 = Na Fila (Sucesso) | 208 = Spam (Conectado, mas repetido)
-        if r.status_code == 200 or r.status_code == 201:
-            print("✅ Mensagem enviada com sucesso!")
-            return True
-        elif r.status_code == 208:
-            print("⚠️ Aviso: Bloqueio de Spam (208). Mensagem muito parecida com a anterior.")
-            print("✅ A CONEXÃO ESTÁ FUNCIONANDO! Só precisa esperar um pouco para enviar de novo.")
-            return True # Consideramos sucesso técnico
+        despachante = Despachante(backend, destinatarios)
+        despachante.enviar(mensagem)
+    finally:
+        backend.fechar()
+
+    for telefone, r in despachante.relatorio.items():
+        final = telefone[-4:]
+        if r['enviadas'] == r['partes']:
+            print(f"✅ ...{final}: {r['partes']} parte(s) enviada(s) em {r['tentativas']} tentativa(s)")
         else:
-            print(f"❌ Erro API CallMeBot: {r.status_code} - {r.text}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Erro de conexão: {e}")
-        return False
+            print(f"❌ ...{final}: {r['enviadas']}/{r['partes']} parte(s) | {'; '.join(r['falhas'])}")
+    return [telefone for telefone, r in despachante.relatorio.items() if r['enviadas'] == r['partes']]
 
 def obter_dados_brapi():
-    url = f"https://brapi.dev/api/quote/list?token={BRAPI_API_TOKEN}"
-    r = requests.get(url, timeout=30)
-    dados = r.json().get('stocks', [])
-    bdrs_raw = [d for d in dados if d['stock'].endswith(TERMINACOES_BDR)]
-    lista_tickers = [d['stock'] for d in bdrs_raw]
-    mapa_nomes = {d['stock']: d.get('name', d['stock']) for d in bdrs_raw}
-    return lista_tickers, mapa_nomes
-
-def buscar_dados(tickers):
-    if not tickers: return pd.DataFrame()
-    sa_tickers = [f"{t}.SA" for t in tickers]
-    df = yf.download(sa_tickers, period=PERIODO, auto_adjust=True, progress=False, timeout=120, threads=True)
-    
-    if df.empty: return pd.DataFrame()
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = pd.MultiIndex.from_tuples([(c[0], c[1].replace(".SA", "")) for c in df.columns])
-    
-    return df.dropna(axis=1, how='all')
+    # O bot roda uma vez por dia: a lista em cache vale 12h antes de revalidar
+    return carregar_universo(DIRETORIO_DADOS, token=BRAPI_API_TOKEN, ttl=12 * 3600)
 
-def calcular_tudo(df):
-    df_calc = df.copy()
-    tickers = df_calc.columns.get_level_values(1).unique()
-    resultados = []
-    
-    for ticker in tickers:
-        try:
-            df_ticker = df_calc.xs(ticker, axis=1, level=1).dropna()
-            if len(df_ticker) < 200: continue
-
-            close = df_ticker['Close']
-            high = df_ticker['High']
-            low = df_ticker['Low']
-            
-            last_close = close.iloc[-1]
-            prev_close = close.iloc[-2]
-            sma200 = close.rolling(200).mean().iloc[-1]
-            
-            queda_dia = ((last_close - prev_close) / prev_close) * 100
-            if queda_dia >= 0: continue
-            
-            tendencia_alta = last_close > sma200
-            
-            delta = close.diff()
-            ganho = delta.clip(lower=0).rolling(14).mean()
-            perda = -delta.clip(upper=0).rolling(14).mean()
-            rs = ganho / perda
-            rsi = 100 - (100 / (1 + rs))
-            last_rsi = rsi.iloc[-1]
-            
-            lowest_low = low.rolling(14).min()
-            highest_high = high.rolling(14).max()
-            stoch = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-            last_stoch = stoch.iloc[-1]
-            
-            is_index = ((100 - last_rsi) + (100 - last_stoch)) / 2
-            
-            sinais = []
-            if tendencia_alta: sinais.append("Trend Alta")
-            if last_rsi < 30: sinais.append("RSI Baixo")
-            if last_stoch < 20: sinais.append("Stoch Fundo")
-            
-            sma20 = close.rolling(20).mean()
-            std = close.rolling(20).std()
-            bb_lower = sma20 - (std * 2)
-            if last_close < bb_lower.iloc[-1] * 1.02: sinais.append("BB Suporte")
-
-            resultados.append({
-                'Ticker': ticker,
-                'Preco': last_close,
-                'Queda_Dia': queda_dia,
-                'IS': is_index,
-                'Tendencia_Alta': tendencia_alta,
-                'Sinais': ", ".join(sinais)
-            })
-        except Exception: continue
-        
-    return pd.DataFrame(resultados)
+def criar_armazem():
+    return ArmazemOHLCV(DIRETORIO_DADOS, baixador=BaixadorEmLotes(partial(baixar_yahoo, timeout=120, threads=False)))
 
-# --- EXECUÇÃO PRINCIPAL ---
+def criar_paridades():
+    if not PARIDADE: return None
+    return Paridades(DIRETORIO_DADOS, baixador=BaixadorEmLotes(partial(baixar_yahoo, timeout=120, threads=False, sufixo="")))
 
-if __name__ == "__main__":
-    print("🤖 Iniciando Bot BDR (Modo GET + Anti-Spam)...")
+def criar_liquidez():
+    return FiltroLiquidez(DIRETORIO_DADOS) if LIQUIDEZ else None
+
+def resumir_podados(podados):
+    if not podados: return
+    print(f"   🧹 {len(podados)} ativos fora pelo pré-filtro de liquidez: "
+          f"{', '.join(f'{t} ({motivo})' for t, motivo in sorted(podados.items())[:20])}")
+
+def resumir_lotes(relatorio):
+    # relatorio: do ArmazemOHLCV (atualizar inteira) ou do BaixadorEmLotes (uma chamada)
+    lotes = relatorio['lotes']
+    falhas = relatorio['falhas']
+    if lotes:
+        latencia = max(l['latencia_s'] for l in lotes)
+        print(f"   {len(lotes)} lotes | pior latência {latencia:.1f}s | {len(falhas)} ativos sem dados")
+    if falhas:
+        print(f"   Falhas: {', '.join(f'{t} ({motivo})' for t, motivo in sorted(falhas.items())[:20])}")
+
+def rotulo_mudanca(row):
+    if row['Novo']: return "🆕 novo"
+    partes = []
+    if row['Posicao'] != row['Posicao_Anterior']:
+        seta = "⬆️" if row['Posicao'] < row['Posicao_Anterior'] else "⬇️"
+        partes.append(f"{seta} {row['Posicao_Anterior']}º→{row['Posicao']}º")
+    if row['Score'] > row['Score_Anterior']:
+        partes.append(f"💪 score {row['Score_Anterior']}→{row['Score']}")
+    return " | ".join(partes)
+
+def montar_alerta(df_res, mapa_nomes, hora, linhas, sairam=(), titulo="BDR ALERT"):
+    # df_res: ranking completo; `linhas`: só os ativos do Top que mudaram (saída de comparar()).
+    # Devolve os blocos (cabeçalho, um por ativo, rodapé) para o despachante dividir se preciso.
+    qtd_strategy = df_res[df_res['Tendencia_Alta'] == True].shape[0]
+
+    cabecalho = f"🦅 *{titulo}*\n"
+    cabecalho += f"🗓️ {hora}\n"
+    cabecalho += f"🚨 *{len(df_res)}* Quedas | ⭐ *{qtd_strategy}* Estratégia | 🔁 *{len(linhas)}* mudanças no Top 10\n\n"
+    blocos = [cabecalho]
+
+    for _, row in linhas.iterrows():
+        nome = mapa_nomes.get(row['Ticker'], row['Ticker']).split()[0]
+        icon = "⭐" if row['Tendencia_Alta'] else "🔻"
+        sinais_texto = row['Sinais'] if row['Sinais'] else "-"
+
+        msg = f"{icon} *{row['Posicao']}º {row['Ticker']}* - {nome} ({rotulo_mudanca(row)})\n"
+        msg += f"   📉 {row['Queda_Dia']:.1f}% | 💵 R${row['Preco']:.2f}\n"
+        msg += f"   📊 I.S. {row['IS']:.0f} | {sinais_texto}\n"
+        if row['Tamanho_Grupo'] > 1:
+            msg += f"   🧩 Grupo de {row['Tamanho_Grupo']} ativos caiu {row['Queda_Grupo']:.1f}% | residual {row['Queda_Residual']:+.1f}%\n"
+        if pd.notna(row['Premio']):
+            msg += f"   🌎 Origem {row['Var_Origem']:+.1f}% em R$ | prêmio {row['Premio']:+.1f}%\n"
+        if pd.notna(row['RSI_Semanal']):
+            mensal = f" | mensal {row['RSI_Mensal']:.0f}" if pd.notna(row['RSI_Mensal']) else ""
+            msg += f"   🗓️ RSI semanal {row['RSI_Semanal']:.0f}{mensal}\n"
+        msg += "   - - - - - - - -\n"
+        blocos.append(msg)
+
+    if sairam: blocos.append(f"\n↩️ Saíram do Top 10: {', '.join(sairam)}\n")
+    blocos.append("\n🔗 _Ver gráficos no App_")
+    return blocos
+
+def alertar_mudancas(df_res, mapa_nomes, inst, titulo="BDR ALERT"):
+    # Compara o Top 10 (um ativo por grupo de correlação) com o último envio a cada destinatário
+    # e manda só o que mudou para ele; quem tem o mesmo último envio recebe a mesma mensagem de uma vez
+    historico = HistoricoAlertas(CAMINHO_ALERTAS)
     hora = obter_hora_brasil()
-    
+    with inst.etapa("comparar_envio") as etapa:
+        atual = deduplicar(ordenar(df_res), 10)
+        envios = {}
+        for destinatario in DESTINATARIOS:
+            anterior, enviado_em = historico.ultimo(destinatario['telefone'])
+            top, sairam = comparar(atual, anterior)
+            mudancas = top[top['Mudou']]
+            if mudancas.empty: continue
+            cabecalho = titulo + (" - Atualização" if enviado_em is not None and enviado_em.date() == datetime.now().date() else "")
+            mensagem = tuple(montar_alerta(df_res, mapa_nomes, hora, mudancas, sairam, cabecalho))
+            envios.setdefault(mensagem, (top, []))[1].append(destinatario)
+        etapa['linhas'] = len(envios)
+    if not envios:
+        print("Top 10 igual ao último alerta; nada a enviar.")
+        return
+
+    with inst.etapa("whatsapp", linhas=sum(len(d) for _, d in envios.values())):
+        for mensagem, (top, destinatarios) in envios.items():
+            for telefone in enviar_whatsapp(list(mensagem), destinatarios):
+                historico.registrar(top, destinatario=telefone)
+
+def ordenar(df_res):
+    # Dentro de cada grupo de tendência, BDRs com desconto sobre a origem vêm antes:
+    # a queda deles não é explicada pelo câmbio nem pelo ativo lá fora
+    desconto = df_res['Premio'] <= LIMITE_DESCONTO
+    return (df_res.assign(Desconto=desconto)
+            .sort_values(by=['Tendencia_Alta', 'Desconto', 'Queda_Dia'], ascending=[False, False, True])
+            .drop(columns='Desconto'))
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+def executar(inst):
     print("1. Buscando lista na BRAPI...")
-    tickers, mapa_nomes = obter_dados_brapi()
+    with inst.etapa("brapi") as etapa:
+        universo = obter_dados_brapi()
+        etapa['linhas'] = len(universo)
     
-    print(f"2. Baixando dados de {len(tickers)} ativos via Yahoo...")
-    df_market = buscar_dados(tickers)
+    print(f"2. Baixando dados de {len(universo)} ativos via Yahoo e calculando indicadores...")
+    armazem = criar_armazem()
+    varredura = varrer(universo, armazem, inst, compacto=MODO_COMPACTO, cache_periodos=CACHE_PERIODOS,
+                       paridades=criar_paridades(), liquidez=criar_liquidez())
+    resumir_lotes(armazem.relatorio)
+    if varredura is not None: resumir_podados(varredura.podados)
     
-    if not df_market.empty:
-        print("3. Calculando indicadores...")
-        df_res = calcular_tudo(df_market)
-        
-        if not df_res.empty:
-            df_res = df_res.sort_values(by=['Tendencia_Alta', 'Queda_Dia'], ascending=[False, True])
-            top10 = df_res.head(10)
-            qtd_strategy = df_res[df_res['Tendencia_Alta'] == True].shape[0]
-            
-            # --- ID ÚNICO NO INÍCIO ---
-            # Colocamos o timestamp no topo para o CallMeBot ver que é texto novo logo de cara
-            timestamp_id = int(time.time())
-            
-            msg = f"🦅 *BDR ALERT* (ID:{timestamp_id})\n"
-            msg += f"🗓️ {hora}\n"
-            msg += f"🚨 *{len(df_res)}* Quedas | ⭐ *{qtd_strategy}* Estratégia\n\n"
-            
-            for _, row in top10.iterrows():
-                nome = mapa_nomes.get(row['Ticker'], row['Ticker']).split()[0]
-                icon = "⭐" if row['Tendencia_Alta'] else "🔻"
-                sinais_texto = row['Sinais'] if row['Sinais'] else "-"
-                
-                msg += f"{icon} *{row['Ticker']}* - {nome}\n"
-                msg += f"   📉 {row['Queda_Dia']:.1f}% | 💵 R${row['Preco']:.2f}\n"
-                msg += f"   📊 I.S. {row['IS']:.0f} | {sinais_texto}\n"
-                msg += "   - - - - - - - -\n"
-            
-            msg += "\n🔗 _Ver gráficos no App_"
-            
-            enviar_whatsapp(msg)
+    if varredura is not None:
+        # O app abre este retrato em vez de refazer a varredura
+        Retratos(DIRETORIO_RETRATOS).salvar(varredura)
+        if not varredura.resultados.empty:
+            alertar_mudancas(varredura.resultados, universo.mapa_nomes, inst)
         else:
             print("Nenhuma oportunidade encontrada hoje.")
     else:
         print("Erro ao baixar dados do mercado.")
+
+# --- MODO DAEMON ---
+
+class BotResidente:
+    """Estado quente do modo daemon.
+
+    Uma vez por dia: lista da BRAPI, pré-filtro de liquidez, histórico do
+    armazém (só o delta vem do Yahoo) e a prévia intradiária aquecida até o
+    último pregão fechado.
+    A cada varredura intradiária: baixa só a barra de hoje, roda a triagem
+    em O(tickers) e alerta apenas o que mudou desde o último envio.
+    """
+
+    def __init__(self):
+        self.dia = None
+        self.armazem = criar_armazem()
+        self.paridades = criar_paridades()
+        self.liquidez = criar_liquidez()
+
+    @property
+    def baixador(self):
+        return self.armazem.baixador
+
+    def aquecer(self, hoje, inst):
+        print(f"☀️ Aquecendo estado para {hoje:%d/%m/%Y}...")
+        with inst.etapa("brapi") as etapa:
+            self.universo = obter_dados_brapi()
+            etapa['linhas'] = len(self.universo)
+        tickers, podados = list(self.universo.tickers), {}
+        if self.liquidez is not None:
+            with inst.etapa("pre_filtro", linhas=len(tickers)) as etapa:
+                tickers, podados = self.liquidez.selecionar(tickers, hoje)
+                etapa['linhas'] = len(tickers)
+        with inst.etapa("download", linhas=len(tickers)):
+            # DataFrame sempre: o histórico é fatiado por data e concatenado com a barra do dia
+            df = self.armazem.atualizar(tickers, PERIODO)
+            resumir_lotes(self.armazem.relatorio)
+            if self.liquidez is not None and not df.empty: self.liquidez.registrar_sem_dados(self.armazem.relatorio['falhas'], hoje)
+        with inst.etapa("aquecimento") as etapa:
+            historico = df.loc[df.index < hoje] if not df.empty else df
+            if self.liquidez is not None and not historico.empty:
+                historico, reprovados = self.liquidez.podar(historico, hoje)
+                podados.update(reprovados)
+            resumir_podados(podados)
+            self.previa = PreviaIntradiaria(historico, podados) if not historico.empty else None
+            etapa['linhas'] = len(historico.index)
+        self.dia = hoje
+
+    def varrer(self, inst, hoje=None):
+        hoje = pd.Timestamp(hoje if hoje is not None else datetime.now(FUSO_B3).date()).normalize()
+        if self.dia != hoje: self.aquecer(hoje, inst)
+        if self.previa is None:
+            print("Erro ao baixar dados do mercado.")
+            return
+
+        with inst.etapa("download_delta", linhas=len(self.previa.tickers)):
+            delta = self.baixador(list(self.previa.tickers), inicio=hoje)
+            resumir_lotes(self.baixador.relatorio)
+        if delta.empty or delta.index.max() < hoje:
+            print("Sem barra de hoje no Yahoo (pré-abertura ou feriado).")
+            return
+        barra = delta.loc[[delta.index.max()]]
+
+        with inst.etapa("triagem") as etapa:
+            varredura = self.previa.varrer(barra, self.universo.nomes_curtos, self.paridades)
+            etapa['linhas'] = len(varredura.resultados)
+        Retratos(DIRETORIO_RETRATOS).salvar(varredura)
+        if varredura.resultados.empty:
+            print("Nenhuma queda no momento.")
+            return
+
+        alertar_mudancas(varredura.resultados, self.universo.mapa_nomes, inst)
+
+def rodar_daemon(intervalo, abertura, fechamento, tempos_json=None):
+    print(f"🕒 Modo daemon: a cada {intervalo} min, das {abertura} às {fechamento} (Brasília), dias úteis")
+    residente = BotResidente()
+    while True:
+        alvo = proxima_varredura(datetime.now(FUSO_B3), intervalo, abertura, fechamento)
+        print(f"⏳ Próxima varredura: {alvo:%d/%m %H:%M}")
+        time.sleep(max(0.0, (alvo - datetime.now(FUSO_B3)).total_seconds()))
+
+        inst = Instrumentos()
+        try:
+            residente.varrer(inst)
+        except Exception as e:
+            # Uma varredura ruim (rede, Yahoo) não derruba o daemon; o estado quente continua valendo
+            print(f"❌ Varredura falhou: {type(e).__name__}: {e}")
+        print(inst.resumo())
+        if tempos_json: inst.exportar_json(tempos_json)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bot BDR: varredura diária com alerta no WhatsApp")
+    parser.add_argument("--tempos-json", help="grava os tempos de cada etapa neste arquivo JSON")
+    parser.add_argument("--perfil", choices=["cprofile", "pyinstrument"], help="captura um perfil completo da execução")
+    parser.add_argument("--daemon", action="store_true", help="fica residente e varre durante o pregão da B3")
+    parser.add_argument("--intervalo", type=int, default=15, help="minutos entre varreduras no modo daemon")
+    parser.add_argument("--abertura", default=ABERTURA_B3, help="início das varreduras (HH:MM, Brasília)")
+    parser.add_argument("--fechamento", default=FECHAMENTO_B3, help="última varredura (HH:MM, Brasília)")
+    parser.add_argument("--profile-startup", action="store_true", help="mede o tempo de import a frio do bot e sai")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        print("🧊 Tempo de import a frio (python -X importtime):")
+        print(resumo_inicializacao(*perfil_inicializacao("bot")))
+    elif args.daemon:
+        rodar_daemon(args.intervalo, args.abertura, args.fechamento, args.tempos_json)
+    else:
+        print("🤖 Iniciando Bot BDR (Modo GET + Anti-Spam)...")
+        inst = Instrumentos(perfil=args.perfil)
+        with inst.perfilar():
+            executar(inst)
+
+        print("⏱️ Tempos por etapa:")
+        print(inst.resumo())
+        if inst.relatorio_perfil: print(inst.relatorio_perfil)
+        if args.tempos_json: inst.exportar_json(args.tempos_json)
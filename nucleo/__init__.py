@@ -0,0 +1 @@
+# Núcleo compartilhado entre o app (Streamlit) e o bot (WhatsApp).
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+import pytz
+
+# Agenda do modo daemon do bot: varreduras a cada N minutos dentro do pregão
+# da B3 (horário de Brasília), só em dias úteis. Feriados não são tratados
+# aqui: num feriado o Yahoo não devolve barra do dia e a varredura é pulada.
+
+FUSO_B3 = pytz.timezone('America/Sao_Paulo')
+ABERTURA_B3 = "10:00"
+FECHAMENTO_B3 = "17:00"
+
+def _horario(dia, hhmm):
+    hora, minuto = map(int, hhmm.split(":"))
+    return FUSO_B3.localize(datetime(dia.year, dia.month, dia.day, hora, minuto))
+
+def horarios_do_dia(dia, intervalo_min, abertura=ABERTURA_B3, fechamento=FECHAMENTO_B3):
+    # Abertura, abertura + intervalo, ... até o fechamento (inclusive)
+    if dia.weekday() >= 5: return []
+    inicio, fim = _horario(dia, abertura), _horario(dia, fechamento)
+    passos = int((fim - inicio).total_seconds() // (intervalo_min * 60))
+    return [inicio + timedelta(minutes=intervalo_min * i) for i in range(passos + 1)]
+
+def proxima_varredura(agora, intervalo_min, abertura=ABERTURA_B3, fechamento=FECHAMENTO_B3):
+    """Primeiro horário agendado estritamente depois de `agora` (datetime com fuso)."""
+    agora = agora.astimezone(FUSO_B3)
+    for dias in range(8):
+        dia = (agora + timedelta(days=dias)).date()
+        for horario in horarios_do_dia(dia, intervalo_min, abertura, fechamento):
+            if horario > agora: return horario
+    raise ValueError("Nenhum horário de varredura na próxima semana")
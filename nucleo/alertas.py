@@ -0,0 +1,93 @@
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Histórico dos alertas enviados (SQLite em disco, junto do armazém). Cada
+# envio guarda o Top N com posição e score; o envio seguinte é comparado com
+# o último e só o que mudou vai para a mensagem: ativos novos, mudanças de
+# posição e scores que subiram. Isso substitui o ID de timestamp que só
+# servia para driblar o filtro de spam do CallMeBot.
+#
+# O histórico é por destinatário: se o envio falha só para alguns, quem recebeu
+# fica registrado e não recebe a mesma mensagem de novo na próxima rodada.
+# Envios antigos, de antes dessa coluna, ficam com destinatário vazio e valem
+# para quem ainda não tem envio próprio.
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS envios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    enviado_em TEXT NOT NULL,
+    destinatario TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS itens (
+    envio_id INTEGER NOT NULL REFERENCES envios(id),
+    ticker TEXT NOT NULL,
+    posicao INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    sinais TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS itens_envio ON itens(envio_id);
+"""
+
+COLUNA_DESTINATARIO = "ALTER TABLE envios ADD COLUMN destinatario TEXT NOT NULL DEFAULT ''"
+
+class HistoricoAlertas:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with self._conectar() as con:
+            con.executescript(ESQUEMA)
+            colunas = [c[1] for c in con.execute("PRAGMA table_info(envios)")]
+            if 'destinatario' not in colunas: con.execute(COLUNA_DESTINATARIO)
+
+    @contextmanager
+    def _conectar(self):
+        # O `with` da conexão só faz commit/rollback; closing() é que a fecha (o bot residente abre uma por ciclo)
+        with closing(sqlite3.connect(self.caminho)) as con, con:
+            yield con
+
+    def ultimo(self, destinatario=""):
+        # Top do último envio ao destinatário: DataFrame (Ticker, Posicao, Score, Sinais) e a data do envio
+        with self._conectar() as con:
+            linha = con.execute("SELECT id, enviado_em FROM envios WHERE destinatario IN (?, '') "
+                                "ORDER BY destinatario = ? DESC, id DESC LIMIT 1", (destinatario, destinatario)).fetchone()
+            if linha is None: return pd.DataFrame(columns=['Ticker', 'Posicao', 'Score', 'Sinais']), None
+            itens = con.execute("SELECT ticker, posicao, score, sinais FROM itens WHERE envio_id = ? ORDER BY posicao",
+                                (linha[0],)).fetchall()
+        return pd.DataFrame(itens, columns=['Ticker', 'Posicao', 'Score', 'Sinais']), datetime.fromisoformat(linha[1])
+
+    def registrar(self, top, enviado_em=None, destinatario=""):
+        # top: ranking na ordem enviada, com Ticker, Score e Sinais
+        enviado_em = enviado_em or datetime.now()
+        with self._conectar() as con:
+            envio_id = con.execute("INSERT INTO envios (enviado_em, destinatario) VALUES (?, ?)",
+                                   (enviado_em.isoformat(), destinatario)).lastrowid
+            con.executemany("INSERT INTO itens (envio_id, ticker, posicao, score, sinais) VALUES (?, ?, ?, ?, ?)", [
+                (envio_id, t, i, int(s), sinais)
+                for i, (t, s, sinais) in enumerate(zip(top['Ticker'], top['Score'], top['Sinais']), 1)
+            ])
+
+def comparar(top, anterior):
+    """Marca o que mudou no Top atual em relação ao último envio.
+
+    Devolve (top com as colunas Novo/Posicao_Anterior/Score_Anterior/Mudou,
+    tickers que saíram do Top). Tudo com índices e arrays, sem loop por ativo.
+    """
+    top = top.reset_index(drop=True)
+    posicao = np.arange(1, len(top) + 1)
+    idx = pd.Index(anterior['Ticker']).get_indexer(top['Ticker'])
+    novo = idx < 0
+
+    pos_anterior = np.where(novo, 0, anterior['Posicao'].to_numpy(dtype=np.int64)[idx] if len(anterior) else 0)
+    score_anterior = np.where(novo, 0, anterior['Score'].to_numpy(dtype=np.int64)[idx] if len(anterior) else 0)
+    mudou_posicao = ~novo & (pos_anterior != posicao)
+    subiu_score = ~novo & (top['Score'].to_numpy() > score_anterior)
+
+    top = top.assign(Posicao=posicao, Novo=novo, Posicao_Anterior=pos_anterior, Score_Anterior=score_anterior,
+                     Mudou=novo | mudou_posicao | subiu_score)
+    sairam = sorted(set(anterior['Ticker']) - set(top['Ticker']))
+    return top, sairam
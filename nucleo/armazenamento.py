@@ -0,0 +1,197 @@
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from nucleo.compacto import MercadoCompacto
+from nucleo.download import SEM_DADOS, baixar_yahoo, inicio_do_periodo
+
+# Armazém local de OHLCV em disco.
+#
+# Layout no diretório:
+#   indice.json          -> campos, tickers, datas e o nome do arquivo de dados atual
+#   ohlcv-<id>.npy       -> array float64 (campo, data, ticker), lido via memory-map
+#
+# Cada gravação escreve um .npy novo e troca o indice.json atomicamente, então um
+# leitor (app) nunca vê o arquivo pela metade enquanto o bot grava.
+
+CAMPOS_OHLCV = ('Close', 'High', 'Low', 'Open', 'Volume')
+SOBREPOSICAO = 3          # pregões já gravados que são baixados de novo a cada delta
+TOLERANCIA_AJUSTE = 1e-4  # diferença relativa que indica split/dividendo (preço ajustado mudou)
+
+def _sobrepor(novo, atual):
+    # novo.combine_first(atual) em NumPy: o combine_first do pandas faz um where por coluna e,
+    # com centenas de tickers, levava segundos a cada delta (no daemon, a cada varredura)
+    indice, colunas = novo.index.union(atual.index), novo.columns.union(atual.columns)
+    n = novo.reindex(index=indice, columns=colunas).to_numpy(dtype=float)
+    a = atual.reindex(index=indice, columns=colunas).to_numpy(dtype=float)
+    return pd.DataFrame(np.where(np.isnan(n), a, n), index=indice, columns=colunas)
+
+class ArmazemOHLCV:
+    def __init__(self, diretorio, baixador=baixar_yahoo, retencao="2y"):
+        self.diretorio = diretorio
+        self.baixador = baixador
+        self.retencao = retencao
+        self.relatorio = {'falhas': {}, 'lotes': []}  # da última atualizar(), somando delta e download cheio
+
+    # --- LEITURA ---
+
+    def _ler_indice(self):
+        caminho = os.path.join(self.diretorio, "indice.json")
+        if not os.path.exists(caminho): return None
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _selecionar(self, indice, tickers, periodo, hoje):
+        blocos = np.load(os.path.join(self.diretorio, indice['arquivo']), mmap_mode='r')
+        datas = pd.DatetimeIndex(pd.to_datetime(indice['datas']))
+        todos = pd.Index(indice['tickers'])
+
+        linhas = np.ones(len(datas), dtype=bool)
+        if periodo is not None:
+            linhas = datas >= inicio_do_periodo(periodo, hoje if hoje is not None else pd.Timestamp.now())
+        pos = np.arange(len(todos)) if tickers is None else todos.get_indexer(pd.Index(tickers).intersection(todos))
+
+        # Só a fatia pedida sai do memory-map
+        selecao = blocos[:, linhas][:, :, pos]
+        tem_dados = ~np.isnan(selecao[0]).all(axis=0)
+        return selecao[:, :, tem_dados], datas[linhas], todos[pos][tem_dados]
+
+    def carregar(self, tickers=None, periodo=None, hoje=None):
+        indice = self._ler_indice()
+        if indice is None: return pd.DataFrame()
+
+        selecao, datas, tickers = self._selecionar(indice, tickers, periodo, hoje)
+        n_campos, n_datas, n_tickers = selecao.shape
+        colunas = pd.MultiIndex.from_product([indice['campos'], tickers])
+        return pd.DataFrame(selecao.transpose(1, 0, 2).reshape(n_datas, n_campos * n_tickers),
+                            index=datas, columns=colunas)
+
+    def carregar_compacto(self, tickers=None, periodo=None, hoje=None):
+        # Direto do memory-map para float32/int64, sem passar pelo DataFrame largo
+        indice = self._ler_indice()
+        if indice is None: return MercadoCompacto.de_blocos([], [], [], np.empty((0, 0, 0)))
+
+        selecao, datas, tickers = self._selecionar(indice, tickers, periodo, hoje)
+        return MercadoCompacto.de_blocos(indice['campos'], datas, tickers, selecao)
+
+    # --- GRAVAÇÃO ---
+
+    def _gravar(self, df, inicio):
+        os.makedirs(self.diretorio, exist_ok=True)
+        anterior = self._ler_indice()
+
+        campos = [c for c in CAMPOS_OHLCV if c in df.columns.get_level_values(0)]
+        tickers = list(df.columns.get_level_values(1).unique())
+        colunas = pd.MultiIndex.from_product([campos, tickers])
+        blocos = df.reindex(columns=colunas).to_numpy(dtype=np.float64)
+        blocos = blocos.reshape(len(df.index), len(campos), len(tickers)).transpose(1, 0, 2)
+
+        arquivo = f"ohlcv-{uuid.uuid4().hex[:12]}.npy"
+        np.save(os.path.join(self.diretorio, arquivo), np.ascontiguousarray(blocos))
+
+        indice = {
+            'arquivo': arquivo,
+            'campos': campos,
+            'tickers': tickers,
+            'datas': [d.strftime('%Y-%m-%d') for d in df.index],
+            'inicio': pd.Timestamp(inicio).strftime('%Y-%m-%d'),
+        }
+        temporario = os.path.join(self.diretorio, f"indice.json.{arquivo}")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(indice, f)
+        os.replace(temporario, os.path.join(self.diretorio, "indice.json"))
+
+        if anterior and anterior['arquivo'] != arquivo:
+            try: os.remove(os.path.join(self.diretorio, anterior['arquivo']))
+            except OSError: pass
+
+    # --- ATUALIZAÇÃO INCREMENTAL ---
+
+    def atualizar(self, tickers, periodo, hoje=None, compacto=False):
+        """Baixa só os pregões novos e devolve o histórico de `periodo` para `tickers`.
+
+        Tickers ainda não armazenados (ou cujo preço ajustado mudou no trecho
+        sobreposto) são baixados por inteiro; os demais recebem apenas o delta.
+        Com `compacto=True` devolve um MercadoCompacto em vez do DataFrame.
+        Tickers que falharam (ver self.relatorio) ficam fora do retorno: um
+        conhecido cujo delta falhou teria só as barras antigas do disco.
+        """
+        self.relatorio = {'falhas': {}, 'lotes': []}
+        hoje = pd.Timestamp(hoje if hoje is not None else pd.Timestamp.now()).normalize()
+        inicio_pedido = inicio_do_periodo(periodo, hoje)
+
+        indice = self._ler_indice()
+        atual = self.carregar() if indice else pd.DataFrame()
+        armazenados = set(atual.columns.get_level_values(1)) if not atual.empty else set()
+
+        # Histórico gravado não cobre o período pedido (ex.: app gravou 6mo, bot pede 1y)
+        if indice and pd.Timestamp(indice['inicio']) > inicio_pedido + pd.Timedelta(days=7):
+            armazenados = set()
+            atual = pd.DataFrame()
+
+        conhecidos = [t for t in tickers if t in armazenados]
+        completos = [t for t in tickers if t not in armazenados]
+        partes = []
+
+        if conhecidos:
+            ultima = atual.index.max()
+            desde = atual.index[max(len(atual.index) - SOBREPOSICAO, 0)]
+            # Ticker que ficou fora das últimas atualizações (pré-filtro de liquidez) teria um
+            # buraco antes de `desde`: vai por inteiro
+            sem_recentes = atual['Close'].loc[desde:, conhecidos].isna().all()
+            defasados = list(sem_recentes.index[sem_recentes])
+            if defasados:
+                completos += defasados
+                conhecidos = list(sem_recentes.index[~sem_recentes])
+                atual = atual.drop(columns=defasados, level=1)
+            delta = self._baixar(conhecidos, inicio=desde) if conhecidos else pd.DataFrame()
+            if not delta.empty:
+                ajustados = self._tickers_ajustados(atual, delta, ultima)
+                if ajustados:
+                    completos += ajustados
+                    atual = atual.drop(columns=ajustados, level=1)
+                    delta = delta.drop(columns=ajustados, level=1)
+                partes.append(delta)
+
+        if completos:
+            cheio = self._baixar(completos, periodo=periodo)
+            if not cheio.empty: partes.append(cheio)
+
+        if partes:
+            novo = pd.concat(partes, axis=1) if len(partes) > 1 else partes[0]
+            combinado = _sobrepor(novo, atual) if not atual.empty else novo
+            combinado = combinado.sort_index()
+            limite = min(inicio_do_periodo(self.retencao, hoje), inicio_pedido)
+            combinado = combinado.loc[combinado.index >= limite]
+            cobertura = pd.Timestamp(indice['inicio']) if armazenados else inicio_pedido
+            self._gravar(combinado, max(cobertura, limite))
+
+        entregues = [t for t in tickers if t not in self.relatorio['falhas']]
+        if compacto: return self.carregar_compacto(entregues, periodo=periodo, hoje=hoje)
+        return self.carregar(entregues, periodo=periodo, hoje=hoje)
+
+    def _baixar(self, tickers, **parametros):
+        # Junta o relatório de cada chamada ao baixador (o BaixadorEmLotes o refaz a cada chamada)
+        df = self.baixador(tickers, **parametros)
+        relatorio = getattr(self.baixador, 'relatorio', {})
+        recebidos = set(df.columns.get_level_values(1)) if not df.empty else set()
+        falhas = dict(relatorio.get('falhas', {}))
+        falhas.update({t: SEM_DADOS for t in tickers if t not in recebidos and t not in falhas})
+        self.relatorio['falhas'].update(falhas)
+        self.relatorio['lotes'] += relatorio.get('lotes', [])
+        return df
+
+    def _tickers_ajustados(self, atual, delta, ultima):
+        # O último pregão gravado pode ter sido um candle parcial, então fica fora da comparação.
+        comuns = delta.index.intersection(atual.index)
+        comuns = comuns[comuns < ultima]
+        if len(comuns) == 0 or 'Close' not in delta.columns.get_level_values(0): return []
+
+        tickers = delta['Close'].columns.intersection(atual['Close'].columns)
+        antes = atual['Close'].loc[comuns, tickers]
+        depois = delta['Close'].loc[comuns, tickers]
+        diferenca = ((antes - depois).abs() / antes.abs()).max()
+        return list(diferenca[diferenca > TOLERANCIA_AJUSTE].index)
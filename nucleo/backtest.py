@@ -0,0 +1,165 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from nucleo.indicadores import alinhar_validos, calcular_blocos, para_blocos
+from nucleo.triagem import MIN_PREGOES, ORDEM_POTENCIAL, classificar, pontuar
+
+# Backtest vetorizado do score de reversão e do I.S.: as regras de gerar_sinal
+# são avaliadas em todas as datas e tickers de uma vez (blocos datas x
+# tickers) e cada sinal é comparado com o retorno e o drawdown dos N pregões
+# seguintes. Nenhum loop por dia: só um loop curto por horizonte.
+#
+# Como na varredura, os indicadores de cada ticker são calculados na própria
+# série sem lacunas (alinhar_validos) e depois voltam às datas originais.
+# alinhar_ohlcv() e elegibilidade() também servem à otimização de parâmetros,
+# que assim mede exatamente as regras do backtest, só com outras janelas.
+
+HORIZONTES = (1, 5, 10, 20)
+JANELA_FIBO = 252  # ~1 ano, o mesmo histórico que a varredura usa para a máxima/mínima
+FAIXAS_IS = [0, 40, 60, 75, 100.0001]
+ROTULOS_IS = ["0-40", "40-60", "60-75", "75-100"]
+
+def alinhar_ohlcv(df):
+    """Série sem lacunas de cada ticker e o caminho de volta às datas originais.
+
+    Retorna (alinhado, voltar): `alinhado` é o alinhar_validos(df) e
+    voltar(bloco) leva um bloco datas x tickers calculado sobre ele de volta ao
+    calendário, com NaN nas datas em que o ticker não tem pregão completo.
+    """
+    _, tickers, datas, blocos = para_blocos(df)
+    valido = ~np.isnan(blocos).any(axis=0)
+    ordem = np.argsort(valido, axis=0, kind='stable')  # a mesma permutação de alinhar_blocos
+    alinhado, _ = alinhar_validos(df)
+
+    def voltar(bloco):
+        original = np.full(valido.shape, np.nan)
+        np.put_along_axis(original, ordem, bloco.reindex(columns=tickers).to_numpy(dtype=float), axis=0)
+        return pd.DataFrame(np.where(valido, original, np.nan), index=datas, columns=tickers)
+
+    return alinhado, voltar
+
+def elegibilidade(df, indicadores, queda_dia, janela_fibo=JANELA_FIBO):
+    """Pregões elegíveis e a Fibonacci 61.8%, nas datas originais.
+
+    Elegível: pregão completo (OHLCV e `indicadores`, como as linhas que sobram
+    no dropna da triagem), depois de MIN_PREGOES pregões completos e com queda
+    no dia. Retorna (elegivel, fibo_618).
+    """
+    close = df['Close']
+    valido = close.notna()
+    for bloco in [df[campo] for campo in df.columns.get_level_values(0).unique()] + list(indicadores):
+        valido &= bloco.notna()
+
+    # Fibonacci 61.8% sobre a máxima/mínima dos últimos `janela_fibo` pregões válidos
+    maxima = df['High'].where(valido).rolling(janela_fibo, min_periods=1).max()
+    minima = df['Low'].where(valido).rolling(janela_fibo, min_periods=1).min()
+    fibo_618 = minima + ((maxima - minima) * 0.618)
+
+    historico = valido.cumsum() >= MIN_PREGOES
+    return valido & historico & (queda_dia < 0), fibo_618
+
+def calcular_sinais(df, janela_fibo=JANELA_FIBO):
+    """Score, classificação e I.S. para cada (data, ticker), só nos dias de queda.
+
+    Retorna um dict de DataFrames datas x tickers: score, potencial, is, elegivel.
+    """
+    close = df['Close']
+    alinhado, voltar = alinhar_ohlcv(df)
+    blocos = {nome: voltar(bloco).reindex(columns=close.columns) for nome, bloco in calcular_blocos(alinhado).items()}
+    queda_dia = voltar(alinhado['Close'].pct_change(fill_method=None) * 100).reindex(columns=close.columns)
+    elegivel, fibo_618 = elegibilidade(df, blocos.values(), queda_dia, janela_fibo)
+
+    _, score = pontuar(close, blocos['RSI14'], blocos['Stoch_K'], blocos['MACD_Hist'], blocos['BB_Lower'], fibo_618)
+    is_index = ((100 - blocos['RSI14']) + (100 - blocos['Stoch_K'])) / 2
+
+    return {
+        'score': pd.DataFrame(score, index=close.index, columns=close.columns),
+        'potencial': pd.DataFrame(classificar(score), index=close.index, columns=close.columns),
+        'is': is_index,
+        'elegivel': elegivel,
+    }
+
+def retornos_futuros(df, horizonte):
+    # Entrada no fechamento do dia do sinal; saída no fechamento N pregões depois.
+    close = df['Close']
+    retorno = close.shift(-horizonte) / close - 1
+    # Pior mínima dentro da janela à frente (pregões 1..N), relativa à entrada
+    minima_futura = df['Low'][::-1].rolling(horizonte, min_periods=horizonte).min()[::-1].shift(-1)
+    drawdown = minima_futura / close - 1
+    return retorno, drawdown
+
+def _agregar(grupos, rotulos, retorno, drawdown, mascara):
+    # Estatísticas por grupo via bincount sobre os valores achatados
+    validos = mascara & np.isfinite(retorno) & np.isfinite(drawdown)
+    codigos = grupos[validos]
+    r = retorno[validos]
+    d = drawdown[validos]
+    k = len(rotulos)
+
+    n = np.bincount(codigos, minlength=k)
+    soma = np.bincount(codigos, weights=r, minlength=k)
+    acertos = np.bincount(codigos, weights=(r > 0), minlength=k)
+    soma_dd = np.bincount(codigos, weights=d, minlength=k)
+    pior_dd = np.full(k, np.inf)
+    np.minimum.at(pior_dd, codigos, d)
+    pior_dd = np.where(n > 0, pior_dd, np.nan)
+    mediana = np.array([np.median(r[codigos == g]) if n[g] else np.nan for g in range(k)])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'grupo': rotulos,
+            'sinais': n,
+            'retorno_medio_%': soma / n * 100,
+            'retorno_mediano_%': mediana * 100,
+            'acerto_%': acertos / n * 100,
+            'drawdown_medio_%': soma_dd / n * 100,
+            'pior_drawdown_%': pior_dd * 100,
+        })
+
+def rodar_backtest(df, horizontes=HORIZONTES, janela_fibo=JANELA_FIBO):
+    """Tabela por horizonte x faixa (Potencial e I.S.) com retorno, acerto e drawdown."""
+    sinais = calcular_sinais(df, janela_fibo)
+    elegivel = sinais['elegivel'].to_numpy()
+
+    potencial = sinais['potencial'].to_numpy()
+    codigo_potencial = np.zeros(potencial.shape, dtype=np.int64)
+    for i, nome in enumerate(ORDEM_POTENCIAL):
+        codigo_potencial[potencial == nome] = i
+    codigo_is = np.clip(np.digitize(np.nan_to_num(sinais['is'].to_numpy()), FAIXAS_IS) - 1, 0, len(ROTULOS_IS) - 1)
+
+    tabelas = []
+    for horizonte in horizontes:
+        retorno, drawdown = retornos_futuros(df, horizonte)
+        retorno, drawdown = retorno.to_numpy(), drawdown.to_numpy()
+        for tipo, codigos, rotulos in (("Potencial", codigo_potencial, ORDEM_POTENCIAL), ("I.S.", codigo_is, ROTULOS_IS)):
+            tabela = _agregar(codigos, rotulos, retorno, drawdown, elegivel)
+            tabela.insert(0, 'tipo', tipo)
+            tabela.insert(0, 'horizonte', horizonte)
+            tabelas.append(tabela)
+    return pd.concat(tabelas, ignore_index=True)
+
+def main():
+    from nucleo.armazenamento import ArmazemOHLCV
+
+    parser = argparse.ArgumentParser(description="Backtest do score de reversão e do I.S. sobre o armazém local")
+    parser.add_argument("--dados", default="dados", help="diretório do armazém OHLCV")
+    parser.add_argument("--periodo", default=None, help='recorte do histórico, ex.: "2y" (padrão: tudo)')
+    parser.add_argument("--horizontes", type=int, nargs="+", default=list(HORIZONTES))
+    parser.add_argument("--csv", help="grava a tabela de resultados neste CSV")
+    args = parser.parse_args()
+
+    df = ArmazemOHLCV(args.dados).carregar(periodo=args.periodo)
+    if df.empty:
+        print(f"Armazém vazio em {args.dados}. Rode o bot ou o app antes.")
+        return
+    print(f"Backtest: {df.columns.get_level_values(1).nunique()} tickers x {len(df.index)} pregões")
+
+    resultado = rodar_backtest(df, args.horizontes)
+    with pd.option_context('display.width', 160, 'display.max_rows', 200):
+        print(resultado.round(2).to_string(index=False))
+    if args.csv: resultado.to_csv(args.csv, index=False)
+
+if __name__ == "__main__":
+    main()
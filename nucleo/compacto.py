@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from nucleo.indicadores import CAMPOS_INDICADORES, calcular_blocos, para_blocos
+
+# Representação compacta do mercado: em vez do DataFrame largo float64 (e de
+# uma cópia defensiva com mais seis famílias de colunas), guarda blocos
+# contíguos (campo, data, ticker):
+#   precos      float32  (Close, High, Low, Open)
+#   volume      int64    (0 onde não houve pregão)
+#   indicadores float32  (CAMPOS_INDICADORES), preenchidos por calcular_indicadores()
+#
+# campo(nome) e ticker(t) devolvem as visões que app/bot já usam.
+
+CAMPOS_PRECO = ('Close', 'High', 'Low', 'Open')
+
+class MercadoCompacto:
+    def __init__(self, datas, tickers, precos, volume):
+        self.datas = pd.DatetimeIndex(datas)
+        self.tickers = pd.Index(tickers)
+        self.precos = precos
+        self.volume = volume
+        self.indicadores = None
+
+    @classmethod
+    def de_blocos(cls, campos, datas, tickers, blocos):
+        # blocos (campo, data, ticker) em qualquer dtype, p.ex. o memory-map do armazém
+        campos = list(campos)
+        n_datas, n_tickers = len(datas), len(tickers)
+        precos = np.empty((len(CAMPOS_PRECO), n_datas, n_tickers), dtype=np.float32)
+        for i, nome in enumerate(CAMPOS_PRECO):
+            precos[i] = blocos[campos.index(nome)] if nome in campos else np.nan
+
+        volume = np.zeros((n_datas, n_tickers), dtype=np.int64)
+        if 'Volume' in campos:
+            bruto = np.asarray(blocos[campos.index('Volume')])
+            np.copyto(volume, np.nan_to_num(bruto), casting='unsafe')
+        return cls(datas, tickers, precos, volume)
+
+    @classmethod
+    def de_dataframe(cls, df):
+        campos, tickers, datas, blocos = para_blocos(df)
+        return cls.de_blocos(campos, datas, tickers, blocos)
+
+    # --- ACESSO ---
+
+    @property
+    def campos(self):
+        campos = CAMPOS_PRECO + ('Volume',)
+        return campos + CAMPOS_INDICADORES if self.indicadores is not None else campos
+
+    @property
+    def empty(self):
+        return self.precos.size == 0
+
+    @property
+    def nbytes(self):
+        total = self.precos.nbytes + self.volume.nbytes
+        return total + (self.indicadores.nbytes if self.indicadores is not None else 0)
+
+    def _bloco(self, nome):
+        if nome in CAMPOS_PRECO: return self.precos[CAMPOS_PRECO.index(nome)]
+        if nome == 'Volume':
+            # Volume volta a ser NaN onde não houve pregão, como no DataFrame original
+            return np.where(np.isnan(self.precos[0]), np.nan, self.volume)
+        if self.indicadores is not None and nome in CAMPOS_INDICADORES:
+            return self.indicadores[CAMPOS_INDICADORES.index(nome)]
+        raise KeyError(nome)
+
+    def campo(self, nome):
+        # Visão (datas x tickers) sem cópia para preços e indicadores
+        return pd.DataFrame(self._bloco(nome), index=self.datas, columns=self.tickers, copy=False)
+
+    __getitem__ = campo
+
+    def ticker(self, ticker):
+        # Equivalente a df_calc.xs(ticker, axis=1, level=1).dropna()
+        j = self.tickers.get_loc(ticker)
+        return pd.DataFrame({nome: self._bloco(nome)[:, j] for nome in self.campos}, index=self.datas).dropna()
+
+    def blocos(self, campos=None):
+        # Mesmo contrato de indicadores.para_blocos
+        campos = list(campos) if campos is not None else list(self.campos)
+        blocos = np.stack([self._bloco(nome).astype(np.float32, copy=False) for nome in campos])
+        return campos, self.tickers, self.datas, blocos
+
+    # --- INDICADORES ---
+
+    def calcular_indicadores(self):
+        # Cada indicador é calculado e gravado direto no bloco float32, um por vez,
+        # sem materializar o DataFrame largo com tudo junto.
+        self.indicadores = np.full((len(CAMPOS_INDICADORES),) + self.volume.shape, np.nan, dtype=np.float32)
+        for nome, valor in calcular_blocos(self).items():
+            self.indicadores[CAMPOS_INDICADORES.index(nome)] = valor.to_numpy(dtype=np.float32)
+        return self
@@ -0,0 +1,210 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from nucleo.indicadores import para_blocos
+
+# Correlação dos retornos diários de todo o universo, para separar quedas
+# sistêmicas (o setor inteiro caiu) das idiossincráticas. A matriz das últimas
+# `janela` barras é mantida por somas móveis: cada barra nova soma o produto
+# externo do retorno que entra e subtrai o do que sai, O(N²) em vez de refazer
+# O(N²·T). Os tickers são agrupados pela correlação e cada queda é comparada
+# com a do próprio grupo (queda residual); o Top 5 do app e o Top 10 do bot
+# pegam um ativo por grupo, para não virarem dez cópias do mesmo movimento.
+
+JANELA_CORRELACAO = 60  # retornos diários na janela (~3 meses)
+LIMIAR_GRUPO = 0.6      # correlação mínima com o centro do grupo
+MIN_OBSERVACOES = 20    # retornos válidos na janela para entrar num grupo
+
+class CorrelacaoMovel:
+    """Somas móveis dos retornos diários (s = Σr, Q = Σrrᵀ) em um buffer circular.
+
+    Retorno ausente (ticker sem pregão no dia) conta como zero e não entra na
+    contagem de observações. A cada volta completa do buffer as somas são
+    refeitas a partir dele, como em EstadoIndicadores, para não acumular deriva.
+    """
+
+    def __init__(self, tickers, janela=JANELA_CORRELACAO):
+        self.tickers = pd.Index(tickers)
+        self.janela = janela
+        n = len(self.tickers)
+        self.k = 0  # barras já incorporadas
+        self.ultima_data = None
+        self.ultimo_close = np.full(n, np.nan)
+        self.retornos = np.zeros((janela, n))
+        self.validos = np.zeros((janela, n), dtype=bool)
+        self.soma = np.zeros(n)
+        self.produtos = np.zeros((n, n))
+        self.observacoes = np.zeros(n, dtype=np.int64)
+
+    @classmethod
+    def de_historico(cls, close, janela=JANELA_CORRELACAO):
+        # close: DataFrame datas x tickers. Só a última janela entra, num produto de matrizes
+        estado = cls(close.columns, janela)
+        precos = close.to_numpy(dtype=float)
+        if len(precos) == 0: return estado
+        anterior = pd.DataFrame(precos).ffill().shift().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            retornos = precos / anterior - 1
+        validos = ~np.isnan(retornos)
+
+        m = len(retornos) - 1  # a primeira linha não tem retorno
+        t = np.arange(max(m - janela, 0), m)
+        estado.retornos[t % janela] = np.where(validos[t + 1], retornos[t + 1], 0.0)
+        estado.validos[t % janela] = validos[t + 1]
+        estado.k = m
+        estado._refazer_somas()
+        estado.ultimo_close = pd.DataFrame(precos).ffill().to_numpy()[-1]
+        estado.ultima_data = close.index[-1]
+        return estado
+
+    def _refazer_somas(self):
+        self.soma = self.retornos.sum(axis=0)
+        self.produtos = self.retornos.T @ self.retornos
+        self.observacoes = self.validos.sum(axis=0)
+
+    def avancar(self, data, close):
+        """Incorpora um pregão. `close` é o array de fechamentos na ordem de self.tickers."""
+        close = np.asarray(close, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            retorno = close / self.ultimo_close - 1
+        valido = ~np.isnan(retorno)
+        retorno = np.where(valido, retorno, 0.0)
+
+        slot = self.k % self.janela
+        if self.k >= self.janela:
+            saindo = self.retornos[slot]
+            self.soma -= saindo
+            self.produtos -= np.outer(saindo, saindo)
+            self.observacoes -= self.validos[slot]
+        self.retornos[slot] = retorno
+        self.validos[slot] = valido
+        self.soma += retorno
+        self.produtos += np.outer(retorno, retorno)
+        self.observacoes += valido
+        self.k += 1
+        if slot == self.janela - 1: self._refazer_somas()
+
+        self.ultimo_close = np.where(np.isnan(close), self.ultimo_close, close)
+        self.ultima_data = data
+        return self
+
+    def previa(self, data, close):
+        # Barra parcial do dia sem alterar o estado (modo daemon)
+        copia = object.__new__(type(self))
+        copia.__dict__.update({nome: valor.copy() if isinstance(valor, np.ndarray) else valor
+                               for nome, valor in self.__dict__.items()})
+        return copia.avancar(data, close)
+
+    # --- LEITURA ---
+
+    def matriz(self):
+        n = min(self.k, self.janela)
+        if n < 2: return np.full(self.produtos.shape, np.nan)
+        media = self.soma / n
+        cov = self.produtos / n - np.outer(media, media)
+        desvio = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return cov / np.outer(desvio, desvio)
+
+    def ultimo_retorno(self):
+        # Retorno do último pregão incorporado (NaN para quem não negociou)
+        slot = (self.k - 1) % self.janela
+        return np.where(self.validos[slot], self.retornos[slot], np.nan)
+
+    def grupos(self, limiar=LIMIAR_GRUPO, min_observacoes=MIN_OBSERVACOES):
+        """Grupo de cada ticker e a queda do grupo no último pregão.
+
+        Retorna DataFrame por ticker com Grupo, Tamanho_Grupo e Queda_Grupo (%):
+        média dos outros membros do grupo; para quem ficou sozinho, a mediana
+        do universo.
+        """
+        corr = self.matriz()
+        elegivel = self.observacoes >= min_observacoes
+        grupo = agrupar(np.where(np.outer(elegivel, elegivel), corr, np.nan), limiar)
+
+        retorno = self.ultimo_retorno() * 100
+        negociou = ~np.isnan(retorno)
+        soma = np.bincount(grupo, weights=np.where(negociou, retorno, 0.0), minlength=len(grupo))
+        membros = np.bincount(grupo, weights=negociou, minlength=len(grupo))
+        tamanho = np.bincount(grupo, minlength=len(grupo))
+
+        # Média do grupo sem o próprio ticker (senão a queda residual de um grupo pequeno some)
+        outros = membros[grupo] - negociou
+        with np.errstate(divide='ignore', invalid='ignore'):
+            queda_grupo = (soma[grupo] - np.where(negociou, retorno, 0.0)) / outros
+        mediana = np.nanmedian(retorno) if negociou.any() else np.nan
+        queda_grupo = np.where(outros > 0, queda_grupo, mediana)
+        return pd.DataFrame({'Grupo': grupo, 'Tamanho_Grupo': tamanho[grupo], 'Queda_Grupo': queda_grupo},
+                            index=self.tickers)
+
+def agrupar(corr, limiar=LIMIAR_GRUPO):
+    """Agrupamento guloso por líder: O(N²), sem SciPy.
+
+    Em ordem decrescente de vizinhos (correlação >= limiar), cada ticker ainda
+    livre vira centro de um grupo com os vizinhos dele que também estão livres.
+    Quem não tem vizinho fica num grupo só seu.
+    """
+    n = len(corr)
+    with np.errstate(invalid='ignore'):
+        vizinho = corr >= limiar
+    np.fill_diagonal(vizinho, True)
+    grupo = np.full(n, -1, dtype=np.int64)
+    livre = np.ones(n, dtype=bool)
+    proximo = 0
+    for centro in np.argsort(-vizinho.sum(axis=1), kind='stable'):
+        if not livre[centro]: continue
+        membros = vizinho[centro] & livre
+        grupo[membros] = proximo
+        livre &= ~membros
+        proximo += 1
+    return grupo
+
+def marcar_grupos(resultados, grupos):
+    # Acrescenta Grupo, Tamanho_Grupo, Queda_Grupo e Queda_Residual (queda além da do grupo)
+    if resultados.empty: return resultados
+    por_ticker = grupos.reindex(resultados['Ticker'])
+    return resultados.assign(
+        Grupo=por_ticker['Grupo'].fillna(-1).to_numpy(dtype=np.int64),
+        Tamanho_Grupo=por_ticker['Tamanho_Grupo'].fillna(1).to_numpy(dtype=np.int64),
+        Queda_Grupo=por_ticker['Queda_Grupo'].to_numpy(),
+        Queda_Residual=resultados['Queda_Dia'].to_numpy() - por_ticker['Queda_Grupo'].to_numpy(),
+    )
+
+def deduplicar(ranking, n, por_grupo=1):
+    """Os `n` primeiros do ranking, com no máximo `por_grupo` ativos de cada grupo."""
+    if 'Grupo' not in ranking.columns: return ranking.head(n)
+    posicao_no_grupo = ranking.groupby('Grupo', sort=False).cumcount().to_numpy()
+    # Grupo -1 (sem correlação calculada) não limita ninguém
+    return ranking[(posicao_no_grupo < por_grupo) | (ranking['Grupo'].to_numpy() < 0)].head(n)
+
+# --- CACHE ---
+
+class CacheCorrelacao:
+    """Mantém o estado entre varreduras do mesmo processo (app, daemon).
+
+    O estado guardado vai até o penúltimo pregão, porque o último pode ser uma
+    barra parcial que ainda muda; ele entra como prévia. Se os dados novos só
+    acrescentam pregões ao que já foi visto, o estado avança barra a barra;
+    mudou o universo (ou a janela voltou no tempo), refaz a partir do histórico.
+    """
+
+    def __init__(self, janela=JANELA_CORRELACAO):
+        self.janela = janela
+        self.estado = None
+        self._trava = threading.Lock()
+
+    def obter(self, dados):
+        _, tickers, datas, blocos = para_blocos(dados, ['Close'])
+        close = pd.DataFrame(blocos[0], index=datas, columns=tickers)
+        fechados = close.iloc[:-1]
+        with self._trava:
+            estado = self.estado
+            if estado is None or not estado.tickers.equals(close.columns) or estado.ultima_data not in fechados.index:
+                estado = CorrelacaoMovel.de_historico(fechados, self.janela)
+            else:
+                for data, linha in fechados.loc[fechados.index > estado.ultima_data].iterrows():
+                    estado.avancar(data, linha.to_numpy())
+            self.estado = estado
+            return estado.previa(close.index[-1], close.iloc[-1].to_numpy())
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+# Baixadores de OHLCV. Todo baixador segue a mesma assinatura:
+#   baixador(tickers, inicio=None, periodo=None) -> DataFrame com colunas (campo, ticker)
+# `inicio` (data) pede só os pregões a partir dela; sem ele, vale o `periodo` ("6mo", "1y"...).
+
+SEM_DADOS = "sem dados"  # motivo de falha quando o Yahoo respondeu, mas sem nenhuma barra do ticker
+
+def normalizar_colunas(df):
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = pd.MultiIndex.from_tuples([(c[0], c[1].replace(".SA", "")) for c in df.columns])
+    return df.dropna(axis=1, how='all')
+
+def baixar_yahoo(tickers, inicio=None, periodo=None, timeout=60, threads=True, sufixo=".SA"):
+    # sufixo="" para ativos fora da B3 (ações americanas, câmbio "BRL=X")
+    import yfinance as yf
+
+    if not tickers: return pd.DataFrame()
+    sa_tickers = [f"{t}{sufixo}" for t in tickers]
+    if inicio is not None:
+        df = yf.download(sa_tickers, start=pd.Timestamp(inicio).strftime('%Y-%m-%d'), auto_adjust=True,
+                         progress=False, timeout=timeout, threads=threads)
+    else:
+        df = yf.download(sa_tickers, period=periodo, auto_adjust=True, progress=False, timeout=timeout, threads=threads)
+    if df.empty: return pd.DataFrame()
+    return normalizar_colunas(df)
+
+class BaixadorEmLotes:
+    """Divide a lista de tickers em lotes e baixa em paralelo, com retentativas.
+
+    É ele próprio um baixador (mesma assinatura), então pode ser passado ao
+    ArmazemOHLCV. Um lote que falha depois de todas as tentativas é dividido ao
+    meio e tentado de novo, isolando o símbolo problemático sem perder o resto.
+    O relatório da última chamada fica em `self.relatorio`:
+      'falhas' -> {ticker: motivo}
+      'lotes'  -> uma linha por lote com tentativas, latência e vazão
+    """
+
+    def __init__(self, baixador=None, tamanho_lote=100, max_workers=4, tentativas=3, espera=1.0):
+        self.baixador = baixador or partial(baixar_yahoo, threads=False)
+        self.tamanho_lote = tamanho_lote
+        self.max_workers = max_workers
+        self.tentativas = tentativas
+        self.espera = espera
+        self.relatorio = {'falhas': {}, 'lotes': []}
+
+    def __call__(self, tickers, inicio=None, periodo=None):
+        self.relatorio = {'falhas': {}, 'lotes': []}
+        if not tickers: return pd.DataFrame()
+
+        lotes = [list(tickers[i:i + self.tamanho_lote]) for i in range(0, len(tickers), self.tamanho_lote)]
+        partes = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pendentes = [pool.submit(self._baixar_lote, lote, inicio, periodo) for lote in lotes]
+            while pendentes:
+                futuro = pendentes.pop(0)
+                lote, df, erro = futuro.result()
+                if df is not None:
+                    if not df.empty: partes.append(df)
+                    recebidos = set(df.columns.get_level_values(1)) if not df.empty else set()
+                    for ticker in lote:
+                        if ticker not in recebidos: self.relatorio['falhas'][ticker] = SEM_DADOS
+                elif len(lote) > 1:
+                    meio = len(lote) // 2
+                    pendentes.append(pool.submit(self._baixar_lote, lote[:meio], inicio, periodo))
+                    pendentes.append(pool.submit(self._baixar_lote, lote[meio:], inicio, periodo))
+                else:
+                    self.relatorio['falhas'][lote[0]] = erro
+
+        if not partes: return pd.DataFrame()
+        return pd.concat(partes, axis=1) if len(partes) > 1 else partes[0]
+
+    def _baixar_lote(self, lote, inicio, periodo):
+        inicio_lote = time.perf_counter()
+        erro = None
+        for tentativa in range(1, self.tentativas + 1):
+            t0 = time.perf_counter()
+            try:
+                df = self.baixador(lote, inicio=inicio, periodo=periodo)
+                self._registrar(lote, tentativa, t0, inicio_lote, df, None)
+                return lote, df, None
+            except Exception as e:
+                erro = f"{type(e).__name__}: {e}"
+                if tentativa < self.tentativas:
+                    # Backoff exponencial com jitter para não bater no Yahoo em sincronia
+                    time.sleep(self.espera * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+        self._registrar(lote, self.tentativas, t0, inicio_lote, None, erro)
+        return lote, None, erro
+
+    def _registrar(self, lote, tentativas, t0, inicio_lote, df, erro):
+        agora = time.perf_counter()
+        total = agora - inicio_lote
+        recebidos = df.columns.get_level_values(1).nunique() if df is not None and not df.empty else 0
+        self.relatorio['lotes'].append({
+            'tickers': len(lote),
+            'recebidos': recebidos,
+            'tentativas': tentativas,
+            'latencia_s': agora - t0,
+            'total_s': total,
+            'tickers_por_s': recebidos / total if total > 0 else float('nan'),
+            'erro': erro,
+        })
+
+class BaixadorFalso:
+    """Substituto local do Yahoo: serve fatias de um DataFrame (campo, ticker) já em memória.
+
+    Conta chamadas e barras entregues, para medir quanto cada atualização baixou.
+    """
+
+    def __init__(self, df, hoje=None, falhas=()):
+        self.df = df
+        self.hoje = pd.Timestamp(hoje) if hoje is not None else df.index.max()
+        self.falhas = set(falhas)
+        self.chamadas = []
+        self.barras_entregues = 0
+        self._trava = threading.Lock()
+
+    def __call__(self, tickers, inicio=None, periodo=None):
+        with self._trava:
+            self.chamadas.append((tuple(tickers), inicio, periodo))
+        if self.falhas.intersection(tickers):
+            raise ConnectionError(f"falha simulada para {sorted(self.falhas.intersection(tickers))}")
+        disponiveis = [t for t in tickers if t in self.df.columns.get_level_values(1)]
+        if not disponiveis: return pd.DataFrame()
+
+        if inicio is not None:
+            desde = pd.Timestamp(inicio)
+        else:
+            desde = inicio_do_periodo(periodo, self.hoje)
+        janela = self.df.loc[(self.df.index >= desde) & (self.df.index <= self.hoje)]
+        fatia = janela.loc[:, janela.columns.get_level_values(1).isin(disponiveis)].dropna(axis=1, how='all')
+        with self._trava:
+            self.barras_entregues += int(fatia.notna().to_numpy().sum())
+        return fatia
+
+def inicio_do_periodo(periodo, hoje):
+    # Converte os períodos do yfinance ("5d", "6mo", "1y", "max") em data inicial.
+    hoje = pd.Timestamp(hoje).normalize()
+    if periodo is None or periodo == "max": return pd.Timestamp.min
+    if periodo.endswith("mo"): return hoje - pd.DateOffset(months=int(periodo[:-2]))
+    if periodo.endswith("y"): return hoje - pd.DateOffset(years=int(periodo[:-1]))
+    if periodo.endswith("d"): return hoje - pd.DateOffset(days=int(periodo[:-1]))
+    raise ValueError(f"Período não suportado: {periodo}")
@@ -0,0 +1,120 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Gráficos dos Top 5. As figuras são criadas fora do pyplot (não ficam
+# registradas no processo do Streamlit), viram PNG e são fechadas na hora.
+# O PNG fica num cache LRU indexado por ticker + último pregão, então
+# reprocessar os mesmos dados não desenha nada de novo. O matplotlib só é
+# importado no primeiro desenho (cache cheio ou sem gráficos = sem import).
+
+ESTILO = 'seaborn-v0_8-darkgrid'
+
+def _matplotlib():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    return plt, Figure
+
+def plotar_grafico(df_ticker, ticker, empresa, rsi, is_val):
+    plt, Figure = _matplotlib()
+    with plt.style.context(ESTILO):
+        fig = Figure(figsize=(10, 8))
+        axes = fig.subplots(3, 1, sharex=True, gridspec_kw={'height_ratios': [3, 1, 1]})
+
+        close = df_ticker['Close']
+
+        # Preço
+        ax1 = axes[0]
+        ax1.plot(close.index, close.values, label='Close', color='#333333')
+        ax1.plot(close.index, df_ticker['EMA20'], label='EMA20', alpha=0.7, color='blue', linewidth=1)
+        ax1.fill_between(close.index, df_ticker['BB_Lower'], df_ticker['BB_Upper'], alpha=0.15, color='gray')
+        ax1.set_title(f'{ticker} - {empresa} | I.S.: {is_val:.0f}', fontweight='bold')
+        ax1.legend(loc='upper left')
+        ax1.grid(True, alpha=0.3)
+
+        # RSI
+        ax2 = axes[1]
+        ax2.plot(close.index, df_ticker['RSI14'], color='orange', label='RSI')
+        ax2.axhline(30, color='red', linestyle='--', linewidth=1)
+        ax2.axhline(70, color='green', linestyle='--', linewidth=1)
+        ax2.fill_between(close.index, 0, 30, alpha=0.2, color='red')
+        ax2.set_ylabel('RSI')
+        ax2.set_ylim(0, 100)
+        ax2.grid(True, alpha=0.3)
+
+        # Estocástico
+        ax3 = axes[2]
+        if 'Stoch_K' in df_ticker.columns:
+            ax3.plot(close.index, df_ticker['Stoch_K'], color='purple', label='Stoch %K')
+            ax3.axhline(20, color='red', linestyle='--', linewidth=1)
+            ax3.axhline(80, color='green', linestyle='--', linewidth=1)
+            ax3.fill_between(close.index, 0, 20, alpha=0.2, color='red')
+        ax3.set_ylabel('Stoch')
+        ax3.set_ylim(0, 100)
+        ax3.grid(True, alpha=0.3)
+
+        fig.tight_layout()
+    return fig
+
+def renderizar_png(df_ticker, ticker, empresa, rsi, is_val):
+    fig = plotar_grafico(df_ticker, ticker, empresa, rsi, is_val)
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+class CacheGraficos:
+    """Cache LRU de PNGs por (ticker, último pregão, título)."""
+
+    def __init__(self, capacidade=32):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()  # sessões do Streamlit rodam em threads
+
+    @staticmethod
+    def chave(df_ticker, ticker, empresa, is_val):
+        ultimo = df_ticker.index[-1] if len(df_ticker.index) else None
+        return (ticker, ultimo, len(df_ticker.index), empresa, round(float(is_val)))
+
+    def _guardar(self, chave, png):
+        self._itens[chave] = png
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def obter(self, df_ticker, ticker, empresa, rsi, is_val):
+        return self.obter_varios([(df_ticker, ticker, empresa, rsi, is_val)])[0]
+
+    def obter_varios(self, pedidos, paralelo=False, max_workers=None):
+        # pedidos: lista de (df_ticker, ticker, empresa, rsi, is_val), na ordem de exibição
+        chaves = [self.chave(df, ticker, empresa, is_val) for df, ticker, empresa, _, is_val in pedidos]
+        with self._trava:
+            resultado = [self._itens.get(chave) for chave in chaves]
+            faltando = [i for i, png in enumerate(resultado) if png is None]
+            self.acertos += len(pedidos) - len(faltando)
+            self.faltas += len(faltando)
+
+        if paralelo and len(faltando) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                pngs = list(pool.map(_renderizar_pedido, [pedidos[i] for i in faltando]))
+        else:
+            pngs = [renderizar_png(*pedidos[i]) for i in faltando]
+        for i, png in zip(faltando, pngs):
+            resultado[i] = png
+        with self._trava:
+            for chave, png in zip(chaves, resultado):
+                self._guardar(chave, png)
+        return resultado
+
+    def __len__(self):
+        return len(self._itens)
+
+def _renderizar_pedido(pedido):
+    return renderizar_png(*pedido)
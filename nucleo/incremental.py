@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+# Modo incremental dos indicadores: em vez de refazer rolling/ewm sobre 6 meses
+# ou 1 ano a cada varredura, guarda o estado de todos os tickers em arrays
+# (um slot por ticker) e atualiza com uma barra nova em tempo constante.
+#
+# - RSI e Bollinger/SMA200: somas móveis + buffer circular com o valor que sai
+# - Estocástico: buffer circular das últimas máximas/mínimas
+# - EMAs/MACD: acumuladores numerador/denominador da EWM ajustada do pandas
+#
+# A semântica é a do bot (cada ticker vira a própria série sem lacunas, como
+# em alinhar_validos): barra com campo faltando não avança aquele ticker.
+
+class EstadoIndicadores:
+    def __init__(self, tickers, janela_rsi=14, janela_stoch=14, janela_bb=20, desvios_bb=2,
+                 span_ema=20, spans_macd=(12, 26, 9), janela_tendencia=200):
+        self.tickers = pd.Index(tickers)
+        self.janela_rsi = janela_rsi
+        self.janela_stoch = janela_stoch
+        self.janela_bb = janela_bb
+        self.desvios_bb = desvios_bb
+        self.span_ema = span_ema
+        self.spans_macd = spans_macd
+        self.janela_tendencia = janela_tendencia
+
+        n = len(self.tickers)
+        self.n = np.zeros(n, dtype=np.int64)
+        self.close = np.full(n, np.nan)
+        self.close_anterior = np.full(n, np.nan)
+
+        self.ganhos = np.zeros((janela_rsi, n))
+        self.perdas = np.zeros((janela_rsi, n))
+        self.soma_ganhos = np.zeros(n)
+        self.soma_perdas = np.zeros(n)
+
+        self.maximas = np.full((janela_stoch, n), np.nan)
+        self.minimas = np.full((janela_stoch, n), np.nan)
+
+        # Bollinger em valores deslocados pelo primeiro close, para a soma dos
+        # quadrados não perder precisão com preços altos
+        self.referencia = np.full(n, np.nan)
+        self.closes_bb = np.zeros((janela_bb, n))
+        self.soma_bb = np.zeros(n)
+        self.soma_q_bb = np.zeros(n)
+
+        self.closes_tendencia = np.zeros((janela_tendencia, n))
+        self.soma_tendencia = np.zeros(n)
+
+        rapida, lenta, sinal = spans_macd
+        self.ewm = {span: [np.zeros(n), np.zeros(n)] for span in {span_ema, rapida, lenta}}
+        self.ewm_sinal = [np.zeros(n), np.zeros(n)]
+
+    @classmethod
+    def de_historico(cls, df, **parametros):
+        # Aquece o estado repassando o histórico barra a barra (custo único).
+        estado = cls(df.columns.get_level_values(1).unique(), **parametros)
+        campos, blocos = estado._para_blocos(df)
+        for linha in blocos:
+            estado._avancar(campos, linha)
+        return estado
+
+    # --- ATUALIZAÇÃO ---
+
+    def avancar(self, barra):
+        """Incorpora um pregão fechado. `barra` é uma linha do DataFrame de mercado (campo, ticker)."""
+        campos, blocos = self._para_blocos(barra.to_frame().T)
+        self._avancar(campos, blocos[0])
+        return self
+
+    def previa(self, barra):
+        """Indicadores com a barra parcial do dia, sem alterar o estado (varredura intradiária)."""
+        return self.copiar().avancar(barra).valores()
+
+    def copiar(self):
+        copia = object.__new__(type(self))
+        for nome, valor in self.__dict__.items():
+            if isinstance(valor, np.ndarray):
+                valor = valor.copy()
+            elif isinstance(valor, dict):
+                valor = {k: [a.copy() for a in v] for k, v in valor.items()}
+            elif isinstance(valor, list):
+                valor = [a.copy() for a in valor]
+            setattr(copia, nome, valor)
+        return copia
+
+    def _para_blocos(self, df):
+        campos = [c for c in df.columns.get_level_values(0).unique()]
+        colunas = pd.MultiIndex.from_product([campos, self.tickers])
+        blocos = df.reindex(columns=colunas).to_numpy(dtype=float)
+        return campos, blocos.reshape(len(df.index), len(campos), len(self.tickers))
+
+    def _avancar(self, campos, linha):
+        valido = ~np.isnan(linha).any(axis=0)
+        idx = np.flatnonzero(valido)
+        if len(idx) == 0: return
+
+        close = linha[campos.index('Close'), idx]
+        high = linha[campos.index('High'), idx]
+        low = linha[campos.index('Low'), idx]
+        k = self.n[idx]
+
+        # RSI: ganho/perda do pregão anterior válido
+        com_anterior = k > 0
+        i_delta = idx[com_anterior]
+        delta = close[com_anterior] - self.close[i_delta]
+        _empurrar(self.ganhos, self.soma_ganhos, i_delta, k[com_anterior] - 1, np.clip(delta, 0, None))
+        _empurrar(self.perdas, self.soma_perdas, i_delta, k[com_anterior] - 1, -np.clip(delta, None, 0))
+
+        # Estocástico
+        _empurrar(self.maximas, None, idx, k, high)
+        _empurrar(self.minimas, None, idx, k, low)
+
+        # Bollinger e SMA200
+        primeiro = k == 0
+        self.referencia[idx[primeiro]] = close[primeiro]
+        deslocado = close - self.referencia[idx]
+        saindo, volta = _empurrar(self.closes_bb, self.soma_bb, idx, k, deslocado)
+        self.soma_q_bb[idx] += deslocado ** 2 - saindo ** 2
+        self.soma_q_bb[idx[volta]] = (self.closes_bb[:, idx[volta]] ** 2).sum(axis=0)
+        _empurrar(self.closes_tendencia, self.soma_tendencia, idx, k, close)
+
+        # EWMs (adjust=True): y = num/den com num = (1-a)num + x e den = (1-a)den + 1
+        for span, (num, den) in self.ewm.items():
+            _acumular_ewm(num, den, idx, span, close)
+        rapida, lenta, sinal = self.spans_macd
+        macd = self.ewm[rapida][0][idx] / self.ewm[rapida][1][idx] - self.ewm[lenta][0][idx] / self.ewm[lenta][1][idx]
+        _acumular_ewm(self.ewm_sinal[0], self.ewm_sinal[1], idx, sinal, macd)
+
+        self.close_anterior[idx] = self.close[idx]
+        self.close[idx] = close
+        self.n[idx] = k + 1
+
+    # --- LEITURA ---
+
+    def valores(self):
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = (self.soma_ganhos / self.janela_rsi) / (self.soma_perdas / self.janela_rsi)
+            rsi = np.where(n - 1 >= self.janela_rsi, 100 - (100 / (1 + rs)), np.nan)
+
+            cheio = n >= self.janela_stoch
+            maxima = self.maximas.max(axis=0)
+            minima = self.minimas.min(axis=0)
+            stoch = np.where(cheio, 100 * ((self.close - minima) / (maxima - minima)), np.nan)
+
+            jb = self.janela_bb
+            media = self.soma_bb / jb
+            var = (self.soma_q_bb - self.soma_bb ** 2 / jb) / (jb - 1)
+            std = np.sqrt(np.clip(var, 0, None))
+            cheio_bb = n >= jb
+            sma = np.where(cheio_bb, media + self.referencia, np.nan)
+            std = np.where(cheio_bb, std, np.nan)
+
+            ema = self.ewm[self.span_ema][0] / self.ewm[self.span_ema][1]
+            rapida, lenta, _ = self.spans_macd
+            macd = self.ewm[rapida][0] / self.ewm[rapida][1] - self.ewm[lenta][0] / self.ewm[lenta][1]
+            macd_hist = macd - self.ewm_sinal[0] / self.ewm_sinal[1]
+
+            sma_tendencia = np.where(n >= self.janela_tendencia, self.soma_tendencia / self.janela_tendencia, np.nan)
+
+        return pd.DataFrame({
+            'Close': self.close,
+            'Close_Anterior': self.close_anterior,
+            'RSI14': rsi,
+            'Stoch_K': stoch,
+            'EMA20': ema,
+            'BB_Lower': sma - std * self.desvios_bb,
+            'BB_Upper': sma + std * self.desvios_bb,
+            'MACD_Hist': macd_hist,
+            'SMA200': sma_tendencia,
+            'Pregoes': n,
+        }, index=self.tickers)
+
+# --- AUXILIARES ---
+
+def _empurrar(buffer, soma, idx, k, valor):
+    # Grava `valor` no slot k % janela de cada ticker e atualiza a soma móvel.
+    # Devolve o valor que saiu da janela e quais tickers completaram uma volta.
+    janela = buffer.shape[0]
+    slot = k % janela
+    saindo = np.where(k >= janela, buffer[slot, idx], 0.0)
+    buffer[slot, idx] = valor
+    volta = slot == janela - 1
+    if soma is not None:
+        soma[idx] += valor - saindo
+        # Ao completar uma volta no buffer, refaz a soma a partir dele (evita deriva numérica)
+        soma[idx[volta]] = buffer[:, idx[volta]].sum(axis=0)
+    return saindo, volta
+
+def _acumular_ewm(num, den, idx, span, valor):
+    decaimento = 1 - 2 / (span + 1)
+    num[idx] = num[idx] * decaimento + valor
+    den[idx] = den[idx] * decaimento + 1
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# Motor de indicadores vetorizado: cada campo é um bloco 2-D (datas x tickers)
+# e as janelas móveis rodam em todas as colunas de uma vez, sem loop por ticker.
+
+CAMPOS_INDICADORES = ('RSI14', 'Stoch_K', 'EMA20', 'BB_Lower', 'BB_Upper', 'MACD_Hist')
+
+# --- INDICADORES (recebem DataFrames datas x tickers) ---
+
+def calcular_rsi(close, janela=14):
+    delta = close.diff()
+    ganho = delta.clip(lower=0).rolling(janela).mean()
+    perda = -delta.clip(upper=0).rolling(janela).mean()
+    rs = ganho / perda
+    return 100 - (100 / (1 + rs))
+
+def calcular_estocastico(close, high, low, janela=14):
+    # Fórmula: (Close - Lowest_Low) / (Highest_High - Lowest_Low) * 100
+    lowest_low = low.rolling(window=janela).min()
+    highest_high = high.rolling(window=janela).max()
+    return 100 * ((close - lowest_low) / (highest_high - lowest_low))
+
+def calcular_bollinger(close, janela=20, desvios=2):
+    sma = close.rolling(janela).mean()
+    std = close.rolling(janela).std()
+    return sma - (std * desvios), sma + (std * desvios)
+
+def calcular_macd_hist(close, rapida=12, lenta=26, sinal=9):
+    macd = close.ewm(span=rapida).mean() - close.ewm(span=lenta).mean()
+    return macd - macd.ewm(span=sinal).mean()
+
+def calcular_blocos(df):
+    close = df['Close']
+    high = df['High']
+    low = df['Low']
+
+    bb_lower, bb_upper = calcular_bollinger(close)
+    return {
+        'RSI14': calcular_rsi(close),
+        'Stoch_K': calcular_estocastico(close, high, low),
+        'EMA20': close.ewm(span=20).mean(),
+        'BB_Lower': bb_lower,
+        'BB_Upper': bb_upper,
+        'MACD_Hist': calcular_macd_hist(close),
+    }
+
+def calcular_indicadores(df):
+    # Mesmo formato de saída do loop antigo: colunas (campo, ticker), com os
+    # campos originais seguidos dos indicadores, montadas em um único concat.
+    campos = {nome: df[nome] for nome in df.columns.get_level_values(0).unique()}
+    campos.update(calcular_blocos(df))
+    return pd.concat(campos, axis=1)
+
+# --- BLOCOS (campo, data, ticker) ---
+
+def para_blocos(dados, campos=None):
+    """Retorna (campos, tickers, datas, blocos) com blocos no formato (campo, data, ticker).
+
+    Aceita o DataFrame (campo, ticker) de sempre ou um MercadoCompacto, que já
+    guarda os dados nesse formato.
+    """
+    if hasattr(dados, 'blocos'): return dados.blocos(campos)
+
+    campos = list(campos) if campos is not None else list(dados.columns.get_level_values(0).unique())
+    tickers = dados.columns.get_level_values(1).unique()
+    colunas = pd.MultiIndex.from_product([campos, tickers])
+    n_datas = len(dados.index)
+    blocos = dados.reindex(columns=colunas).to_numpy(dtype=float).reshape(n_datas, len(campos), len(tickers))
+    return campos, tickers, dados.index, blocos.transpose(1, 0, 2)
+
+# --- ALINHAMENTO ---
+
+def alinhar_blocos(blocos):
+    # Versão NumPy de alinhar_validos: blocos (campo, data, ticker) -> (alinhado, n_validos)
+    n_datas = blocos.shape[1]
+    valido = ~np.isnan(blocos).any(axis=0)
+    ordem = np.argsort(valido, axis=0, kind='stable')
+    alinhado = np.take_along_axis(blocos, ordem[None, :, :], axis=1)
+
+    n_validos = valido.sum(axis=0)
+    vazio = np.arange(n_datas)[:, None] < (n_datas - n_validos)[None, :]
+    alinhado[:, vazio] = np.nan
+    return alinhado, n_validos
+
+def alinhar_validos(df):
+    """Empurra as linhas completas de cada ticker para o fim do índice.
+
+    Equivale a fazer `df.xs(ticker, axis=1, level=1).dropna()` para todos os
+    tickers de uma vez: após o alinhamento, `iloc[-1]` é o último pregão válido
+    de cada ticker e as janelas móveis enxergam a mesma série sem lacunas.
+    Retorna o DataFrame alinhado e a quantidade de linhas válidas por ticker.
+    """
+    campos, tickers, datas, blocos = para_blocos(df)
+    alinhado, n_validos = alinhar_blocos(blocos)
+
+    colunas = pd.MultiIndex.from_product([campos, tickers])
+    df_alinhado = pd.DataFrame(alinhado.transpose(1, 0, 2).reshape(len(datas), -1), index=datas, columns=colunas)
+    return df_alinhado, pd.Series(n_validos, index=tickers)
@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Instrumentação leve das etapas do app e do bot: tempo de parede, linhas
+# processadas e variação de memória (RSS) por etapa. Opcionalmente captura um
+# perfil completo com cProfile ou pyinstrument, ou o tempo de import a frio.
+
+def memoria_mb():
+    # RSS atual. /proc no Linux (Streamlit Cloud e Actions); fora dele, o pico do processo.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+class Instrumentos:
+    def __init__(self, perfil=None):
+        self.registros = []
+        self.perfil = perfil  # None, "cprofile" ou "pyinstrument"
+        self.relatorio_perfil = None
+
+    @contextmanager
+    def etapa(self, nome, linhas=None):
+        # O registro é devolvido para quem quiser informar as linhas depois: reg['linhas'] = n
+        registro = {'etapa': nome, 'segundos': 0.0, 'linhas': linhas, 'memoria_delta_mb': 0.0}
+        memoria = memoria_mb()
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = time.perf_counter() - inicio
+            registro['memoria_delta_mb'] = memoria_mb() - memoria
+            self.registros.append(registro)
+
+    def medir(self, nome):
+        # Versão decorador de etapa(); usa len() do retorno como linhas quando possível
+        def decorador(funcao):
+            @wraps(funcao)
+            def envoltorio(*args, **kwargs):
+                with self.etapa(nome) as registro:
+                    resultado = funcao(*args, **kwargs)
+                    try: registro['linhas'] = len(resultado)
+                    except TypeError: pass
+                    return resultado
+            return envoltorio
+        return decorador
+
+    @contextmanager
+    def perfilar(self):
+        if self.perfil is None:
+            yield
+            return
+
+        if self.perfil == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            try: yield
+            finally:
+                profiler.stop()
+                self.relatorio_perfil = profiler.output_text(unicode=True)
+            return
+
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try: yield
+        finally:
+            profiler.disable()
+            saida = io.StringIO()
+            pstats.Stats(profiler, stream=saida).sort_stats("cumulative").print_stats(30)
+            self.relatorio_perfil = saida.getvalue()
+
+    # --- RELATÓRIOS ---
+
+    @property
+    def total_segundos(self):
+        return sum(r['segundos'] for r in self.registros)
+
+    def tabela(self):
+        import pandas as pd
+        df = pd.DataFrame(self.registros, columns=['etapa', 'segundos', 'linhas', 'memoria_delta_mb'])
+        total = self.total_segundos
+        df['percentual'] = (df['segundos'] / total * 100) if total > 0 else 0.0
+        return df
+
+    def resumo(self):
+        linhas = []
+        for r in self.registros:
+            qtd = f" | {r['linhas']} linhas" if r['linhas'] is not None else ""
+            linhas.append(f"   {r['etapa']:<22} {r['segundos']:8.2f}s | {r['memoria_delta_mb']:+8.1f} MB{qtd}")
+        linhas.append(f"   {'total':<22} {self.total_segundos:8.2f}s")
+        return "\n".join(linhas)
+
+    def para_json(self):
+        return json.dumps({'etapas': self.registros, 'total_segundos': self.total_segundos}, indent=2, default=str)
+
+    def exportar_json(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(self.para_json())
+
+# --- INICIALIZAÇÃO ---
+
+def perfil_inicializacao(modulo, top=15):
+    """Tempo de `import modulo` num interpretador novo (-X importtime), como num cold start.
+
+    Retorna (total_segundos, [(modulo, acumulado_s, proprio_s)]) com os `top`
+    imports mais caros. O ambiente é herdado, então as validações do módulo valem.
+    """
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                       capture_output=True, text=True, cwd=os.getcwd())
+    if r.returncode != 0:
+        raise RuntimeError(f"import {modulo} falhou:\n{r.stdout}{r.stderr}")
+
+    tempos = []
+    for linha in r.stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha: continue
+        proprio, acumulado, nome = [c.strip() for c in linha[len("import time:"):].split("|")]
+        if not proprio.isdigit(): continue  # cabeçalho
+        tempos.append((nome, int(acumulado) / 1e6, int(proprio) / 1e6))
+
+    total = sum(proprio for _, _, proprio in tempos)
+    # Só módulos de primeiro nível de cada pacote, para a lista não repetir pandas.core.* etc.
+    raizes = {}
+    for nome, acumulado, proprio in tempos:
+        raiz = nome if nome.startswith("nucleo") or nome == modulo else nome.split(".")[0]
+        raizes[raiz] = max(raizes.get(raiz, 0.0), acumulado)
+    ranking = sorted(raizes.items(), key=lambda item: item[1], reverse=True)[:top]
+    proprios = {nome: proprio for nome, _, proprio in tempos}
+    return total, [(nome, acumulado, proprios.get(nome, 0.0)) for nome, acumulado in ranking]
+
+def resumo_inicializacao(total, ranking):
+    linhas = [f"   {'import total':<28} {total:8.3f}s"]
+    for nome, acumulado, proprio in ranking:
+        linhas.append(f"   {nome:<28} {acumulado:8.3f}s (próprio {proprio:.3f}s)")
+    return "\n".join(linhas)
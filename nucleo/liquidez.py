@@ -0,0 +1,142 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from nucleo.compacto import MercadoCompacto
+from nucleo.download import SEM_DADOS
+from nucleo.indicadores import para_blocos
+from nucleo.triagem import MIN_PREGOES
+
+# Pré-filtro de liquidez e qualidade dos dados. Boa parte dos BDRs da lista
+# quase não negocia: pregões sem negócio, volume zero, o mesmo fechamento
+# repetido por semanas. Eles eram baixados e passavam por todos os indicadores
+# só para a triagem descartá-los no fim. Agora cada ticker recebe uma nota logo
+# depois do download (volume financeiro mediano, fração de pregões negociados,
+# maior sequência de preço parado), a nota fica em disco e as varreduras
+# seguintes nem baixam quem foi reprovado. A nota vence em REAVALIAR_DIAS: aí o
+# ticker volta a ser baixado (só o delta, pelo armazém) e é avaliado de novo.
+# Ticker para o qual o Yahoo não devolve nada (deslistado, símbolo inválido da
+# BRAPI) também ganha nota, com motivo "sem dados", para não ser pedido por
+# inteiro a cada varredura; falha de rede (ou resposta toda vazia) não conta.
+#
+# Layout no diretório de dados:
+#   liquidez.json  -> {"tickers": {ticker: {Volume_Financeiro, ..., Motivo, avaliado_em}}}
+
+JANELA_LIQUIDEZ = 60            # últimos pregões da B3 avaliados (~3 meses)
+MIN_VOLUME_FINANCEIRO = 10_000  # R$/dia, mediana na janela (dia sem negócio conta como zero)
+MIN_FRACAO_NEGOCIADA = 0.5      # fração dos pregões da janela com volume > 0
+MAX_PRECO_PARADO = 10           # pregões seguidos com o mesmo fechamento
+REAVALIAR_DIAS = 7              # validade da nota de um ticker reprovado
+
+def avaliar_liquidez(dados, janela=JANELA_LIQUIDEZ):
+    """Nota de liquidez de todos os tickers de uma vez, com arrays (data, ticker).
+
+    Retorna DataFrame por ticker com Volume_Financeiro, Fracao_Negociada,
+    Preco_Parado, Pregoes e Motivo (vazio para quem passou).
+    """
+    _, tickers, _, (close, volume) = para_blocos(dados, ['Close', 'Volume'])
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    pregoes = (~np.isnan(close)).sum(axis=0)
+
+    # Janela no calendário da B3: pregão em que o ticker não aparece conta como sem negócio
+    close, volume = close[-janela:], volume[-janela:]
+    negociou = ~np.isnan(close) & (np.nan_to_num(volume) > 0)
+    financeiro = np.where(negociou, np.nan_to_num(close) * np.nan_to_num(volume), 0.0)
+
+    # Maior sequência de fechamentos iguais (dia sem cotação repete o anterior)
+    preenchido = pd.DataFrame(close).ffill().to_numpy()
+    igual = np.zeros(close.shape, dtype=bool)
+    igual[1:] = preenchido[1:] == preenchido[:-1]
+    contagem = np.cumsum(igual, axis=0)
+    reinicio = np.maximum.accumulate(np.where(igual, 0, contagem), axis=0)
+    parado = (contagem - reinicio).max(axis=0, initial=0)
+
+    notas = pd.DataFrame({
+        'Volume_Financeiro': np.median(financeiro, axis=0) if len(financeiro) else np.zeros(len(tickers)),
+        'Fracao_Negociada': negociou.mean(axis=0) if len(negociou) else np.zeros(len(tickers)),
+        'Preco_Parado': parado,
+        'Pregoes': pregoes,
+    }, index=pd.Index(tickers))
+
+    motivo = pd.Series("", index=notas.index)
+    for reprovado, texto in ((notas['Volume_Financeiro'] < MIN_VOLUME_FINANCEIRO, "volume baixo"),
+                             (notas['Fracao_Negociada'] < MIN_FRACAO_NEGOCIADA, "poucos pregões com negócio"),
+                             (notas['Preco_Parado'] > MAX_PRECO_PARADO, "preço parado"),
+                             (notas['Pregoes'] < MIN_PREGOES, "histórico curto")):
+        motivo[reprovado] = (motivo[reprovado] + ", " + texto).str.lstrip(", ")
+    notas['Motivo'] = motivo
+    return notas
+
+def remover_tickers(dados, tickers):
+    # Mesmo tipo de entrada (DataFrame (campo, ticker) ou MercadoCompacto), sem os `tickers`
+    if isinstance(dados, MercadoCompacto):
+        manter = ~dados.tickers.isin(tickers)
+        return MercadoCompacto(dados.datas, dados.tickers[manter], dados.precos[:, :, manter], dados.volume[:, manter])
+    return dados.drop(columns=list(tickers), level=1)
+
+class FiltroLiquidez:
+    """Notas de liquidez persistidas em disco, consultadas antes do download."""
+
+    def __init__(self, diretorio, reavaliar_dias=REAVALIAR_DIAS):
+        self.caminho = os.path.join(diretorio, "liquidez.json")
+        self.reavaliar_dias = reavaliar_dias
+
+    def _ler(self):
+        if not os.path.exists(self.caminho): return {}
+        with open(self.caminho, encoding="utf-8") as f:
+            return json.load(f)['tickers']
+
+    def _gravar(self, notas):
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({'tickers': notas}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+    def selecionar(self, tickers, hoje=None):
+        """Separa os tickers a baixar dos reprovados com nota ainda válida.
+
+        Retorna (tickers mantidos, {ticker: motivo} dos podados). Ticker sem
+        nota (novo na lista) é sempre mantido.
+        """
+        hoje = pd.Timestamp(hoje if hoje is not None else pd.Timestamp.now()).normalize()
+        notas = self._ler()
+        podados = {}
+        for ticker in tickers:
+            nota = notas.get(ticker)
+            if not nota or not nota['Motivo']: continue
+            if (hoje - pd.Timestamp(nota['avaliado_em'])).days < self.reavaliar_dias: podados[ticker] = nota['Motivo']
+        return [t for t in tickers if t not in podados], podados
+
+    def registrar_sem_dados(self, falhas, hoje=None):
+        """Grava nota reprovada para os tickers que vieram sem dados.
+
+        falhas: {ticker: motivo} do relatório do armazém. Retorna {ticker: motivo}
+        dos registrados.
+        """
+        hoje = pd.Timestamp(hoje if hoje is not None else pd.Timestamp.now()).normalize()
+        sem_dados = [t for t, motivo in falhas.items() if motivo == SEM_DADOS]
+        if not sem_dados: return {}
+        notas = self._ler()
+        notas.update({t: {'Volume_Financeiro': 0.0, 'Fracao_Negociada': 0.0, 'Preco_Parado': 0, 'Pregoes': 0,
+                          'Motivo': SEM_DADOS, 'avaliado_em': hoje.strftime("%Y-%m-%d")} for t in sem_dados})
+        self._gravar(notas)
+        return {t: SEM_DADOS for t in sem_dados}
+
+    def podar(self, dados, hoje=None):
+        """Avalia os dados recém-baixados, grava as notas e tira os reprovados.
+
+        Retorna (dados sem os reprovados, {ticker: motivo} dos reprovados).
+        """
+        hoje = pd.Timestamp(hoje if hoje is not None else pd.Timestamp.now()).normalize()
+        avaliadas = avaliar_liquidez(dados)
+        notas = self._ler()
+        notas.update(avaliadas.assign(avaliado_em=hoje.strftime("%Y-%m-%d")).to_dict('index'))
+        self._gravar(notas)
+
+        reprovados = avaliadas.loc[avaliadas['Motivo'] != "", 'Motivo']
+        if reprovados.empty: return dados, {}
+        return remover_tickers(dados, reprovados.index), reprovados.to_dict()
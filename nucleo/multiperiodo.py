@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from nucleo.indicadores import alinhar_validos, calcular_bollinger, calcular_estocastico, calcular_rsi, para_blocos
+
+# Confirmação semanal e mensal: as barras diárias que já estão em memória são
+# reamostradas (sem novo download) e RSI/Estocástico/Bollinger rodam no mesmo
+# caminho vetorizado do diário, para todos os tickers de uma vez. O resultado
+# fica em cache por (período, última barra), então as atualizações seguintes
+# com os mesmos dados não pagam nada. No daemon a última barra muda a cada
+# varredura; lá o ConfirmacaoIncremental reamostra o histórico fechado uma vez
+# e cada barra parcial só refaz o período corrente.
+
+AGREGACAO = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Janelas menores no mensal: a varredura guarda ~1 ano de diários (12 barras mensais)
+PERIODOS = {
+    'Semanal': {'regra': 'W-FRI', 'janela_rsi': 14, 'janela_stoch': 14, 'janela_bb': 20},
+    'Mensal': {'regra': 'ME', 'janela_rsi': 6, 'janela_stoch': 6, 'janela_bb': 6},
+}
+
+def reamostrar(dados, regra):
+    # dados: DataFrame (campo, ticker) ou MercadoCompacto -> DataFrame (campo, ticker) na nova frequência
+    campos, tickers, datas, blocos = para_blocos(dados, list(AGREGACAO))
+    completo = ~np.isnan(blocos).any(axis=0)  # só pregões completos, como no diário
+
+    saida = {}
+    for i, campo in enumerate(campos):
+        bloco = pd.DataFrame(np.where(completo, blocos[i], np.nan), index=datas, columns=tickers)
+        saida[campo] = getattr(bloco.resample(regra), AGREGACAO[campo])()
+    # Período sem nenhum pregão fica vazio em todos os campos (a soma do volume daria 0)
+    saida['Volume'] = saida['Volume'].mask(saida['Close'].isna())
+    return pd.concat(saida, axis=1)
+
+def juntar_barra(reamostrado, parcial):
+    """Soma ao reamostrado do histórico o reamostrar() de uma barra nova.
+
+    Se a barra cai no último período, ele é refeito com as regras de AGREGACAO;
+    senão, vira um período novo no fim. Mesmo resultado de reamostrar tudo de novo.
+    """
+    parcial = parcial.reindex(columns=reamostrado.columns)
+    if len(reamostrado.index) == 0 or parcial.index[-1] != reamostrado.index[-1]:
+        return pd.concat([reamostrado, parcial])
+
+    antes, barra = reamostrado.iloc[-1], parcial.iloc[-1]
+    tinha, veio = antes['Close'].notna(), barra['Close'].notna()
+    ultimo = pd.concat({
+        'Open': antes['Open'].where(tinha, barra['Open']),
+        'High': np.fmax(antes['High'], barra['High']),
+        'Low': np.fmin(antes['Low'], barra['Low']),
+        'Close': barra['Close'].where(veio, antes['Close']),
+        'Volume': antes['Volume'].fillna(0).add(barra['Volume'].fillna(0)).where(tinha | veio),
+    }).reindex(reamostrado.columns)
+    juntado = reamostrado.copy()
+    juntado.iloc[-1] = ultimo.to_numpy()
+    return juntado
+
+def confirmar(dados, periodo):
+    """RSI, Estocástico, banda inferior e fechamento do último período de cada ticker."""
+    return confirmar_reamostrado(reamostrar(dados, PERIODOS[periodo]['regra']), periodo)
+
+def confirmar_reamostrado(reamostrado, periodo):
+    # confirmar() a partir das barras já reamostradas no período
+    params = PERIODOS[periodo]
+    df_alinhado, _ = alinhar_validos(reamostrado)
+    close = df_alinhado['Close']
+
+    bb_lower, _ = calcular_bollinger(close, params['janela_bb'])
+    return pd.DataFrame({
+        'Close': close.iloc[-1],
+        'RSI': calcular_rsi(close, params['janela_rsi']).iloc[-1],
+        'Stoch': calcular_estocastico(close, df_alinhado['High'], df_alinhado['Low'], params['janela_stoch']).iloc[-1],
+        'BB_Lower': bb_lower.iloc[-1],
+    })
+
+def regras_confirmacao(confirmacoes, tickers, rsi_fundo=30, stoch_fundo=20, proximidade_bb=1.02):
+    # confirmacoes: {período: resultado de confirmar()} -> (regras [(rótulo, máscara)], colunas extras)
+    regras, colunas = [], {}
+    for periodo, conf in confirmacoes.items():
+        conf = conf.reindex(tickers)
+        regras += [
+            (f"RSI {periodo}", (conf['RSI'] < rsi_fundo).to_numpy()),
+            (f"Stoch {periodo}", (conf['Stoch'] < stoch_fundo).to_numpy()),
+            (f"BB {periodo}", (conf['Close'] < conf['BB_Lower'] * proximidade_bb).to_numpy()),
+        ]
+        colunas[f'RSI_{periodo}'] = conf['RSI'].to_numpy()
+        colunas[f'Stoch_{periodo}'] = conf['Stoch'].to_numpy()
+    return regras, colunas
+
+# --- CACHE ---
+
+class CacheMultiperiodo:
+    def __init__(self, capacidade=8):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def chave(dados, periodo):
+        # A última barra (data e fechamentos) identifica os dados; o universo entra pelo conjunto de tickers
+        close = dados['Close']
+        if close.empty: return (periodo, None)
+        return (periodo, close.index[-1], len(close.index), tuple(close.columns),
+                close.iloc[-1].to_numpy(dtype=np.float64).tobytes())
+
+    def obter(self, dados, periodo):
+        chave = self.chave(dados, periodo)
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+
+        resultado = confirmar(dados, periodo)
+        with self._trava:
+            self._itens[chave] = resultado
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+        return resultado
+
+    def confirmar_todos(self, dados, periodos=tuple(PERIODOS)):
+        return {periodo: self.obter(dados, periodo) for periodo in periodos}
+
+class ConfirmacaoIncremental:
+    """Semanal e mensal do pregão em andamento sem reamostrar o histórico (modo daemon).
+
+    O histórico fechado é reamostrado uma vez; cada barra parcial só refaz o
+    período corrente e recalcula os indicadores sobre as poucas barras semanais
+    e mensais.
+    """
+
+    def __init__(self, historico, periodos=tuple(PERIODOS)):
+        self.reamostrados = {periodo: reamostrar(historico, PERIODOS[periodo]['regra']) for periodo in periodos}
+
+    def confirmar_todos(self, barra):
+        return {periodo: confirmar_reamostrado(juntar_barra(reamostrado, reamostrar(barra, PERIODOS[periodo]['regra'])), periodo)
+                for periodo, reamostrado in self.reamostrados.items()}
@@ -0,0 +1,218 @@
+import asyncio
+import random
+import threading
+import time
+import urllib.parse
+
+# Envio de alertas: cada destinatário tem a própria fila assíncrona (as partes
+# de uma mensagem chegam em ordem), os destinatários são atendidos em paralelo
+# e todos compartilham uma sessão HTTP com pool de conexões. Um balde de
+# tokens por destinatário segura o ritmo, e falhas temporárias (rede, 5xx,
+# 208 do filtro de spam) são repetidas com backoff exponencial e jitter.
+#
+# Todo backend segue a mesma interface:
+#   backend.enviar(destinatario, texto) -> detalhe (str); levanta ErroTemporario ou ErroPermanente
+
+URL_CALLMEBOT = "https://api.callmebot.com/whatsapp.php"
+LIMITE_URL = 2000  # tamanho máximo do texto já codificado para a URL do GET
+
+class ErroTemporario(Exception):
+    pass
+
+class ErroPermanente(Exception):
+    pass
+
+def destinatarios_do_ambiente(telefones, apikeys):
+    # "5511...,5521..." e "key1,key2" (ou uma apikey só para todos) -> lista de destinatários
+    telefones = [t.replace("+", "").strip() for t in telefones.split(",") if t.strip()]
+    apikeys = [k.strip() for k in apikeys.split(",") if k.strip()]
+    if len(apikeys) == 1: apikeys = apikeys * len(telefones)
+    if len(apikeys) != len(telefones):
+        raise ValueError(f"{len(telefones)} telefones para {len(apikeys)} apikeys")
+    return [{'telefone': t, 'apikey': k} for t, k in zip(telefones, apikeys)]
+
+# --- DIVISÃO DE MENSAGENS ---
+
+def _tamanho(texto):
+    return len(urllib.parse.quote(texto))
+
+def dividir_mensagem(blocos, limite=LIMITE_URL):
+    """Agrupa os blocos (cabeçalho, um bloco por ativo, rodapé) em partes que cabem no limite.
+
+    Aceita uma string (os blocos passam a ser as linhas). Um bloco nunca é
+    cortado ao meio, a não ser que sozinho já passe do limite. Com mais de uma
+    parte, cada uma ganha a numeração "(1/3)" no topo.
+    """
+    if isinstance(blocos, str): blocos = [linha + "\n" for linha in blocos.split("\n")]
+    reserva = _tamanho("(99/99)\n")
+    limite_util = limite - reserva
+
+    partes, atual = [], ""
+    for bloco in blocos:
+        while _tamanho(bloco) > limite_util:
+            # Bloco gigante: corta em pedaços de caracteres que caibam
+            corte = len(bloco)
+            while _tamanho(bloco[:corte]) > limite_util: corte = corte * 3 // 4
+            if atual: partes.append(atual); atual = ""
+            partes.append(bloco[:corte])
+            bloco = bloco[corte:]
+        if atual and _tamanho(atual + bloco) > limite_util:
+            partes.append(atual)
+            atual = ""
+        atual += bloco
+    if atual.strip(): partes.append(atual)
+
+    partes = [p.rstrip("\n") for p in partes]
+    if len(partes) == 1: return partes
+    return [f"({i}/{len(partes)})\n{p}" for i, p in enumerate(partes, 1)]
+
+# --- BACKENDS ---
+
+class BackendCallMeBot:
+    def __init__(self, url=URL_CALLMEBOT, timeout=30, conexoes=10):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = url
+        self.timeout = timeout
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+
+    def enviar(self, destinatario, texto):
+        import requests
+
+        params = {'phone': destinatario['telefone'], 'text': texto, 'apikey': destinatario['apikey']}
+        try:
+            r = self.sessao.get(self.url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ErroTemporario(f"{type(e).__name__}: {e}")
+
+        # 200 = Sucesso | 201 = Na Fila | 208 = Spam (mensagem parecida demais com a anterior)
+        if r.status_code in (200, 201): return f"HTTP {r.status_code}"
+        if r.status_code == 208 or r.status_code == 429 or r.status_code >= 500:
+            raise ErroTemporario(f"HTTP {r.status_code}")
+        raise ErroPermanente(f"HTTP {r.status_code} - {r.text[:200]}")
+
+    def fechar(self):
+        self.sessao.close()
+
+class ServidorFalso:
+    """Imitação local do CallMeBot para testes: um servidor HTTP em 127.0.0.1.
+
+    `respostas` é a sequência de status devolvidos a cada chamada (depois dela,
+    sempre 200) e `latencia` simula um servidor lento. As mensagens recebidas
+    ficam em `self.recebidas` como (telefone, texto, status).
+    Uso: BackendCallMeBot(url=servidor.url).
+    """
+
+    def __init__(self, respostas=(), latencia=0.0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.respostas = list(respostas)
+        self.latencia = latencia
+        self.recebidas = []
+        self._trava = threading.Lock()
+
+        servidor_falso = self
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                if servidor_falso.latencia: time.sleep(servidor_falso.latencia)
+                with servidor_falso._trava:
+                    status = servidor_falso.respostas.pop(0) if servidor_falso.respostas else 200
+                    servidor_falso.recebidas.append((params.get('phone', [''])[0], params.get('text', [''])[0], status))
+                self.send_response(status)
+                self.end_headers()
+                self.wfile.write(b"ok" if status < 300 else b"erro simulado")
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        self.url = f"http://127.0.0.1:{self._http.server_port}/whatsapp.php"
+        self._thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._http.shutdown()
+        self._http.server_close()
+
+# --- DESPACHO ---
+
+class BaldeDeTokens:
+    def __init__(self, taxa, capacidade=1):
+        self.taxa = taxa  # tokens por segundo
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultimo = time.monotonic()
+
+    async def aguardar(self):
+        while True:
+            agora = time.monotonic()
+            self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+            self.ultimo = agora
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.taxa)
+
+class Despachante:
+    """Envia uma mensagem para vários destinatários, em paralelo, com retentativas.
+
+    `enviar()` é síncrono para quem chama (o bot) e devolve True se todas as
+    partes chegaram a todos. O resultado por destinatário fica em `self.relatorio`:
+      telefone -> {'enviadas', 'partes', 'tentativas', 'falhas': [motivos]}
+    """
+
+    def __init__(self, backend, destinatarios, taxa=0.2, rajada=1, tentativas=4, espera=2.0, limite=LIMITE_URL):
+        self.backend = backend
+        self.destinatarios = destinatarios
+        self.taxa = taxa  # mensagens por segundo para cada destinatário
+        self.rajada = rajada
+        self.tentativas = tentativas
+        self.espera = espera
+        self.limite = limite
+        self.relatorio = {}
+
+    def enviar(self, mensagem):
+        partes = dividir_mensagem(mensagem, self.limite)
+        self.relatorio = {d['telefone']: {'enviadas': 0, 'partes': len(partes), 'tentativas': 0, 'falhas': []}
+                          for d in self.destinatarios}
+        asyncio.run(self._despachar(partes))
+        return all(r['enviadas'] == r['partes'] for r in self.relatorio.values())
+
+    async def _despachar(self, partes):
+        filas = []
+        for destinatario in self.destinatarios:
+            fila = asyncio.Queue()
+            for parte in partes: fila.put_nowait(parte)
+            filas.append((destinatario, fila))
+        await asyncio.gather(*(self._consumir(d, fila) for d, fila in filas))
+
+    async def _consumir(self, destinatario, fila):
+        balde = BaldeDeTokens(self.taxa, self.rajada)
+        registro = self.relatorio[destinatario['telefone']]
+        while not fila.empty():
+            parte = fila.get_nowait()
+            for tentativa in range(1, self.tentativas + 1):
+                await balde.aguardar()
+                registro['tentativas'] += 1
+                try:
+                    # O backend é bloqueante (requests); roda numa thread sem travar os outros destinatários
+                    await asyncio.to_thread(self.backend.enviar, destinatario, parte)
+                    registro['enviadas'] += 1
+                    break
+                except ErroPermanente as e:
+                    registro['falhas'].append(str(e))
+                    break
+                except ErroTemporario as e:
+                    if tentativa == self.tentativas:
+                        registro['falhas'].append(str(e))
+                        break
+                    await asyncio.sleep(self.espera * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+            fila.task_done()
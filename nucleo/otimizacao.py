@@ -0,0 +1,186 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from nucleo.backtest import alinhar_ohlcv, elegibilidade, retornos_futuros
+from nucleo.indicadores import calcular_estocastico, calcular_macd_hist, calcular_rsi
+from nucleo.triagem import pontuar
+
+# Varredura de parâmetros (janelas dos indicadores e limites do score) num pool
+# de processos. O mercado vai para os workers uma única vez, via memória
+# compartilhada. Cada tarefa é um grupo de janelas com o mesmo RSI: o RSI sai
+# uma vez por tarefa, Estocástico/Bollinger/MACD ficam no cache do worker, e
+# cada janela é reaproveitada por todas as combinações de limites.
+#
+# Série sem lacunas, pregões completos, histórico mínimo e Fibonacci vêm dos
+# mesmos helpers do backtest (alinhar_ohlcv, elegibilidade): com as janelas e
+# limites padrão, a otimização conta os mesmos sinais do "Muito Alta" dele.
+
+GRADE_PADRAO = {
+    'janela_rsi': [10, 14, 21],
+    'janela_stoch': [9, 14],
+    'bollinger': [(20, 2), (20, 2.5)],
+    'macd': [(12, 26, 9)],
+    'rsi_fundo': [25, 30],
+    'rsi_medio': [40],
+    'stoch_fundo': [15, 20],
+    'proximidade_bb': [1.01, 1.02],
+}
+PARAMETROS_JANELA = ('janela_rsi', 'janela_stoch', 'bollinger', 'macd')
+PARAMETROS_LIMITE = ('rsi_fundo', 'rsi_medio', 'stoch_fundo', 'proximidade_bb')
+
+# --- MERCADO COMPARTILHADO ---
+
+def _publicar(df):
+    # Copia o OHLCV para um bloco (campo, data, ticker) em memória compartilhada
+    campos = list(df.columns.get_level_values(0).unique())
+    blocos = np.stack([df[campo].to_numpy(dtype=np.float64) for campo in campos])
+    shm = shared_memory.SharedMemory(create=True, size=blocos.nbytes)
+    np.ndarray(blocos.shape, dtype=blocos.dtype, buffer=shm.buf)[:] = blocos
+    return shm, blocos.shape, campos
+
+_worker = {}
+
+def _iniciar_worker(nome_shm, formato, campos, datas, tickers, horizonte, score_minimo):
+    shm = shared_memory.SharedMemory(name=nome_shm)
+    blocos = np.ndarray(formato, dtype=np.float64, buffer=shm.buf)
+    df = pd.concat({nome: pd.DataFrame(blocos[i], index=datas, columns=tickers, copy=False)
+                    for i, nome in enumerate(campos)}, axis=1)
+
+    # Indicadores na série sem lacunas de cada ticker, de volta às datas originais (como no backtest)
+    alinhado, voltar = alinhar_ohlcv(df)
+    retorno, drawdown = retornos_futuros(df, horizonte)
+
+    _worker.update({
+        'shm': shm,  # mantém o mapeamento vivo enquanto o worker existir
+        'df': df,
+        'alinhado': alinhado,
+        'voltar': voltar,
+        'queda_dia': voltar(alinhado['Close'].pct_change(fill_method=None) * 100),
+        'retorno': retorno.to_numpy(),
+        'drawdown': drawdown.to_numpy(),
+        'score_minimo': score_minimo,
+        'cache': {},
+    })
+
+def _em_cache(chave, calcular):
+    # Bloco calculado na série sem lacunas e devolvido nas datas originais
+    cache = _worker['cache']
+    if chave not in cache:
+        cache[chave] = _worker['voltar'](calcular())
+    return cache[chave]
+
+# --- AVALIAÇÃO (dentro do worker) ---
+
+def _avaliar_grupo(grupo, limites):
+    # Janelas com o mesmo RSI: o RSI é calculado uma vez para o grupo todo
+    resultados = [linha for janelas in grupo for linha in _avaliar_janelas(janelas, limites)]
+    _worker['cache'] = {chave: bloco for chave, bloco in _worker['cache'].items() if chave[0] != 'rsi'}
+    return resultados
+
+def _avaliar_janelas(janelas, limites):
+    close = _worker['alinhado']['Close']
+    high = _worker['alinhado']['High']
+    low = _worker['alinhado']['Low']
+    janela_bb, desvios_bb = janelas['bollinger']
+
+    rsi = _em_cache(('rsi', janelas['janela_rsi']), lambda: calcular_rsi(close, janelas['janela_rsi']))
+    stoch = _em_cache(('stoch', janelas['janela_stoch']),
+                      lambda: calcular_estocastico(close, high, low, janelas['janela_stoch']))
+    sma = _em_cache(('sma', janela_bb), lambda: close.rolling(janela_bb).mean())
+    std = _em_cache(('std', janela_bb), lambda: close.rolling(janela_bb).std())
+    macd_hist = _em_cache(('macd',) + tuple(janelas['macd']), lambda: calcular_macd_hist(close, *janelas['macd']))
+    bb_lower = sma - std * desvios_bb
+
+    elegivel, fibo_618 = elegibilidade(_worker['df'], [rsi, stoch, macd_hist, bb_lower], _worker['queda_dia'])
+    retorno = _worker['retorno']
+    drawdown = _worker['drawdown']
+    elegivel = elegivel.to_numpy() & np.isfinite(retorno) & np.isfinite(drawdown)
+    fechamento = _worker['df']['Close'].to_numpy()
+    rsi, stoch, macd_hist = rsi.to_numpy(), stoch.to_numpy(), macd_hist.to_numpy()
+    bb_lower, fibo_618 = bb_lower.to_numpy(), fibo_618.to_numpy()
+
+    resultados = []
+    for combinacao in limites:
+        _, score = pontuar(fechamento, rsi, stoch, macd_hist, bb_lower, fibo_618, **combinacao)
+        sinal = elegivel & (score >= _worker['score_minimo'])
+        n = int(sinal.sum())
+        r = retorno[sinal]
+        resultados.append({
+            **{k: v for k, v in janelas.items()},
+            **combinacao,
+            'sinais': n,
+            'retorno_medio_%': r.mean() * 100 if n else np.nan,
+            'acerto_%': (r > 0).mean() * 100 if n else np.nan,
+            'drawdown_medio_%': drawdown[sinal].mean() * 100 if n else np.nan,
+        })
+    return resultados
+
+# --- VARREDURA ---
+
+def expandir_grade(grade):
+    janelas = [dict(zip(PARAMETROS_JANELA, valores)) for valores in itertools.product(*(grade[p] for p in PARAMETROS_JANELA))]
+    limites = [dict(zip(PARAMETROS_LIMITE, valores)) for valores in itertools.product(*(grade[p] for p in PARAMETROS_LIMITE))]
+    return janelas, limites
+
+def varrer(df, grade=None, horizonte=5, score_minimo=4, max_workers=None, min_sinais=30):
+    """Avalia a grade no universo inteiro e devolve as configurações ordenadas.
+
+    Cada configuração é julgada pelos sinais com score >= `score_minimo` em dias
+    de queda: retorno médio `horizonte` pregões depois, taxa de acerto e drawdown.
+    Configurações com menos de `min_sinais` sinais vão para o fim do ranking.
+    """
+    grade = {**GRADE_PADRAO, **(grade or {})}
+    janelas, limites = expandir_grade(grade)
+
+    # Uma tarefa por janela de RSI: o pool entrega cada tarefa a qualquer worker livre, então o
+    # reaproveitamento garantido é o que fica dentro da tarefa
+    janelas.sort(key=lambda j: (j['janela_rsi'], j['janela_stoch'], j['bollinger']))
+    grupos = [list(grupo) for _, grupo in itertools.groupby(janelas, key=lambda j: j['janela_rsi'])]
+    max_workers = max_workers or min(len(grupos), os.cpu_count() or 1)
+
+    shm, formato, campos = _publicar(df)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_iniciar_worker,
+                                 initargs=(shm.name, formato, campos, df.index, df['Close'].columns,
+                                           horizonte, score_minimo)) as pool:
+            partes = list(pool.map(_avaliar_grupo, grupos, itertools.repeat(limites)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    ranking = pd.DataFrame([linha for parte in partes for linha in parte])
+    ranking['suficiente'] = ranking['sinais'] >= min_sinais
+    ranking = ranking.sort_values(['suficiente', 'retorno_medio_%', 'acerto_%'], ascending=[False, False, False])
+    return ranking.drop(columns='suficiente').reset_index(drop=True)
+
+def main():
+    from nucleo.armazenamento import ArmazemOHLCV
+
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros dos indicadores e do score")
+    parser.add_argument("--dados", default="dados", help="diretório do armazém OHLCV")
+    parser.add_argument("--periodo", default=None, help='recorte do histórico, ex.: "2y" (padrão: tudo)')
+    parser.add_argument("--horizonte", type=int, default=5)
+    parser.add_argument("--score-minimo", type=int, default=4, help="score mínimo para contar como sinal (4 = Muito Alta)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--csv", help="grava o ranking completo neste CSV")
+    args = parser.parse_args()
+
+    df = ArmazemOHLCV(args.dados).carregar(periodo=args.periodo)
+    if df.empty:
+        print(f"Armazém vazio em {args.dados}. Rode o bot ou o app antes.")
+        return
+
+    ranking = varrer(df, horizonte=args.horizonte, score_minimo=args.score_minimo, max_workers=args.workers)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(ranking.head(args.top).round(2).to_string(index=False))
+    if args.csv: ranking.to_csv(args.csv, index=False)
+
+if __name__ == "__main__":
+    main()
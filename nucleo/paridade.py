@@ -0,0 +1,186 @@
+import json
+import os
+import warnings
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from nucleo.armazenamento import ArmazemOHLCV
+from nucleo.download import SEM_DADOS, BaixadorEmLotes, baixar_yahoo
+from nucleo.indicadores import alinhar_blocos, para_blocos
+
+# Prêmio/desconto de cada BDR sobre o ativo de origem: o preço em reais que o
+# BDR "deveria" ter é  preço lá fora x USD/BRL x paridade. Assim uma queda que
+# veio só do câmbio não parece venda de verdade, e um BDR negociado abaixo do
+# valor de origem vira sinal.
+#
+# Ativo de origem: o ticker sem o sufixo numérico (AAPL34 -> AAPL), menos ETFs
+# (39), que replicam índices. Exceções vão em dados/paridades.json:
+#   {"AMZO34": {"subjacente": "AMZN"}, "XPTO34": {"subjacente": "XPT", "paridade": 0.05}}
+# Sem paridade informada, ela é estimada pela mediana da razão BDR / (origem x
+# câmbio) nos pregões anteriores; o prêmio é então o desvio do dia em relação
+# a essa relação recente.
+#
+# O ticker sem sufixo nem sempre é a mesma empresa lá fora (GOGL34 não é GOGL).
+# Por isso, uma origem adivinhada só vale se os retornos diários andarem juntos
+# com os do BDR e a razão entre os dois for estável na janela. Uma origem
+# reprovada fica como desconhecida: prêmio NaN, sem sinal e sem mudar o ranking.
+# Origens listadas em paridades.json são aceitas sem checagem.
+#
+# Preços de fora e câmbio passam pelo mesmo baixador em lotes e ficam num
+# armazém próprio (dados/exterior), então cada varredura baixa só o delta.
+# Origem adivinhada que o Yahoo não conhece, ou que validar_origem() reprovou,
+# vai para dados/origens_descartadas.json e deixa de ser pedida (senão o
+# armazém a pediria por inteiro em toda varredura, a cada 15 min no daemon)
+# até vencer em REAVALIAR_ORIGEM_DIAS:
+#   {"tickers": {bdr: {"subjacente", "motivo", "avaliado_em"}}}
+
+CAMBIO = "BRL=X"          # USD/BRL no Yahoo
+JANELA_PARIDADE = 60      # pregões usados para estimar a paridade implícita
+LIMITE_DESCONTO = -2.0    # % abaixo do valor de origem para o sinal "Desconto Paridade"
+PREENCHER_FERIADOS = 3    # dias sem cotação lá fora (feriado nos EUA) reaproveitam o último preço
+MIN_CORRELACAO_ORIGEM = 0.5    # correlação mínima dos retornos diários BDR x origem (em reais)
+MAX_DISPERSAO_PARIDADE = 0.05  # desvio padrão / mediana da razão BDR / origem na janela
+MIN_OBSERVACOES_ORIGEM = 20    # pregões em comum para validar uma origem adivinhada
+REAVALIAR_ORIGEM_DIAS = 7      # validade do descarte de uma origem adivinhada
+ORIGEM_REPROVADA = "não confere com o BDR"
+
+def subjacente_padrao(ticker):
+    if ticker.endswith('39'): return None
+    return ticker[:-2]
+
+def ler_mapa(diretorio):
+    caminho = os.path.join(diretorio, "paridades.json")
+    if not os.path.exists(caminho): return {}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def mapear(tickers, excecoes=None):
+    # BDR -> (subjacente, paridade informada ou NaN, se veio de paridades.json); sem origem conhecida, subjacente vazio
+    excecoes = excecoes or {}
+    subjacente = [excecoes.get(t, {}).get('subjacente', subjacente_padrao(t)) or "" for t in tickers]
+    paridade = [excecoes.get(t, {}).get('paridade', np.nan) for t in tickers]
+    informado = [t in excecoes for t in tickers]
+    return pd.DataFrame({'subjacente': subjacente, 'paridade': np.asarray(paridade, dtype=float),
+                         'informado': informado}, index=tickers)
+
+def validar_origem(razao, em_reais):
+    """Origem confere com o BDR? Arrays (datas x BDRs) da janela, já sem lacunas.
+
+    Exige retornos diários correlacionados e razão BDR / origem estável.
+    Retorna (confere, avaliada): sem MIN_OBSERVACOES_ORIGEM pregões em comum
+    não dá para julgar, e a origem não confere nem é reprovada.
+    """
+    bdr = razao * em_reais
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = bdr[1:] / bdr[:-1] - 1
+        y = em_reais[1:] / em_reais[:-1] - 1
+    valido = np.isfinite(x) & np.isfinite(y)
+    n = valido.sum(axis=0)
+    x, y = np.where(valido, x, 0.0), np.where(valido, y, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mx, my = x.sum(axis=0) / n, y.sum(axis=0) / n
+        cov = (x * y).sum(axis=0) / n - mx * my
+        correlacao = cov / np.sqrt(((x * x).sum(axis=0) / n - mx ** 2) * ((y * y).sum(axis=0) / n - my ** 2))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        dispersao = np.nanstd(razao, axis=0) / np.nanmedian(razao, axis=0)
+    avaliada = n >= MIN_OBSERVACOES_ORIGEM
+    with np.errstate(invalid='ignore'):
+        return avaliada & (correlacao >= MIN_CORRELACAO_ORIGEM) & (dispersao <= MAX_DISPERSAO_PARIDADE), avaliada
+
+def calcular_premio(close_bdr, close_origem, cambio, mapa, janela=JANELA_PARIDADE):
+    """Prêmio (%) de todos os BDRs de uma vez, com arrays alinhados (datas x BDRs).
+
+    close_bdr: DataFrame datas x BDR; close_origem: datas x ativo de origem
+    (calendário dos EUA); cambio: Series USD/BRL; mapa: saída de mapear().
+    Retorna DataFrame por BDR com Premio, Paridade e Var_Origem (variação do
+    dia do ativo de origem já em reais, câmbio incluído). Origem adivinhada
+    que não passa em validar_origem() sai com tudo NaN e Reprovada=True.
+    """
+    datas = close_bdr.index
+    bdr = close_bdr.to_numpy(dtype=float)
+
+    # Origem e câmbio no calendário da B3, uma coluna por BDR
+    origem = close_origem.reindex(datas).ffill(limit=PREENCHER_FERIADOS)
+    pos = origem.columns.get_indexer(mapa['subjacente'].reindex(close_bdr.columns))
+    em_reais = np.where(pos >= 0, origem.to_numpy(dtype=float)[:, pos], np.nan)
+    em_reais = em_reais * cambio.reindex(datas).ffill(limit=PREENCHER_FERIADOS).to_numpy(dtype=float)[:, None]
+
+    # Cada BDR na própria série sem lacunas: a última linha é o último pregão válido
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alinhado, n_validos = alinhar_blocos(np.stack([bdr / em_reais, em_reais]))
+    razao, em_reais = alinhado
+
+    informada = mapa['paridade'].reindex(close_bdr.columns).to_numpy(dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # mediana de coluna vazia é NaN, sem alarde
+        estimada = np.nanmedian(razao[-janela - 1:-1], axis=0)
+    paridade = np.where(np.isnan(informada), estimada, informada)
+
+    informado = mapa['informado'].reindex(close_bdr.columns, fill_value=False).to_numpy(dtype=bool)
+    validada, avaliada = validar_origem(razao[-janela - 1:-1], em_reais[-janela - 1:-1])
+    confere = informado | validada
+    paridade = np.where(confere, paridade, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        premio = (razao[-1] / paridade - 1) * 100
+        var_origem = np.where(confere, (em_reais[-1] / em_reais[-2] - 1) * 100, np.nan)
+    return pd.DataFrame({'Premio': premio, 'Paridade': paridade, 'Var_Origem': var_origem,
+                         'Reprovada': avaliada & ~confere}, index=close_bdr.columns)
+
+class Paridades:
+    def __init__(self, diretorio, baixador=None, excecoes=None):
+        baixador = baixador or BaixadorEmLotes(partial(baixar_yahoo, sufixo="", threads=False))
+        self.armazem = ArmazemOHLCV(os.path.join(diretorio, "exterior"), baixador=baixador)
+        self.excecoes = excecoes if excecoes is not None else ler_mapa(diretorio)
+        self.caminho_descartadas = os.path.join(diretorio, "origens_descartadas.json")
+
+    def _ler_descartadas(self, hoje):
+        # Só os descartes ainda válidos; os vencidos voltam a ser pedidos e avaliados
+        if not os.path.exists(self.caminho_descartadas): return {}
+        with open(self.caminho_descartadas, encoding="utf-8") as f:
+            descartadas = json.load(f)['tickers']
+        return {t: d for t, d in descartadas.items()
+                if (hoje - pd.Timestamp(d['avaliado_em'])).days < REAVALIAR_ORIGEM_DIAS}
+
+    def _gravar_descartadas(self, descartadas):
+        os.makedirs(os.path.dirname(self.caminho_descartadas) or ".", exist_ok=True)
+        temporario = f"{self.caminho_descartadas}.{os.getpid()}"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({'tickers': descartadas}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho_descartadas)
+
+    def calcular(self, dados, periodo, hoje=None):
+        # dados: mercado de BDRs (DataFrame ou MercadoCompacto) -> prêmio por BDR
+        hoje = pd.Timestamp(hoje if hoje is not None else pd.Timestamp.now()).normalize()
+        campos, tickers, datas, blocos = para_blocos(dados, ['Close'])
+        mapa = mapear(tickers, self.excecoes)
+
+        # Origem adivinhada descartada há pouco nem é pedida ao Yahoo
+        descartadas = self._ler_descartadas(hoje)
+        descartada = np.array([descartadas.get(t, {}).get('subjacente') == s for t, s in mapa['subjacente'].items()],
+                              dtype=bool) & ~mapa['informado'].to_numpy(dtype=bool)
+        mapa.loc[descartada, 'subjacente'] = ""
+        simbolos = sorted(set(mapa['subjacente']) - {""}) + [CAMBIO]
+
+        exterior = self.armazem.atualizar(simbolos, periodo)
+        vazio = pd.DataFrame({'Premio': np.nan, 'Paridade': np.nan, 'Var_Origem': np.nan, 'Reprovada': False},
+                             index=tickers)
+        # Sem o câmbio o Yahoo estava fora do ar: nada é descartado
+        if exterior.empty or CAMBIO not in exterior['Close'].columns: return vazio
+
+        close_bdr = pd.DataFrame(blocos[0], index=datas, columns=tickers)
+        close_exterior = exterior['Close']
+        paridade = calcular_premio(close_bdr, close_exterior.drop(columns=CAMBIO), close_exterior[CAMBIO], mapa)
+
+        falhas = self.armazem.relatorio['falhas']
+        adivinhadas = mapa[(mapa['subjacente'] != "") & ~mapa['informado']]
+        sem_dados = adivinhadas['subjacente'].map(falhas).eq(SEM_DADOS)
+        reprovadas = paridade['Reprovada'].reindex(adivinhadas.index, fill_value=False)
+        novas = {t: {'subjacente': s, 'motivo': SEM_DADOS if sem_dados[t] else ORIGEM_REPROVADA,
+                     'avaliado_em': hoje.strftime("%Y-%m-%d")}
+                 for t, s in adivinhadas['subjacente'][sem_dados | reprovadas].items()}
+        if novas: self._gravar_descartadas({**descartadas, **novas})
+        return paridade
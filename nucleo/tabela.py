@@ -0,0 +1,74 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from nucleo.triagem import ORDEM_POTENCIAL
+
+# Tabela de resultados do app: as cores de I.S. e Potencial são calculadas uma
+# vez, para todas as linhas, com operações vetorizadas (nada de Styler.map
+# chamando Python célula a célula). Filtros e ordenação rodam sobre os
+# resultados em cache e só a página visível vai para o navegador.
+
+CSS_IS_EXTREMO = 'background-color: #d32f2f; color: white; font-weight: bold'  # Vermelho (alerta oportunidade)
+CSS_IS_ALTO = 'background-color: #ffa726; color: black'  # Laranja
+CSS_IS_NORMAL = 'color: #888888'  # Cinza apagado
+CSS_POTENCIAL = {
+    'Muito Alta': 'background-color: #2e7d32; color: white; font-weight: bold',
+    'Alta': 'background-color: #66bb6a; color: black; font-weight: bold',
+    'Média': 'background-color: #ffa726; color: black',
+    'Baixa': 'background-color: #e0e0e0; color: black',
+}
+COLUNAS_ESTILIZADAS = ['IS', 'Potencial']
+
+def calcular_estilos(df):
+    # CSS por célula das colunas estilizadas, mesmo índice do df
+    with np.errstate(invalid='ignore'):
+        css_is = np.select([df['IS'] >= 75, df['IS'] >= 60], [CSS_IS_EXTREMO, CSS_IS_ALTO], default=CSS_IS_NORMAL)
+    css_potencial = df['Potencial'].map(CSS_POTENCIAL).fillna('')
+    return pd.DataFrame({'IS': css_is, 'Potencial': css_potencial}, index=df.index)
+
+class TabelaResultados:
+    """Resultados da triagem prontos para filtrar, ordenar e paginar."""
+
+    def __init__(self, df_res):
+        self.dados = df_res.reset_index(drop=True)
+        self.estilos = calcular_estilos(self.dados)
+        self.sufixos = self.dados['Ticker'].str[-2:].to_numpy()
+
+    def __len__(self):
+        return len(self.dados)
+
+    @property
+    def sufixos_disponiveis(self):
+        return sorted(set(self.sufixos))
+
+    def filtrar(self, is_min=0, score_min=0, potenciais=None, sufixos=None):
+        # Posições das linhas que passam em todos os filtros
+        mascara = np.ones(len(self.dados), dtype=bool)
+        if is_min: mascara &= self.dados['IS'].to_numpy() >= is_min
+        if score_min: mascara &= self.dados['Score'].to_numpy() >= score_min
+        if potenciais is not None: mascara &= self.dados['Potencial'].isin(potenciais).to_numpy()
+        if sufixos is not None: mascara &= np.isin(self.sufixos, list(sufixos))
+        return np.flatnonzero(mascara)
+
+    def ordenar(self, posicoes, coluna, crescente=True):
+        if coluna not in self.dados.columns: return posicoes  # retrato antigo, sem a coluna
+        if coluna == 'Potencial':
+            # Ordem do sinal (Muito Alta -> Baixa), não alfabética
+            valores = pd.Categorical(self.dados['Potencial'].to_numpy()[posicoes], categories=ORDEM_POTENCIAL).codes
+        else:
+            valores = self.dados[coluna].to_numpy()[posicoes]
+        if valores.dtype.kind not in 'biuf': valores = np.unique(valores, return_inverse=True)[1]
+        # Decrescente pelo valor negado, não invertendo a ordem: empates seguem a ordem da tabela
+        # (maior queda primeiro) e NaN continua no fim
+        valores = valores.astype(float)
+        ordem = np.argsort(valores if crescente else -valores, kind='stable')
+        return posicoes[ordem]
+
+    def pagina(self, posicoes, numero, por_pagina=25):
+        # numero começa em 1. Retorna (linhas da página, CSS dessas linhas, total de páginas)
+        total = max(1, math.ceil(len(posicoes) / por_pagina))
+        numero = min(max(1, numero), total)
+        fatia = posicoes[(numero - 1) * por_pagina: numero * por_pagina]
+        return self.dados.iloc[fatia], self.estilos.iloc[fatia], total
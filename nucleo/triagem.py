@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from nucleo.indicadores import alinhar_blocos, para_blocos
+from nucleo.multiperiodo import regras_confirmacao
+from nucleo.paridade import LIMITE_DESCONTO
+from nucleo.universo import encurtar_nome
+
+# Triagem colunar: as regras de gerar_sinal e o I.S. avaliados para todos os
+# tickers de uma vez, sobre o último pregão válido de cada um.
+
+MIN_PREGOES = 50
+JANELA_TENDENCIA = 200  # SMA200: "Tendência Alta" com o preço acima dela
+ORDEM_POTENCIAL = ["Muito Alta", "Alta", "Média", "Baixa"]
+
+def classificar(score):
+    return np.select([score >= 4, score >= 2, score >= 1], ["Muito Alta", "Alta", "Média"], default="Baixa")
+
+def juntar_sinais(regras, index, vazio="-"):
+    # regras: lista de (rótulo, máscara booleana) -> "Rótulo A, Rótulo B" por ticker
+    texto = pd.Series("", index=index)
+    for rotulo, mascara in regras:
+        texto = texto + np.where(mascara, rotulo + ", ", "")
+    texto = texto.str.rstrip(", ")
+    return texto.where(texto != "", vazio)
+
+def pontuar(close, rsi, stoch, macd_hist, bb_lower, fibo_618,
+            rsi_fundo=30, rsi_medio=40, stoch_fundo=20, proximidade_bb=1.02):
+    """Regras de reversão sobre arrays de qualquer formato (1-D por ticker, 2-D datas x tickers).
+
+    Retorna a lista de regras (rótulo, máscara) e o score, sem montar texto.
+    Os limites padrão são os do app; a otimização varia esses valores.
+    """
+    close, rsi, stoch = np.asarray(close), np.asarray(rsi), np.asarray(stoch)
+    macd_hist, bb_lower, fibo_618 = np.asarray(macd_hist), np.asarray(bb_lower), np.asarray(fibo_618)
+
+    with np.errstate(invalid='ignore'):
+        rsi_oversold = rsi < rsi_fundo
+        abaixo_bb = close < bb_lower
+        suporte_bb = ~abaixo_bb & (close < bb_lower * proximidade_bb)
+        fibo = (fibo_618 * 0.99 <= close) & (close <= fibo_618 * 1.01)
+        regras = [
+            ("RSI Oversold", rsi_oversold, 3),
+            ("Stoch. Fundo", stoch < stoch_fundo, 2),
+            ("MACD Virando", macd_hist > 0, 1),
+            ("Abaixo BB", abaixo_bb, 2),
+            ("Suporte BB", suporte_bb, 1),
+            ("Fibo 61.8%", fibo, 2),
+        ]
+        score = sum(mascara * pontos for _, mascara, pontos in regras)
+        score = score + (~rsi_oversold & (rsi < rsi_medio))
+
+    return [(rotulo, mascara) for rotulo, mascara, _ in regras], score.astype(int)
+
+def gerar_sinal(close, rsi, stoch, macd_hist, bb_lower, fibo_618, confirmacoes=()):
+    """Sinais de reversão, score e classificação para vários tickers (arrays alinhados).
+
+    `confirmacoes` são regras extras (rótulo, máscara), como as semanais/mensais,
+    que entram no texto dos sinais sem mudar o score.
+    """
+    regras, score = pontuar(close, rsi, stoch, macd_hist, bb_lower, fibo_618)
+    sinais = juntar_sinais(regras + list(confirmacoes), pd.RangeIndex(len(score)))
+    return sinais.to_numpy(), score, classificar(score)
+
+def resumo_blocos(dados):
+    """Último pregão válido de cada ticker, lido dos blocos alinhados.
+
+    Retorna (tickers, valores), com `valores` = {nome: array por ticker}: os
+    campos e indicadores do último pregão mais Close_Anterior, Close_7d,
+    Maxima/Minima do histórico, SMA200 e Pregoes. É a entrada de triar().
+    Tudo sai das mesmas linhas completas (OHLCV e indicadores), como no
+    dropna do gerar_sinal original e no backtest.
+    """
+    campos, tickers, _, blocos = para_blocos(dados)
+    alinhado, pregoes = alinhar_blocos(blocos)
+    campo = {nome: alinhado[i] for i, nome in enumerate(campos)}
+    valores = {nome: serie[-1] for nome, serie in campo.items()}
+
+    close = campo['Close']
+    valores.update(
+        Close_Anterior=close[-2],
+        Close_7d=close[-6],
+        # fmax/fmin ignoram NaN sem avisar de coluna vazia
+        Maxima=np.fmax.reduce(campo['High'], axis=0),
+        Minima=np.fmin.reduce(campo['Low'], axis=0),
+        SMA200=np.where(pregoes >= JANELA_TENDENCIA, close[-JANELA_TENDENCIA:].mean(axis=0), np.nan),
+        Pregoes=pregoes,
+    )
+    return tickers, valores
+
+def triar(tickers, valores, nomes_curtos, confirmacoes=None, paridade=None):
+    # valores: saída de resumo_blocos (varredura completa) ou da prévia intradiária do daemon
+    # nomes_curtos: Universo.nomes_curtos (já normalizados uma vez, no cache da BRAPI)
+    # confirmacoes: {período: DataFrame} de CacheMultiperiodo.confirmar_todos (opcional)
+    # paridade: DataFrame por ticker de Paridades.calcular, com Premio e Var_Origem (opcional)
+    preco = valores['Close']
+    preco_ant = valores['Close_Anterior']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        queda_dia = ((preco - preco_ant) / preco_ant) * 100
+        gap = ((valores['Open'] - preco_ant) / preco_ant) * 100
+        var_7d = ((preco - valores['Close_7d']) / valores['Close_7d']) * 100
+        tendencia_alta = preco > valores['SMA200']
+    if paridade is None: paridade = pd.DataFrame(columns=['Premio', 'Var_Origem'], dtype=float)
+    premio = paridade['Premio'].reindex(tickers).to_numpy(dtype=float)
+    var_origem = paridade['Var_Origem'].reindex(tickers).to_numpy(dtype=float)
+
+    selecionados = (valores['Pregoes'] >= MIN_PREGOES) & (queda_dia < 0)
+    if not selecionados.any(): return pd.DataFrame()
+    ultimo = {nome: np.asarray(v)[selecionados] for nome, v in valores.items()}
+
+    # Fibonacci 61.8% sobre a máxima/mínima de todo o histórico válido
+    fibo_618 = ultimo['Minima'] + ((ultimo['Maxima'] - ultimo['Minima']) * 0.618)
+
+    # Tendência (SMA200), desconto sobre o ativo de origem e confirmações
+    # semanais/mensais entram no texto, não no score
+    regras_extra, colunas_extra = regras_confirmacao(confirmacoes or {}, tickers)
+    with np.errstate(invalid='ignore'):
+        desconto = premio <= LIMITE_DESCONTO
+    regras_extra = [("Tendência Alta", tendencia_alta), ("Desconto Paridade", desconto)] + regras_extra
+    sinais, score, classificacao = gerar_sinal(
+        ultimo['Close'], ultimo['RSI14'], ultimo['Stoch_K'], ultimo['MACD_Hist'], ultimo['BB_Lower'], fibo_618,
+        confirmacoes=[(rotulo, np.asarray(mascara)[selecionados]) for rotulo, mascara in regras_extra]
+    )
+
+    # --- ÍNDICE DE SOBREVENDA (I.S.) ---
+    # Quanto maior, mais sobrevendido: média do RSI e do Estocástico invertidos
+    is_index = ((100 - ultimo['RSI14']) + (100 - ultimo['Stoch_K'])) / 2
+
+    tickers = tickers[selecionados]
+    return pd.DataFrame({
+        'Ticker': tickers,
+        'Empresa': [nomes_curtos.get(t) or encurtar_nome(t, t) for t in tickers],
+        'Preco': ultimo['Close'],
+        'Volume': ultimo['Volume'],
+        'Queda_Dia': queda_dia[selecionados],
+        'Gap': gap[selecionados],
+        'Var_7d': var_7d[selecionados],
+        'IS': is_index,
+        'RSI14': ultimo['RSI14'],
+        'Stoch': ultimo['Stoch_K'],
+        'Tendencia_Alta': tendencia_alta[selecionados],
+        'Premio': premio[selecionados],
+        'Var_Origem': var_origem[selecionados],
+        'Potencial': classificacao,
+        'Score': score,
+        'Sinais': sinais,
+        **{coluna: valores[selecionados] for coluna, valores in colunas_extra.items()},
+    })
+
+def analisar_oportunidades(df_calc, nomes_curtos, confirmacoes=None, paridade=None):
+    # df_calc: DataFrame (campo, ticker) de calcular_indicadores ou MercadoCompacto
+    tickers, valores = resumo_blocos(df_calc)
+    return triar(tickers, valores, nomes_curtos, confirmacoes, paridade)
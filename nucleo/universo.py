@@ -0,0 +1,120 @@
+import json
+import os
+import time
+
+# Universo de BDRs: a lista da BRAPI fica em disco e só é baixada de novo
+# quando o TTL vence e o servidor diz que mudou (ETag/Last-Modified). Os nomes
+# curtos de exibição são calculados uma vez, na gravação, e o universo expõe
+# buscas indexadas por ticker, sufixo e nome.
+
+URL_BRAPI = "https://brapi.dev/api/quote/list"
+TERMINACOES_BDR = ('31', '32', '33', '34', '35', '39')
+IGNORAR_NOMES = frozenset(['INC', 'CORP', 'LTD', 'S.A.', 'GMBH', 'PLC', 'GROUP', 'HOLDINGS'])
+
+def encurtar_nome(nome_completo, ticker):
+    palavras = nome_completo.split()
+    palavras_uteis = [p for p in palavras if p.upper().replace('.', '') not in IGNORAR_NOMES]
+    nome_curto = " ".join(palavras_uteis[:2]) if len(palavras_uteis) > 0 else ticker
+    return nome_curto.replace(',', '').title()
+
+def classe_sufixo(ticker):
+    return "ETF" if ticker.endswith('39') else "BDR"
+
+class Universo:
+    def __init__(self, registros):
+        # registros: dicts com ticker, nome, nome_curto
+        self.registros = registros
+        self.tickers = [r['ticker'] for r in registros]
+        self.mapa_nomes = {r['ticker']: r['nome'] for r in registros}
+        self.nomes_curtos = {r['ticker']: r['nome_curto'] for r in registros}
+
+        self._por_sufixo = {}
+        self._por_classe = {}
+        self._por_palavra = {}
+        for r in registros:
+            ticker = r['ticker']
+            self._por_sufixo.setdefault(ticker[-2:], []).append(ticker)
+            self._por_classe.setdefault(classe_sufixo(ticker), []).append(ticker)
+            for palavra in set(r['nome'].upper().replace(',', ' ').split()):
+                self._por_palavra.setdefault(palavra, []).append(ticker)
+
+    @classmethod
+    def da_brapi(cls, dados):
+        bdrs_raw = [d for d in dados if d['stock'].endswith(TERMINACOES_BDR)]
+        return cls([{
+            'ticker': d['stock'],
+            'nome': d.get('name') or d['stock'],
+            'nome_curto': encurtar_nome(d.get('name') or d['stock'], d['stock']),
+        } for d in bdrs_raw])
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self.mapa_nomes
+
+    def por_sufixo(self, sufixo):
+        return list(self._por_sufixo.get(sufixo, []))
+
+    def por_classe(self, classe):
+        return list(self._por_classe.get(classe, []))
+
+    def buscar_nome(self, texto):
+        # Tickers cujo nome contém todas as palavras de `texto`
+        palavras = texto.upper().replace(',', ' ').split()
+        if not palavras: return []
+        encontrados = set(self._por_palavra.get(palavras[0], []))
+        for palavra in palavras[1:]:
+            encontrados &= set(self._por_palavra.get(palavra, []))
+        return [t for t in self.tickers if t in encontrados]
+
+# --- CACHE EM DISCO ---
+
+def carregar_universo(diretorio, token=None, ttl=3600, agora=None):
+    """Universo de BDRs a partir do cache em disco, revalidando na BRAPI quando o TTL vence.
+
+    Se a BRAPI falhar e houver cache (mesmo vencido), usa o cache. Sem cache, a
+    exceção da requisição sobe para quem chamou.
+    """
+    agora = time.time() if agora is None else agora
+    caminho = os.path.join(diretorio, "universo.json")
+    cache = None
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            cache = json.load(f)
+        if agora - cache['validado_em'] < ttl:
+            return Universo(cache['registros'])
+
+    cabecalhos = {}
+    if cache and cache.get('etag'): cabecalhos['If-None-Match'] = cache['etag']
+    if cache and cache.get('last_modified'): cabecalhos['If-Modified-Since'] = cache['last_modified']
+    params = {'token': token} if token else None
+
+    import requests
+    try:
+        r = requests.get(URL_BRAPI, params=params, headers=cabecalhos, timeout=30)
+        if r.status_code == 304 and cache:
+            cache['validado_em'] = agora
+            _gravar_cache(caminho, cache)
+            return Universo(cache['registros'])
+        r.raise_for_status()
+        universo = Universo.da_brapi(r.json().get('stocks', []))
+    except Exception as e:
+        if cache is None: raise
+        print(f"⚠️ BRAPI indisponível ({e}); usando lista em cache.")
+        return Universo(cache['registros'])
+
+    _gravar_cache(caminho, {
+        'etag': r.headers.get('ETag'),
+        'last_modified': r.headers.get('Last-Modified'),
+        'validado_em': agora,
+        'registros': universo.registros,
+    })
+    return universo
+
+def _gravar_cache(caminho, conteudo):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f)
+    os.replace(temporario, caminho)
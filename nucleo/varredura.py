@@ -0,0 +1,246 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from nucleo.compacto import MercadoCompacto
+from nucleo.correlacao import CacheCorrelacao, CorrelacaoMovel, marcar_grupos
+from nucleo.indicadores import alinhar_blocos, alinhar_validos, calcular_indicadores, para_blocos
+from nucleo.multiperiodo import CacheMultiperiodo, ConfirmacaoIncremental
+from nucleo.triagem import JANELA_TENDENCIA, analisar_oportunidades, triar
+
+# Motor de varredura compartilhado pelo app e pelo bot: pré-filtro de liquidez,
+# armazém OHLCV (só o delta vem do Yahoo), indicadores, confirmação semanal/mensal e triagem, com
+# o mesmo período e as mesmas regras nos dois. O resultado vira um retrato
+# diário em disco; o app abre o retrato do bot em vez de refazer tudo.
+#
+# Layout no diretório de retratos:
+#   varredura-<AAAA-MM-DD>.json  -> um por pregão, regravado a cada varredura do dia
+#
+# O app publicado (Streamlit Cloud) não enxerga o disco do bot: o workflow
+# publica o retrato mais recente na branch `retratos` e o app o lê por URL
+# (ler_retrato_publicado).
+
+PERIODO = "1y"  # a SMA200 da "Tendência Alta" precisa de 200 pregões
+RETENCAO_RETRATOS = 10  # pregões mantidos em disco
+
+class Varredura:
+    """Resultado de uma varredura: o ranking da triagem e de quando ele é.
+
+    `dados` (OHLCV do período) só existe quando a varredura foi feita neste
+    processo; um retrato lido do disco traz só os resultados. `podados` são os
+    tickers que o pré-filtro de liquidez tirou, com o motivo.
+    """
+
+    def __init__(self, resultados, pregao, gerado_em=None, falhas=None, dados=None, podados=None):
+        self.resultados = resultados
+        self.pregao = pd.Timestamp(pregao).normalize()
+        self.gerado_em = gerado_em or datetime.now()
+        self.falhas = falhas or {}
+        self.dados = dados
+        self.podados = podados or {}
+
+    def idade_segundos(self, agora=None):
+        return ((agora or datetime.now()) - self.gerado_em).total_seconds()
+
+def _datas(dados):
+    return dados.datas if hasattr(dados, 'datas') else dados.index
+
+def alinhar_mercado(dados):
+    # Cada ticker vira a própria série sem lacunas antes dos indicadores, para
+    # a varredura completa e a prévia incremental enxergarem as mesmas janelas
+    if isinstance(dados, MercadoCompacto):
+        campos, tickers, datas, blocos = para_blocos(dados)
+        return MercadoCompacto.de_blocos(campos, datas, tickers, alinhar_blocos(blocos)[0])
+    return alinhar_validos(dados)[0]
+
+def serie_ticker(dados, ticker):
+    """OHLCV sem lacunas de um ticker com os indicadores (gráficos do app)."""
+    if isinstance(dados, MercadoCompacto): bruto = dados.ticker(ticker)
+    else: bruto = dados.xs(ticker, axis=1, level=1).dropna()
+    df = pd.concat({ticker: bruto}, axis=1).swaplevel(axis=1)
+    return calcular_indicadores(df).xs(ticker, axis=1, level=1).dropna()
+
+def varrer(universo, armazem, inst, periodo=PERIODO, compacto=False, cache_periodos=None, paridades=None,
+           cache_correlacao=None, liquidez=None):
+    """Varredura completa do universo. Retorna None se não veio nenhum dado.
+
+    Com `paridades` (nucleo.paridade.Paridades), calcula também o prêmio de
+    cada BDR sobre o ativo de origem. `cache_correlacao` guarda a matriz de
+    correlação entre varreduras do mesmo processo. Com `liquidez`
+    (nucleo.liquidez.FiltroLiquidez), os ilíquidos ficam de fora.
+    """
+    tickers, podados = list(universo.tickers), {}
+    if liquidez is not None:
+        with inst.etapa("pre_filtro", linhas=len(tickers)) as etapa:
+            # Reprovados em varreduras anteriores nem são baixados
+            tickers, podados = liquidez.selecionar(tickers)
+            etapa['linhas'] = len(tickers)
+
+    with inst.etapa("download", linhas=len(tickers)) as etapa:
+        dados = armazem.atualizar(tickers, periodo, compacto=compacto)
+        falhas = dict(armazem.relatorio['falhas'])
+        etapa['linhas'] = len(tickers) - len(falhas)
+    # Quem veio sem dados fica de fora das próximas varreduras, como os ilíquidos. Resposta toda
+    # vazia é o Yahoo fora do ar (o yfinance não levanta erro), não os tickers
+    if liquidez is not None and not dados.empty: liquidez.registrar_sem_dados(falhas)
+    if dados.empty: return None
+
+    if liquidez is not None:
+        with inst.etapa("liquidez") as etapa:
+            dados, reprovados = liquidez.podar(dados)
+            podados.update(reprovados)
+            tickers = [t for t in tickers if t not in reprovados]
+            etapa['linhas'] = len(reprovados)
+        if dados.empty: return None
+
+    with inst.etapa("indicadores", linhas=len(tickers) - len(falhas)):
+        mercado = alinhar_mercado(dados)
+        mercado = mercado.calcular_indicadores() if compacto else calcular_indicadores(mercado)
+    with inst.etapa("multiperiodo"):
+        # Semanal e mensal reamostrados do próprio diário, sem novo download
+        confirmacoes = (cache_periodos or CacheMultiperiodo()).confirmar_todos(dados)
+    paridade = None
+    if paridades is not None:
+        with inst.etapa("paridade") as etapa:
+            paridade = paridades.calcular(dados, periodo)
+            etapa['linhas'] = int(paridade['Premio'].notna().sum())
+    with inst.etapa("triagem") as etapa:
+        resultados = analisar_oportunidades(mercado, universo.nomes_curtos, confirmacoes, paridade)
+        etapa['linhas'] = len(resultados)
+    with inst.etapa("correlacao", linhas=len(tickers) - len(falhas)):
+        # Queda de cada ativo contra a do grupo de ativos correlacionados
+        grupos = (cache_correlacao or CacheCorrelacao()).obter(dados).grupos()
+        resultados = marcar_grupos(resultados, grupos)
+    return Varredura(resultados, _datas(dados).max(), falhas=falhas, dados=dados, podados=podados)
+
+# --- PRÉVIA INTRADIÁRIA (modo daemon) ---
+
+class PreviaIntradiaria:
+    """Triagem do pregão em andamento sem recalcular o histórico.
+
+    Aquecida uma vez por dia com o histórico até o último pregão fechado: os
+    indicadores ficam num EstadoIndicadores, os extremos (máxima/mínima do
+    Fibonacci, fechamentos da variação de 7 dias, contagem de pregões) em
+    arrays por ticker, das mesmas linhas completas de resumo_blocos, e o
+    semanal/mensal num ConfirmacaoIncremental. Cada barra parcial do dia
+    atualiza os indicadores em O(tickers), refaz só a semana e o mês correntes
+    e passa pela mesma triar() da varredura completa (~0,35 s com 800 tickers,
+    quase tudo nos indicadores semanais/mensais). Com `paridades`, o prêmio
+    ainda junta a barra ao histórico inteiro e atualiza o armazém de fora
+    (delta do Yahoo e regravação em disco): mais ~0,6 s por varredura.
+    `podados` (pré-filtro de liquidez do aquecimento) vai junto em cada Varredura.
+    """
+
+    def __init__(self, historico, podados=None):
+        self.historico = historico
+        from nucleo.incremental import EstadoIndicadores  # só o daemon usa; app e bot diário não importam
+        self.podados = podados or {}
+        self.estado = EstadoIndicadores.de_historico(historico)
+        self.periodos = ConfirmacaoIncremental(historico)
+
+        # Linhas completas (OHLCV e indicadores), como na varredura completa
+        campos, _, _, blocos = para_blocos(calcular_indicadores(alinhar_mercado(historico)))
+        alinhado, self.pregoes = alinhar_blocos(blocos)
+        campo = {nome: alinhado[i] for i, nome in enumerate(campos)}
+        self.campos = list(historico.columns.get_level_values(0).unique())
+        self.maxima = np.fmax.reduce(campo['High'], axis=0)
+        self.minima = np.fmin.reduce(campo['Low'], axis=0)
+        self.closes = campo['Close'][-6:]
+        self.abertura = campo['Open'][-1]
+        self.volume = campo['Volume'][-1]
+        self.correlacao = CorrelacaoMovel.de_historico(historico['Close'].reindex(columns=self.tickers))
+
+    @property
+    def tickers(self):
+        return self.estado.tickers
+
+    def valores(self, barra):
+        # barra: linha (campo, ticker) do pregão em andamento -> mesmo contrato de resumo_blocos
+        def campo(nome): return barra[nome].reindex(self.tickers).to_numpy(dtype=float)
+
+        # Ticker sem barra completa hoje não avança: fica com o último pregão fechado
+        tem_barra = ~np.isnan(np.stack([campo(nome) for nome in self.campos])).any(axis=0)
+        previa = self.estado.previa(barra)
+        valores = {nome: previa[nome].to_numpy() for nome in
+                   ('Close', 'Close_Anterior', 'RSI14', 'Stoch_K', 'MACD_Hist', 'BB_Lower')}
+        pregoes = np.where(tem_barra, self.pregoes + 1, self.pregoes)
+        valores.update(
+            Pregoes=pregoes,
+            SMA200=np.where(pregoes >= JANELA_TENDENCIA, previa['SMA200'].to_numpy(), np.nan),
+            Open=np.where(tem_barra, campo('Open'), self.abertura),
+            Volume=np.where(tem_barra, campo('Volume'), self.volume),
+            Close_7d=np.where(tem_barra, self.closes[-5], self.closes[-6]),
+            Maxima=np.where(tem_barra, np.fmax(self.maxima, campo('High')), self.maxima),
+            Minima=np.where(tem_barra, np.fmin(self.minima, campo('Low')), self.minima),
+        )
+        return valores
+
+    def varrer(self, barra, nomes_curtos, paridades=None):
+        confirmacoes = self.periodos.confirmar_todos(barra)
+        paridade = paridades.calcular(pd.concat([self.historico, barra]), PERIODO) if paridades is not None else None
+        resultados = triar(self.tickers, self.valores(barra.iloc[0]), nomes_curtos, confirmacoes, paridade)
+        close = barra['Close'].iloc[0].reindex(self.tickers).to_numpy(dtype=float)
+        grupos = self.correlacao.previa(barra.index[0], close).grupos()
+        resultados = marcar_grupos(resultados, grupos)
+        return Varredura(resultados, barra.index.max(), podados=self.podados)
+
+# --- RETRATOS EM DISCO ---
+
+class Retratos:
+    def __init__(self, diretorio, retencao=RETENCAO_RETRATOS):
+        self.diretorio = diretorio
+        self.retencao = retencao
+
+    def _arquivos(self):
+        if not os.path.isdir(self.diretorio): return []
+        return sorted(a for a in os.listdir(self.diretorio) if a.startswith("varredura-") and a.endswith(".json"))
+
+    def salvar(self, varredura):
+        os.makedirs(self.diretorio, exist_ok=True)
+        df = varredura.resultados
+        conteudo = {
+            'pregao': varredura.pregao.strftime("%Y-%m-%d"),
+            'gerado_em': varredura.gerado_em.isoformat(timespec='seconds'),
+            'falhas': varredura.falhas,
+            'podados': varredura.podados,
+            'colunas': list(df.columns),
+            'resultados': {coluna: df[coluna].tolist() for coluna in df.columns},
+        }
+        # Grava num temporário e troca de uma vez: quem lê nunca vê o arquivo pela metade
+        caminho = os.path.join(self.diretorio, f"varredura-{conteudo['pregao']}.json")
+        temporario = os.path.join(self.diretorio, f".{uuid.uuid4().hex}.tmp")
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(conteudo, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+        for antigo in self._arquivos()[:-self.retencao]:
+            os.remove(os.path.join(self.diretorio, antigo))
+        return caminho
+
+    def ultimo(self):
+        # Retrato do pregão mais recente, ou None
+        arquivos = self._arquivos()
+        if not arquivos: return None
+        with open(os.path.join(self.diretorio, arquivos[-1]), encoding="utf-8") as f:
+            return de_conteudo(json.load(f))
+
+def de_conteudo(conteudo):
+    # JSON gravado por Retratos.salvar -> Varredura (só resultados)
+    resultados = pd.DataFrame(conteudo['resultados'], columns=conteudo['colunas'])
+    return Varredura(resultados, conteudo['pregao'], datetime.fromisoformat(conteudo['gerado_em']),
+                     falhas=conteudo['falhas'], podados=conteudo.get('podados'))
+
+def ler_retrato_publicado(url, timeout=15):
+    """Retrato publicado pelo workflow do bot, ou None se não deu para ler."""
+    import requests
+    try:
+        r = requests.get(url, timeout=timeout)
+        r.raise_for_status()
+        return de_conteudo(r.json())
+    except Exception as e:
+        print(f"⚠️ Retrato publicado indisponível ({e}).")
+        return None
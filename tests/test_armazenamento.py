@@ -0,0 +1,46 @@
+import pandas as pd
+
+from benchmarks.sintetico import gerar_mercado
+from nucleo.armazenamento import SOBREPOSICAO, ArmazemOHLCV
+from nucleo.download import BaixadorEmLotes, BaixadorFalso
+
+# O armazém baixa o período inteiro só na primeira vez; depois, só o delta.
+
+def _mercado():
+    return gerar_mercado(30, 300, fim="2026-10-16", fracao_lacunas=0)
+
+def test_segunda_atualizacao_baixa_so_o_delta(tmp_path):
+    df = _mercado()
+    tickers = list(df.columns.get_level_values(1).unique())
+    ontem, hoje = df.index[-2], df.index[-1]
+
+    ArmazemOHLCV(tmp_path, baixador=BaixadorFalso(df, hoje=ontem)).atualizar(tickers, "1y", hoje=ontem)
+    falso = BaixadorFalso(df, hoje=hoje)
+    obtido = ArmazemOHLCV(tmp_path, baixador=falso).atualizar(tickers, "1y", hoje=hoje)
+
+    # Uma chamada a partir da sobreposição, com SOBREPOSICAO pregões gravados mais o novo
+    assert len(falso.chamadas) == 1 and falso.chamadas[0][1] is not None
+    assert falso.barras_entregues == (SOBREPOSICAO + 1) * len(tickers) * 5
+
+    esperado = df.loc[df.index >= hoje - pd.DateOffset(years=1)]
+    pd.testing.assert_frame_equal(obtido, esperado.reindex(columns=obtido.columns), check_freq=False)
+
+def test_ticker_cujo_delta_falhou_fica_de_fora(tmp_path):
+    df = _mercado()
+    tickers = list(df.columns.get_level_values(1).unique())
+    ontem, hoje = df.index[-2], df.index[-1]
+
+    ArmazemOHLCV(tmp_path, baixador=BaixadorFalso(df, hoje=ontem)).atualizar(tickers, "1y", hoje=ontem)
+    armazem = ArmazemOHLCV(tmp_path, baixador=BaixadorEmLotes(BaixadorFalso(df, hoje=hoje, falhas=[tickers[0]]), espera=0))
+    obtido = armazem.atualizar(tickers, "1y", hoje=hoje)
+
+    assert tickers[0] in armazem.relatorio['falhas']
+    assert tickers[0] not in obtido.columns.get_level_values(1)
+    assert obtido.index.max() == hoje
+
+def test_ticker_sem_dados_e_reportado(tmp_path):
+    df = _mercado()
+    armazem = ArmazemOHLCV(tmp_path, baixador=BaixadorEmLotes(BaixadorFalso(df)))
+    obtido = armazem.atualizar(["FANT34", df.columns[0][1]], "1y", hoje=df.index[-1])
+    assert armazem.relatorio['falhas'] == {"FANT34": "sem dados"}
+    assert list(obtido.columns.get_level_values(1).unique()) == [df.columns[0][1]]
@@ -0,0 +1,46 @@
+import numpy as np
+
+from benchmarks.sintetico import gerar_mercado
+from nucleo.incremental import EstadoIndicadores
+from nucleo.indicadores import CAMPOS_INDICADORES, calcular_indicadores
+from nucleo.varredura import alinhar_mercado
+
+# O estado incremental, barra a barra, tem de bater com o recálculo completo
+# sobre a série sem lacunas de cada ticker.
+
+def _ultimo_pregao(df):
+    calculado = calcular_indicadores(alinhar_mercado(df))
+    return {nome: calculado[nome].iloc[-1] for nome in ('Close',) + CAMPOS_INDICADORES}
+
+def _comparar(estado, df):
+    valores = estado.valores()
+    esperado = _ultimo_pregao(df)
+    for nome, serie in esperado.items():
+        np.testing.assert_allclose(valores[nome].to_numpy(), serie.reindex(estado.tickers).to_numpy(),
+                                   rtol=1e-9, atol=1e-9, err_msg=nome)
+
+def test_aquecimento_igual_ao_recalculo():
+    df = gerar_mercado(80, 260, fracao_lacunas=0.4)
+    _comparar(EstadoIndicadores.de_historico(df), df)
+
+def test_avancar_e_previa_iguais_ao_recalculo():
+    df = gerar_mercado(80, 260, fracao_lacunas=0.4)
+    estado = EstadoIndicadores.de_historico(df.iloc[:-2])
+
+    # A prévia não altera o estado
+    previa = estado.previa(df.iloc[-2])
+    antes = estado.valores()
+    estado.avancar(df.iloc[-2])
+    _comparar(estado, df.iloc[:-1])
+    np.testing.assert_allclose(previa['RSI14'].to_numpy(), estado.valores()['RSI14'].to_numpy())
+    assert not np.allclose(antes['Close'].to_numpy(), estado.valores()['Close'].to_numpy(), equal_nan=True)
+
+    estado.avancar(df.iloc[-1])
+    _comparar(estado, df)
+
+def test_sma_tendencia():
+    df = gerar_mercado(20, 260, fracao_lacunas=0.5)
+    estado = EstadoIndicadores.de_historico(df)
+    close = alinhar_mercado(df)['Close']
+    np.testing.assert_allclose(estado.valores()['SMA200'].to_numpy(),
+                               close.rolling(200).mean().iloc[-1].reindex(estado.tickers).to_numpy(), rtol=1e-9)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.sintetico import gerar_mercado
+from nucleo.indicadores import alinhar_validos, calcular_indicadores
+
+# O motor vetorizado tem de dar os mesmos números do loop por ticker original
+# do app (sem a barra de progresso do Streamlit).
+
+def calcular_indicadores_loop(df):
+    df_calc = df.copy()
+    for ticker in df_calc.columns.get_level_values(1).unique():
+        close = df_calc[('Close', ticker)]
+        high = df_calc[('High', ticker)]
+        low = df_calc[('Low', ticker)]
+
+        delta = close.diff()
+        ganho = delta.clip(lower=0).rolling(14).mean()
+        perda = -delta.clip(upper=0).rolling(14).mean()
+        df_calc[('RSI14', ticker)] = 100 - (100 / (1 + ganho / perda))
+
+        lowest_low = low.rolling(window=14).min()
+        highest_high = high.rolling(window=14).max()
+        df_calc[('Stoch_K', ticker)] = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+
+        df_calc[('EMA20', ticker)] = close.ewm(span=20).mean()
+        sma = close.rolling(20).mean()
+        std = close.rolling(20).std()
+        df_calc[('BB_Lower', ticker)] = sma - (std * 2)
+        df_calc[('BB_Upper', ticker)] = sma + (std * 2)
+
+        macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+        df_calc[('MACD_Hist', ticker)] = macd - macd.ewm(span=9).mean()
+    return df_calc
+
+@pytest.mark.filterwarnings("ignore::pandas.errors.PerformanceWarning")  # o loop antigo fragmenta o DataFrame
+def test_vetorizado_igual_ao_loop():
+    df = gerar_mercado(60, 150)
+    esperado = calcular_indicadores_loop(df)
+    obtido = calcular_indicadores(df)
+    pd.testing.assert_frame_equal(obtido.reindex(columns=esperado.columns), esperado, check_freq=False)
+
+def test_alinhar_validos_igual_ao_dropna_por_ticker():
+    df = gerar_mercado(40, 120, fracao_lacunas=0.5)
+    alinhado, n_validos = alinhar_validos(df)
+    for ticker in df.columns.get_level_values(1).unique():
+        serie = df.xs(ticker, axis=1, level=1).dropna()
+        fim = alinhado.xs(ticker, axis=1, level=1).iloc[len(df.index) - len(serie):]
+        assert n_validos[ticker] == len(serie)
+        np.testing.assert_array_equal(fim.to_numpy(), serie.to_numpy())
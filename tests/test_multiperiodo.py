@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.sintetico import gerar_mercado
+from nucleo.multiperiodo import PERIODOS, ConfirmacaoIncremental, confirmar, juntar_barra, reamostrar
+
+# Semanal/mensal do daemon: juntar a barra do dia ao histórico já reamostrado
+# tem de dar o mesmo que reamostrar tudo de novo.
+
+# 2026-10-14 é quarta (mesma semana e mês); 2026-10-19 abre semana; 2026-11-02 abre mês
+@pytest.mark.parametrize("ultimo_dia", ["2026-10-14", "2026-10-19", "2026-11-02"])
+def test_juntar_barra_igual_a_reamostrar(ultimo_dia):
+    df = gerar_mercado(40, 300, fim=ultimo_dia, fracao_lacunas=0.5)
+    barra = df.iloc[[-1]].copy()
+    barra.loc[:, ('Open', df.columns[0][1])] = np.nan  # barra incompleta não entra no período
+    historico = df.iloc[:-1]
+    mercado = pd.concat([historico, barra])
+
+    for periodo, params in PERIODOS.items():
+        esperado = reamostrar(mercado, params['regra'])
+        obtido = juntar_barra(reamostrar(historico, params['regra']), reamostrar(barra, params['regra']))
+        pd.testing.assert_frame_equal(obtido, esperado, check_freq=False)
+
+    confirmacoes = ConfirmacaoIncremental(historico).confirmar_todos(barra)
+    for periodo, obtido in confirmacoes.items():
+        pd.testing.assert_frame_equal(obtido, confirmar(mercado, periodo))
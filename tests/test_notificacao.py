@@ -0,0 +1,54 @@
+import urllib.parse
+
+from nucleo.notificacao import BackendCallMeBot, Despachante, ServidorFalso, dividir_mensagem
+
+# Despacho contra o CallMeBot falso: retentativas em 208/5xx, desistência em
+# erro permanente e mensagens longas divididas em partes numeradas, em ordem.
+
+DESTINATARIO = {'telefone': '5511999990000', 'apikey': 'k'}
+
+def _despachar(respostas, mensagem, destinatarios=(DESTINATARIO,), **parametros):
+    with ServidorFalso(respostas) as servidor:
+        backend = BackendCallMeBot(url=servidor.url)
+        try:
+            despachante = Despachante(backend, list(destinatarios), taxa=1000, espera=0.001, **parametros)
+            ok = despachante.enviar(mensagem)
+        finally:
+            backend.fechar()
+    return ok, despachante.relatorio, servidor.recebidas
+
+def test_repete_em_208_e_500():
+    ok, relatorio, recebidas = _despachar([208, 500], "alerta")
+    assert ok
+    assert [status for _, _, status in recebidas] == [208, 500, 200]
+    assert relatorio[DESTINATARIO['telefone']] == {'enviadas': 1, 'partes': 1, 'tentativas': 3, 'falhas': []}
+
+def test_desiste_depois_das_tentativas():
+    ok, relatorio, recebidas = _despachar([500] * 3, "alerta", tentativas=3)
+    assert not ok
+    assert len(recebidas) == 3 and relatorio[DESTINATARIO['telefone']]['falhas'] == ["HTTP 500"]
+
+def test_erro_permanente_nao_repete():
+    ok, relatorio, recebidas = _despachar([400], "alerta")
+    assert not ok and len(recebidas) == 1
+    assert relatorio[DESTINATARIO['telefone']]['tentativas'] == 1
+
+def test_falha_de_um_destinatario_nao_afeta_o_outro():
+    outro = {'telefone': '5521999990000', 'apikey': 'k'}
+    ok, relatorio, _ = _despachar([400], "alerta", destinatarios=(DESTINATARIO, outro))
+    assert not ok
+    assert sorted(r['enviadas'] for r in relatorio.values()) == [0, 1]
+
+def test_mensagem_longa_dividida_em_ordem():
+    blocos = ["cabeçalho\n"] + [f"ativo {i} " + "x" * 150 + "\n" for i in range(40)] + ["rodapé"]
+    partes = dividir_mensagem(blocos, limite=1000)
+    assert len(partes) > 1
+    assert all(len(urllib.parse.quote(p)) <= 1000 for p in partes)
+    assert all(p.startswith(f"({i}/{len(partes)})\n") for i, p in enumerate(partes, 1))
+
+    ok, _, recebidas = _despachar([208], blocos, limite=1000)
+    assert ok
+    textos = [texto for _, texto, status in recebidas if status == 200]
+    assert textos == partes
+    for bloco in blocos:
+        assert any(bloco.strip() in texto for texto in textos)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar_exterior, gerar_mercado
+from nucleo.download import BaixadorEmLotes, BaixadorFalso
+from nucleo.paridade import CAMBIO, LIMITE_DESCONTO, Paridades, calcular_premio, mapear
+
+# Prêmio sobre o ativo de origem com os preços de fora de gerar_exterior:
+# acha os descontos plantados, ignora ETFs e não confia em origem errada.
+
+HOJE = pd.Timestamp("2026-10-16")
+
+def _mercados():
+    mercado = gerar_mercado(80, 300, fim=HOJE, fracao_lacunas=0)
+    exterior, descontados = gerar_exterior(mercado)
+    return mercado, exterior, descontados
+
+def _premio(mercado, exterior, mapa=None):
+    close = exterior['Close']
+    mapa = mapa if mapa is not None else mapear(list(mercado['Close'].columns))
+    return calcular_premio(mercado['Close'], close.drop(columns=CAMBIO), close[CAMBIO], mapa)
+
+def test_descontos_plantados():
+    mercado, exterior, descontados = _mercados()
+    premio = _premio(mercado, exterior)
+    assert set(premio.index[premio['Premio'] <= LIMITE_DESCONTO]) == set(descontados)
+    assert premio.drop(index=descontados)['Premio'].abs().max() < 1
+    assert premio.loc[[t for t in premio.index if t.endswith('39')], 'Premio'].isna().all()
+
+def test_origem_de_outra_empresa_e_reprovada():
+    mercado, exterior, _ = _mercados()
+    trocado = exterior.copy()
+    simbolos = [s for s in exterior['Close'].columns if s != CAMBIO]
+    trocado = trocado.rename(columns=dict(zip(simbolos, np.roll(simbolos, 1))), level=1)
+
+    mapa = mapear(list(mercado['Close'].columns))
+    premio = _premio(mercado, trocado, mapa)
+    com_origem = mapa['subjacente'] != ""
+    assert premio.loc[com_origem, 'Premio'].isna().all() and premio.loc[com_origem, 'Reprovada'].all()
+
+    # Origem informada em paridades.json é aceita sem checagem
+    premio = _premio(mercado, trocado, mapa.assign(informado=True))
+    assert premio.loc[com_origem, 'Premio'].notna().all()
+
+def test_origem_desconhecida_nao_e_pedida_de_novo(tmp_path):
+    mercado, exterior, _ = _mercados()
+    sumidos = ['AAAA', 'AAAB']
+    falso = BaixadorFalso(exterior.drop(columns=sumidos, level=1), hoje=HOJE)
+    paridades = Paridades(tmp_path, baixador=BaixadorEmLotes(falso))
+
+    def pedidos(hoje):
+        antes = len(falso.chamadas)
+        paridades.calcular(mercado, "1y", hoje=hoje)
+        return {s for chamada in falso.chamadas[antes:] for s in chamada[0]} & set(sumidos)
+
+    assert pedidos(HOJE) == set(sumidos)
+    assert pedidos(HOJE) == set()
+    assert pedidos(HOJE + pd.Timedelta(days=7)) == set(sumidos)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from nucleo.tabela import TabelaResultados
+
+# Ordenação da tabela do app: empates mantêm a ordem da triagem (maior queda
+# primeiro) também nas ordenações decrescentes, e NaN fica no fim.
+
+def _tabela():
+    return TabelaResultados(pd.DataFrame({
+        'Ticker': ['AAAA34', 'BBBB34', 'CCCC34', 'DDDD34'],
+        'Queda_Dia': [-5.0, -4.0, -3.0, -2.0],
+        'Score': [2, 3, 2, 1],
+        'IS': [50.0, 60.0, 50.0, np.nan],
+        'Potencial': ['Alta', 'Muito Alta', 'Alta', 'Baixa'],
+    }))
+
+def _ordem(tabela, coluna, crescente):
+    return list(tabela.dados['Ticker'].to_numpy()[tabela.ordenar(tabela.filtrar(), coluna, crescente)])
+
+def test_decrescente_mantem_empates_na_ordem_da_tabela():
+    tabela = _tabela()
+    assert _ordem(tabela, 'Score', False) == ['BBBB34', 'AAAA34', 'CCCC34', 'DDDD34']
+    assert _ordem(tabela, 'IS', False) == ['BBBB34', 'AAAA34', 'CCCC34', 'DDDD34']
+
+def test_potencial_na_ordem_do_sinal():
+    assert _ordem(_tabela(), 'Potencial', True) == ['BBBB34', 'AAAA34', 'CCCC34', 'DDDD34']
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import gerar_mercado
+from nucleo.armazenamento import ArmazemOHLCV
+from nucleo.download import BaixadorEmLotes, BaixadorFalso
+from nucleo.instrumentacao import Instrumentos
+from nucleo.universo import Universo
+from nucleo.varredura import PreviaIntradiaria, Retratos, varrer
+
+# A prévia do daemon (histórico aquecido + barra do dia) tem de dar o mesmo
+# ranking da varredura completa sobre o mesmo mercado.
+
+def _varredura_completa(tmp_path):
+    df = gerar_mercado(150, 300, fim=pd.Timestamp.now().normalize(), fracao_lacunas=0.3)
+    tickers = list(df.columns.get_level_values(1).unique())
+    universo = Universo([{'ticker': t, 'nome': f"{t} Inc", 'nome_curto': t} for t in tickers])
+    armazem = ArmazemOHLCV(tmp_path, baixador=BaixadorEmLotes(BaixadorFalso(df)))
+    return universo, varrer(universo, armazem, Instrumentos())
+
+def test_previa_igual_a_varredura_completa(tmp_path):
+    universo, completa = _varredura_completa(tmp_path)
+    dados, hoje = completa.dados, completa.pregao
+    previa = PreviaIntradiaria(dados.loc[dados.index < hoje]).varrer(dados.loc[[hoje]], universo.nomes_curtos)
+
+    esperado = completa.resultados.set_index('Ticker')
+    obtido = previa.resultados.set_index('Ticker')
+    assert len(esperado) > 0 and set(obtido.index) == set(esperado.index)
+    obtido = obtido.loc[esperado.index]
+    for coluna in esperado.columns:
+        if pd.api.types.is_float_dtype(esperado[coluna]):
+            np.testing.assert_allclose(obtido[coluna].to_numpy(dtype=float), esperado[coluna].to_numpy(dtype=float),
+                                       rtol=1e-7, atol=1e-9, err_msg=coluna)
+        else:
+            assert (obtido[coluna] == esperado[coluna]).all(), coluna
+
+def test_retrato_ida_e_volta(tmp_path):
+    _, completa = _varredura_completa(tmp_path)
+    retratos = Retratos(tmp_path / "retratos")
+    retratos.salvar(completa)
+    lido = retratos.ultimo()
+    assert lido.pregao == completa.pregao
+    pd.testing.assert_frame_equal(lido.resultados, completa.resultados.reset_index(drop=True), check_dtype=False)